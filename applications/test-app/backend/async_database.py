@@ -0,0 +1,227 @@
+"""Async DynamoDB operations that never block the event loop.
+
+Each function mirrors the synchronous one in database.py and runs it on a
+dedicated, bounded thread pool. A per-loop semaphore caps the number of
+in-flight database calls; callers that cannot get a slot within
+DYNAMODB_QUEUE_TIMEOUT_SECONDS get a DatabaseBusyError instead of piling up
+behind a slow table. Identical concurrent reads are coalesced into one call.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import logging
+import threading
+import weakref
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+import database
+from config import settings
+from database import Greeting
+from singleflight import AsyncSingleFlight, call_key
+from tracing import start_span
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+# asyncio primitives bind to the loop they first wait on, so keep one per loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+_read_flights = AsyncSingleFlight()
+
+
+class DatabaseBusyError(RuntimeError):
+    """Raised when no database slot frees up within the queue timeout."""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.DYNAMODB_EXECUTOR_WORKERS,
+                    thread_name_prefix="dynamodb",
+                )
+    return _executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.DYNAMODB_MAX_IN_FLIGHT)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def run_in_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking database call on the DynamoDB thread pool.
+
+    Raises:
+        DatabaseBusyError: If the in-flight limit stays exhausted for the queue timeout
+    """
+    # The span covers the wait for a slot as well as the call itself
+    with start_span(f"db.{func.__name__}"):
+        semaphore = _get_semaphore()
+        try:
+            # Not wait_for: on 3.11 it can time out after acquire() succeeded, losing the slot
+            async with asyncio.timeout(settings.DYNAMODB_QUEUE_TIMEOUT_SECONDS):
+                await semaphore.acquire()
+        except TimeoutError as e:
+            logger.warning(
+                f"DynamoDB call {func.__name__} rejected: "
+                f"{settings.DYNAMODB_MAX_IN_FLIGHT} calls already in flight"
+            )
+            raise DatabaseBusyError("DynamoDB is busy, too many requests in flight") from e
+
+        loop = asyncio.get_running_loop()
+        # Copy the context so the worker thread sees the current span (and other contextvars)
+        context = contextvars.copy_context()
+        try:
+            future = _get_executor().submit(context.run, functools.partial(func, *args, **kwargs))
+        except BaseException:
+            semaphore.release()
+            raise
+        # Release when the thread is done, not when the caller stops waiting: a
+        # cancelled request must not free the slot while its call still runs
+        future.add_done_callback(lambda _: _release(loop, semaphore))
+        return await asyncio.wrap_future(future)
+
+
+def _release(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore) -> None:
+    """Release an in-flight slot from the worker thread (no-op once the loop is closed)."""
+    with contextlib.suppress(RuntimeError):
+        loop.call_soon_threadsafe(semaphore.release)
+
+
+async def _coalesced_read(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a read on the DynamoDB thread pool; identical concurrent reads share one call.
+
+    Waiters await the in-flight call instead of each taking an executor thread
+    and in-flight slot.
+    """
+    return await _read_flights.do(
+        call_key(func, args, kwargs), lambda: run_in_executor(func, *args, **kwargs)
+    )
+
+
+def shutdown() -> None:
+    """Wait for in-flight calls and stop the thread pool (recreated on next use)."""
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+# =============================================================================
+# Database Operations
+# =============================================================================
+
+
+async def refresh_database_availability() -> bool:
+    """Re-check whether the configured DynamoDB table exists (see database.py)."""
+    return await _coalesced_read(database.refresh_database_availability)
+
+
+async def ensure_database_available() -> bool:
+    """Return True if DynamoDB is available; refresh off-loop in DynamoDB Local mode."""
+    if database.database_available:
+        return True
+    if database.dynamodb_endpoint_url:
+        return await refresh_database_availability()
+    return False
+
+
+async def create_greeting(user_name: str, message: str) -> Greeting:
+    """Create a new greeting in DynamoDB (see database.create_greeting)."""
+    return await run_in_executor(database.create_greeting, user_name, message)
+
+
+async def create_greetings_batch(
+    entries: list[tuple[str, str]],
+) -> list[tuple[Greeting, str | None]]:
+    """Create many greetings with BatchWriteItem (see database.create_greetings_batch)."""
+    return await run_in_executor(database.create_greetings_batch, entries)
+
+
+async def get_greetings(
+    skip: int = 0, limit: int = 10, start_key: dict | None = None
+) -> tuple[list[Greeting], int, dict | None]:
+    """Get all greetings with key-based pagination (see database.get_greetings)."""
+    return await _coalesced_read(
+        database.get_greetings, skip=skip, limit=limit, start_key=start_key
+    )
+
+
+async def get_recent_greetings(
+    limit: int = 10, skip: int = 0, positions: dict[str, dict | None] | None = None
+) -> tuple[list[Greeting], int, dict[str, dict | None] | None]:
+    """Get the newest greetings from the feed index (see database.get_recent_greetings)."""
+    return await _coalesced_read(
+        database.get_recent_greetings, limit=limit, skip=skip, positions=positions
+    )
+
+
+async def get_user_greetings(
+    user_name: str,
+    limit: int = 100,
+    start_key: dict | None = None,
+    attributes: tuple[str, ...] | None = None,
+) -> tuple[list[Greeting], dict | None]:
+    """Get a page of a user's greetings, newest first (see database.get_user_greetings)."""
+    return await _coalesced_read(
+        database.get_user_greetings,
+        user_name,
+        limit=limit,
+        start_key=start_key,
+        attributes=attributes,
+    )
+
+
+async def get_users_greetings(
+    user_names: list[str],
+    limit: int = 100,
+    attributes: tuple[str, ...] | None = None,
+) -> dict[str, tuple[list[Greeting], int | None, dict | None]]:
+    """
+    Get the first page of greetings and the count for several users in one call.
+
+    Per-user GSI queries run concurrently, at most GREETINGS_USERS_CONCURRENCY
+    at a time for this call; all counts are read with one BatchGetItem.
+
+    Returns:
+        dict: (greetings, count, LastEvaluatedKey) per user, in the order of user_names
+    """
+    semaphore = asyncio.Semaphore(settings.GREETINGS_USERS_CONCURRENCY)
+
+    async def load(user_name: str) -> tuple[list[Greeting], dict | None]:
+        async with semaphore:
+            return await get_user_greetings(user_name, limit=limit, attributes=attributes)
+
+    counts, *pages = await asyncio.gather(
+        _coalesced_read(database.get_greeting_counts, user_names),
+        *(load(user_name) for user_name in user_names),
+    )
+    return {
+        user_name: (greetings, counts.get(user_name), last_key)
+        for user_name, (greetings, last_key) in zip(user_names, pages, strict=True)
+    }
+
+
+async def get_greeting_count(user_name: str | None = None) -> int | None:
+    """Read the maintained global or per-user greeting count (see database.get_greeting_count)."""
+    return await _coalesced_read(database.get_greeting_count, user_name)
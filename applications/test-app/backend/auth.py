@@ -4,13 +4,15 @@ This module provides API key authentication using the X-API-Key header.
 It integrates with the existing Secrets Manager infrastructure for key retrieval.
 """
 
+import hashlib
 import hmac
 import logging
 
-from fastapi import Depends, HTTPException, Security, status
+from fastapi import Depends, HTTPException, Request, Security, status
 from fastapi.security import APIKeyHeader
 
 from config import settings
+from tracing import start_span
 
 
 logger = logging.getLogger(__name__)
@@ -26,16 +28,25 @@ async def _noop_auth_dependency() -> None:
     return None
 
 
-async def verify_api_key(api_key: str | None = Security(api_key_header)) -> str:
+def api_key_fingerprint(api_key: str) -> str:
+    """Short, non-reversible identifier for an API key (rate limit keys, logs)."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+async def verify_api_key(request: Request, api_key: str | None = Security(api_key_header)) -> str:
     """
     Verify API key from request header.
 
     This function:
-    1. Retrieves the expected API key from Secrets Manager (via SSM discovery)
+    1. Retrieves the expected API key from Secrets Manager (via SSM discovery,
+       served from the in-process secret cache after the first call)
     2. Compares it with the provided API key from X-API-Key header
     3. Raises HTTPException if invalid or missing
+    4. Stores the key's fingerprint in request.state.api_key_hash, so the rate
+       limiter gives each API key its own bucket
 
     Args:
+        request: Current request
         api_key: API key from X-API-Key header (None if not provided)
 
     Returns:
@@ -44,44 +55,47 @@ async def verify_api_key(api_key: str | None = Security(api_key_header)) -> str:
     Raises:
         HTTPException: 401 if API key is missing or invalid
     """
-    # Import here to avoid circular dependencies
-    from secrets import get_backend_api_key
-
-    # Get expected API key from Secrets Manager (with fallback to env var)
-    try:
-        expected_key = get_backend_api_key()
-    except Exception as e:
-        logger.error(f"Failed to retrieve backend API key: {e}", exc_info=True)
-        # In production, this should fail. In dev/testing, allow fallback.
-        if settings.TESTING:
-            logger.warning("TESTING mode: Allowing request without API key validation")
-            return api_key or "test-key-bypassed"
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="API authentication configuration error",
-        ) from e
-
-    # Check if API key is provided
-    if not api_key:
-        logger.warning("API request missing X-API-Key header")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing API key. Please provide X-API-Key header.",
-            headers={"WWW-Authenticate": "ApiKey"},
-        )
-
-    # Compare API keys (use constant-time comparison to prevent timing attacks)
-    # Use constant-time comparison
-    if not hmac.compare_digest(api_key.encode(), expected_key.encode()):
-        logger.warning(f"Invalid API key provided (key length: {len(api_key)})")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid API key",
-            headers={"WWW-Authenticate": "ApiKey"},
-        )
-
-    logger.debug("API key validated successfully")
-    return api_key
+    with start_span("auth.verify_api_key"):
+        # Import here to avoid circular dependencies
+        from secrets import get_backend_api_key_async
+
+        # Get expected API key from Secrets Manager (cached in-process, with fallback to env var;
+        # cold or expired lookups run off the event loop)
+        try:
+            expected_key = await get_backend_api_key_async()
+        except Exception as e:
+            logger.error(f"Failed to retrieve backend API key: {e}", exc_info=True)
+            # In production, this should fail. In dev/testing, allow fallback.
+            if settings.TESTING:
+                logger.warning("TESTING mode: Allowing request without API key validation")
+                return api_key or "test-key-bypassed"
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="API authentication configuration error",
+            ) from e
+
+        # Check if API key is provided
+        if not api_key:
+            logger.warning("API request missing X-API-Key header")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Missing API key. Please provide X-API-Key header.",
+                headers={"WWW-Authenticate": "ApiKey"},
+            )
+
+        # Compare API keys (use constant-time comparison to prevent timing attacks)
+        # Use constant-time comparison
+        if not hmac.compare_digest(api_key.encode(), expected_key.encode()):
+            logger.warning(f"Invalid API key provided (key length: {len(api_key)})")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key",
+                headers={"WWW-Authenticate": "ApiKey"},
+            )
+
+        logger.debug("API key validated successfully")
+        request.state.api_key_hash = api_key_fingerprint(api_key)
+        return api_key
 
 
 def get_auth_dependency():
@@ -0,0 +1,173 @@
+"""Shared boto3 client registry for all AWS access.
+
+Creating a boto3 client resolves credentials, loads service models and opens a
+new HTTP connection pool. This module creates each client once per process
+(keyed by service, region, endpoint and explicit credentials) and hands the same
+instance to every caller, so connections to DynamoDB, SSM and Secrets Manager
+are reused across requests.
+
+boto3 clients are thread-safe; client creation is serialized because the
+underlying botocore session is not. Every client is instrumented for call
+latency and errors (metrics.instrument_client) and client spans
+(tracing.instrument_client).
+"""
+
+import logging
+import os
+import threading
+from typing import Any
+
+import boto3
+from botocore.config import Config
+
+import metrics
+import tracing
+
+
+logger = logging.getLogger(__name__)
+
+# Connection tuning (environment variables so this module can be used before config.py loads)
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+AWS_CONNECT_TIMEOUT_SECONDS = float(os.getenv("AWS_CONNECT_TIMEOUT_SECONDS", "2"))
+AWS_READ_TIMEOUT_SECONDS = float(os.getenv("AWS_READ_TIMEOUT_SECONDS", "5"))
+AWS_RETRY_MODE = os.getenv("AWS_RETRY_MODE", "adaptive")
+AWS_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))
+AWS_TCP_KEEPALIVE = os.getenv("AWS_TCP_KEEPALIVE", "true").lower() == "true"
+
+_session: boto3.session.Session | None = None
+_clients: dict[tuple, Any] = {}
+_resources: dict[tuple, Any] = {}
+_lock = threading.Lock()
+
+
+def default_region() -> str:
+    """Return the configured AWS region (AWS_REGION env var or 'us-east-1')."""
+    return os.getenv("AWS_REGION", "us-east-1")
+
+
+def build_client_config() -> Config:
+    """Build the botocore Config shared by every client and resource."""
+    return Config(
+        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+        connect_timeout=AWS_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=AWS_READ_TIMEOUT_SECONDS,
+        retries={"mode": AWS_RETRY_MODE, "max_attempts": AWS_MAX_ATTEMPTS},
+        tcp_keepalive=AWS_TCP_KEEPALIVE,
+    )
+
+
+def get_session() -> boto3.session.Session:
+    """Return the process-wide boto3 session (created on first use)."""
+    global _session
+
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = boto3.session.Session()
+    return _session
+
+
+def _registry_key(
+    service_name: str, region_name: str | None, endpoint_url: str | None, credentials: dict
+) -> tuple:
+    return (
+        service_name,
+        region_name or default_region(),
+        endpoint_url,
+        tuple(sorted(credentials.items())),
+    )
+
+
+def get_client(
+    service_name: str,
+    region_name: str | None = None,
+    endpoint_url: str | None = None,
+    **credentials: str,
+) -> Any:
+    """
+    Get a shared boto3 client.
+
+    Args:
+        service_name: AWS service name (e.g., 'dynamodb', 'ssm', 'secretsmanager')
+        region_name: AWS region (defaults to AWS_REGION env var or 'us-east-1')
+        endpoint_url: Custom endpoint (e.g., DynamoDB Local)
+        **credentials: Explicit aws_access_key_id / aws_secret_access_key, if any
+
+    Returns:
+        A boto3 client shared by every caller with the same arguments
+    """
+    key = _registry_key(service_name, region_name, endpoint_url, credentials)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    session = get_session()
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = session.client(
+                service_name,
+                region_name=key[1],
+                endpoint_url=endpoint_url,
+                config=build_client_config(),
+                **credentials,
+            )
+            metrics.instrument_client(client)
+            tracing.instrument_client(client)
+            _clients[key] = client
+            logger.debug(f"Created shared {service_name} client (region: {key[1]})")
+    return client
+
+
+def get_resource(
+    service_name: str,
+    region_name: str | None = None,
+    endpoint_url: str | None = None,
+    **credentials: str,
+) -> Any:
+    """
+    Get a shared boto3 resource.
+
+    Only use resource action methods (e.g., Table.put_item/query/scan) from
+    multiple threads; they delegate to the resource's thread-safe client.
+
+    Args:
+        service_name: AWS service name (e.g., 'dynamodb')
+        region_name: AWS region (defaults to AWS_REGION env var or 'us-east-1')
+        endpoint_url: Custom endpoint (e.g., DynamoDB Local)
+        **credentials: Explicit aws_access_key_id / aws_secret_access_key, if any
+
+    Returns:
+        A boto3 resource shared by every caller with the same arguments
+    """
+    key = _registry_key(service_name, region_name, endpoint_url, credentials)
+    resource = _resources.get(key)
+    if resource is not None:
+        return resource
+
+    session = get_session()
+    with _lock:
+        resource = _resources.get(key)
+        if resource is None:
+            resource = session.resource(
+                service_name,
+                region_name=key[1],
+                endpoint_url=endpoint_url,
+                config=build_client_config(),
+                **credentials,
+            )
+            metrics.instrument_client(resource.meta.client)
+            tracing.instrument_client(resource.meta.client)
+            _resources[key] = resource
+            logger.debug(f"Created shared {service_name} resource (region: {key[1]})")
+    return resource
+
+
+def reset_clients() -> None:
+    """Drop every cached client, resource and the session (e.g., after a fork)."""
+    global _session
+
+    with _lock:
+        _clients.clear()
+        _resources.clear()
+        _session = None
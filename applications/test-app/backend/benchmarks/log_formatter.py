@@ -0,0 +1,81 @@
+"""Cost of formatting one request log record with logging_config.JSONFormatter.
+
+Compares the current formatter (event-time timestamp with a cached second
+prefix, allowlisted extras, orjson when installed) with the previous one
+(datetime.now() timestamp, hasattr probes, json.dumps), and reports
+microseconds per record.
+
+Usage (from the backend directory):
+    python -m benchmarks.log_formatter [--records 5000] [--repeat 5]
+"""
+
+import argparse
+import json
+import logging
+import timeit
+from datetime import UTC, datetime
+
+import logging_config
+from logging_config import JSONFormatter
+
+
+class PreviousJSONFormatter(logging.Formatter):
+    """The formatter JSONFormatter replaced."""
+
+    def format(self, record):
+        log_data = {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in logging_config.LOG_EXTRA_FIELDS:
+            if hasattr(record, field):
+                log_data[field] = getattr(record, field)
+        if record.exc_info:
+            log_data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log_data)
+
+
+def request_record() -> logging.LogRecord:
+    """A typical access log record as written by LoggingMiddleware."""
+    return logging.makeLogRecord(
+        {
+            "name": "middleware",
+            "levelno": logging.INFO,
+            "levelname": "INFO",
+            "msg": "Response: GET /api/greetings - 200",
+            "request_id": "6daf547a-5234-47c6-a7f4-5d44ed888caf",
+            "method": "GET",
+            "path": "/api/greetings",
+            "status_code": 200,
+            "process_time": 0.0012,
+        }
+    )
+
+
+def per_record(formatter: logging.Formatter, records: int, repeat: int) -> float:
+    """Best-of-`repeat` seconds per format() call."""
+    record = request_record()
+    return (
+        min(timeit.repeat(lambda: formatter.format(record), number=records, repeat=repeat))
+        / records
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    current = per_record(JSONFormatter(), args.records, args.repeat)
+    previous = per_record(PreviousJSONFormatter(), args.records, args.repeat)
+
+    print(f"records:           {args.records} x {args.repeat}")
+    print(f"JSONFormatter:     {current * 1e6:8.2f} us/record")
+    print(f"previous:          {previous * 1e6:8.2f} us/record")
+
+
+if __name__ == "__main__":
+    main()
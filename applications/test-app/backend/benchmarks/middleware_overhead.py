@@ -0,0 +1,101 @@
+"""Per-request overhead of the middleware stack in middleware.py.
+
+Drives a minimal FastAPI app directly through its ASGI interface (no sockets,
+no HTTP client) with and without the middleware installed in the same order as
+main.py, and reports the difference in microseconds per request.
+
+Usage (from the backend directory):
+    python -m benchmarks.middleware_overhead [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI
+
+import middleware
+
+
+def build_app(with_middleware: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    if with_middleware:
+        # Same order as main.py (last added runs first)
+        app.add_middleware(middleware.ErrorHandlingMiddleware)
+        app.add_middleware(middleware.LoggingMiddleware)
+        app.add_middleware(middleware.RequestIdMiddleware)
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    """Send `requests` GET /ping calls through the ASGI app; return seconds per request."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+
+    def channel():
+        # Like uvicorn: the (empty) body is delivered once, and receive() reports
+        # a disconnect once the response has been sent
+        body_delivered = False
+        response_complete = asyncio.Event()
+
+        async def receive():
+            nonlocal body_delivered
+            if not body_delivered:
+                body_delivered = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                response_complete.set()
+
+        return receive, send
+
+    # Warm up (route compilation, first-call allocations)
+    for _ in range(200):
+        await app(dict(scope), *channel())
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), *channel())
+    return (time.perf_counter() - started) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Measure middleware cost, not log formatting/output
+    logging.disable(logging.CRITICAL)
+
+    bare = asyncio.run(run(build_app(with_middleware=False), args.requests))
+    stacked = asyncio.run(run(build_app(with_middleware=True), args.requests))
+
+    print(f"requests:          {args.requests}")
+    print(f"no middleware:     {bare * 1e6:8.1f} us/request")
+    print(f"middleware stack:  {stacked * 1e6:8.1f} us/request")
+    print(f"overhead:          {(stacked - bare) * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
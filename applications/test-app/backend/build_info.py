@@ -0,0 +1,132 @@
+"""Build information (version.json) loaded once and served as pre-rendered bytes.
+
+/health, /version and /api/hello used to stat, open and parse
+/app/version.json on every request. The file is written once at image build
+time, so it is now read at startup (and on SIGHUP), merged with the
+environment fallbacks, and each response body is serialized up front.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import signal
+import sys
+
+from config import settings
+from schemas import HealthResponse, HelloResponse, VersionResponse
+
+
+logger = logging.getLogger(__name__)
+
+# Written by the Dockerfile builder stage
+VERSION_FILE = os.getenv("VERSION_FILE", "/app/version.json")
+
+
+class BuildInfo:
+    """Resolved build metadata plus the pre-rendered JSON bodies that use it."""
+
+    def __init__(self, version_data: dict | None):
+        file_data = version_data or {}
+        self.environment = os.getenv("ENVIRONMENT", "development")
+
+        # /health: file value, then env, then configured API version
+        self.version = (
+            file_data.get("version") or os.getenv("APP_VERSION") or settings.API_VERSION or "dev"
+        )
+        self.commit = file_data.get("commit") or os.getenv("GIT_COMMIT") or "unknown"
+
+        # /version: file value, then env (kept as the endpoint always reported it)
+        if version_data is not None:
+            version_response = VersionResponse(
+                version=version_data.get("version", os.getenv("APP_VERSION", "unknown")),
+                commit=version_data.get("commit", os.getenv("GIT_COMMIT", "unknown")),
+                build_date=version_data.get("build_date", os.getenv("BUILD_DATE", "unknown")),
+                python_version=version_data.get(
+                    "python_version", f"{sys.version_info.major}.{sys.version_info.minor}"
+                ),
+                environment=self.environment,
+            )
+        else:
+            version_response = VersionResponse(
+                version=os.getenv("APP_VERSION", settings.API_VERSION),
+                commit=os.getenv("GIT_COMMIT", "unknown"),
+                build_date=os.getenv("BUILD_DATE", "unknown"),
+                python_version=f"{sys.version_info.major}.{sys.version_info.minor}",
+                environment=self.environment,
+            )
+        self.version_body = version_response.model_dump_json().encode()
+
+        # /api/hello: build info only outside production, and only from version.json
+        hello_suffix = ""
+        if self.environment.lower() != "production" and version_data is not None:
+            commit_val = version_data.get("commit", "unknown")
+            commit_short = commit_val[:7] if commit_val != "unknown" else "unknown"
+            hello_suffix = f" (build: {commit_short}, {version_data.get('build_date', 'unknown')})"
+        self.hello_body = (
+            HelloResponse(message=f"hello from backend{hello_suffix}").model_dump_json().encode()
+        )
+
+        # /health for each database state
+        self.health_connected_body = self._health_body("connected")
+        self.health_unavailable_body = self._health_body("unavailable")
+
+    def _health_body(self, database: str) -> bytes:
+        return (
+            HealthResponse(
+                status="healthy", database=database, version=self.version, commit=self.commit
+            )
+            .model_dump_json()
+            .encode()
+        )
+
+
+def _read_version_file(path: str) -> dict | None:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning(f"Failed to read version.json: {e}")
+        return None
+
+
+_build_info: BuildInfo | None = None
+
+
+def get_build_info() -> BuildInfo:
+    """Return the loaded build info (loading it on first use)."""
+    if _build_info is None:
+        return reload_build_info()
+    return _build_info
+
+
+def reload_build_info() -> BuildInfo:
+    """Re-read version.json and re-render the response bodies."""
+    global _build_info
+
+    _build_info = BuildInfo(_read_version_file(VERSION_FILE))
+    logger.info(f"Loaded build info: version={_build_info.version} commit={_build_info.commit}")
+    return _build_info
+
+
+def install_reload_handler() -> bool:
+    """
+    Reload build info on SIGHUP (call from the running event loop).
+
+    Returns:
+        bool: False where signal handlers are unavailable (Windows, non-main thread)
+    """
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_build_info)
+    except (NotImplementedError, RuntimeError, ValueError, AttributeError):
+        return False
+    return True
+
+
+def remove_reload_handler() -> None:
+    """Remove the SIGHUP handler installed by install_reload_handler."""
+    with contextlib.suppress(NotImplementedError, RuntimeError, ValueError, AttributeError):
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
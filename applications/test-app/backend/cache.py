@@ -0,0 +1,244 @@
+"""Read-through cache for greeting queries.
+
+Greetings only change through create_greeting (and the batch/write-behind
+paths), so listing results can be served from memory until a write touches
+them. Cached values are grouped into namespaces ('greetings' for the global
+listing, 'user:<name>' for one user); a write invalidates a namespace by giving
+it a new version, which makes every key cached under the old version
+unreachable without scanning for them. Concurrent misses for one versioned key
+share a single load, so a load that started before an invalidation is never
+handed to (and stored for) readers of the new version.
+
+Backends:
+- memory (default): per-process LRU with TTL expiry
+- redis: shared by every worker, so all of them see the same invalidations
+  (requires CACHE_REDIS_URL)
+"""
+
+import json
+import logging
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from config import settings
+from singleflight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Sentinel for "not cached" (None is a valid cached value, e.g. a missing counter)
+MISSING = object()
+
+# Namespace for the global greetings listing, feed and count
+GREETINGS_NAMESPACE = "greetings"
+
+
+class CacheBackend:
+    """Storage interface used by ReadThroughCache."""
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or MISSING."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        """Store a value that expires after ttl_seconds."""
+        raise NotImplementedError
+
+    def get_version(self, namespace: str) -> str | None:
+        """Return the namespace's current version, or None if it has none yet."""
+        raise NotImplementedError
+
+    def set_version(self, namespace: str, version: str) -> None:
+        """Set the namespace's version (invalidates keys cached under the old one)."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Drop every cached value and version."""
+        raise NotImplementedError
+
+
+class InMemoryBackend(CacheBackend):
+    """Thread-safe, size-bounded LRU with per-entry TTL (one per process)."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._versions: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_version(self, namespace: str) -> str | None:
+        with self._lock:
+            version = self._versions.get(namespace)
+            if version is not None:
+                self._versions.move_to_end(namespace)
+            return version
+
+    def set_version(self, namespace: str, version: str) -> None:
+        with self._lock:
+            self._versions[namespace] = version
+            self._versions.move_to_end(namespace)
+            # Versions are random, so an evicted namespace never reuses an old one
+            while len(self._versions) > self.max_entries:
+                self._versions.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class RedisBackend(CacheBackend):
+    """Shared backend on Redis; values are pickled (trusted, internal cache only)."""
+
+    def __init__(self, url: str, prefix: str = "greetings-cache:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the 'redis' package (pip install redis)"
+            ) from e
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any:
+        data = self._client.get(self.prefix + key)
+        return MISSING if data is None else pickle.loads(data)  # noqa: S301 - our own values
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self._client.set(self.prefix + key, pickle.dumps(value), px=int(ttl_seconds * 1000))
+
+    def get_version(self, namespace: str) -> str | None:
+        version = self._client.get(f"{self.prefix}version:{namespace}")
+        return None if version is None else version.decode()
+
+    def set_version(self, namespace: str, version: str) -> None:
+        self._client.set(f"{self.prefix}version:{namespace}", version)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=f"{self.prefix}*"):
+            self._client.delete(key)
+
+
+class ReadThroughCache:
+    """
+    Namespaced read-through cache.
+
+    get_or_load() returns the cached value for (namespace, key) or calls the
+    loader and caches its result; invalidate() makes a whole namespace miss.
+    Identical concurrent misses share one loader call (single-flight by
+    versioned key; by unversioned key when the cache is disabled).
+    Backend errors are logged and treated as misses, so a cache outage only
+    costs extra reads.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def _versioned_key(self, namespace: str, key: Any) -> str:
+        version = self.backend.get_version(namespace)
+        if version is None:
+            version = uuid.uuid4().hex
+            self.backend.set_version(namespace, version)
+        return f"{namespace}@{version}:{json.dumps(key, sort_keys=True, default=str)}"
+
+    def get_or_load(self, namespace: str, key: Any, loader: Callable[[], T]) -> T:
+        """Return the cached value for `key` in `namespace`, loading it on a miss."""
+        if not self.enabled:
+            # Nothing is stored, so coalescing by the unversioned key cannot persist stale data
+            flight_key = f"{namespace}:{json.dumps(key, sort_keys=True, default=str)}"
+            return self._flights.do(flight_key, loader)
+
+        try:
+            cache_key = self._versioned_key(namespace, key)
+            value = self.backend.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Cache read failed for namespace '{namespace}': {e}")
+            return loader()
+
+        if value is not MISSING:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        # Keyed by version: readers after an invalidation start their own load
+        return self._flights.do(cache_key, lambda: self._load(namespace, cache_key, loader))
+
+    def _load(self, namespace: str, cache_key: str, loader: Callable[[], T]) -> T:
+        value = loader()
+        try:
+            self.backend.set(cache_key, value, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Cache write failed for namespace '{namespace}': {e}")
+        return value
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Invalidate every key cached under the given namespaces."""
+        if not self.enabled:
+            return
+        for namespace in namespaces:
+            try:
+                self.backend.set_version(namespace, uuid.uuid4().hex)
+            except Exception as e:
+                logger.warning(f"Cache invalidation failed for namespace '{namespace}': {e}")
+
+    def clear(self) -> None:
+        """Drop everything and reset hit/miss counters."""
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, float]:
+        """Hit/miss counters and hit ratio."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_ratio": hits / total if total else 0.0}
+
+
+def create_backend() -> CacheBackend:
+    """Build the backend selected by CACHE_BACKEND."""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.CACHE_REDIS_URL)
+    if settings.CACHE_BACKEND != "memory":
+        logger.warning(f"Unknown CACHE_BACKEND '{settings.CACHE_BACKEND}', using memory")
+    return InMemoryBackend(settings.CACHE_MAX_ENTRIES)
+
+
+def user_namespace(user_name: str) -> str:
+    """Namespace for one user's greetings and count."""
+    return f"user:{user_name}"
@@ -60,6 +60,20 @@ class Settings(BaseSettings):
     API_VERSION: str = "1.0.0"
     API_V1_PREFIX: str = "/api/v1"
 
+    # Server (serve.py). SERVER_WORKERS=0 sizes workers from the cgroup CPU quota,
+    # but starts one while the cache or rate limiter uses a per-process memory backend.
+    # Keep-alive outlasts the load balancer's idle timeout (ALB: 60s) so the balancer,
+    # not the app, closes idle connections; the graceful timeout stays below the
+    # orchestrator's stop timeout (ECS: 30s) so in-flight requests finish first
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "0"))
+    SERVER_WORKERS_PER_CPU: float = float(os.getenv("SERVER_WORKERS_PER_CPU", "2"))
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))
+    SERVER_KEEPALIVE_SECONDS: int = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "75"))
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "25"))
+    SERVER_FORWARDED_ALLOW_IPS: str = os.getenv("SERVER_FORWARDED_ALLOW_IPS", "127.0.0.1")
+
     # CORS Configuration
     CORS_ORIGINS: str = os.getenv("CORS_ORIGINS", "http://localhost:3000")
     CORS_ALLOW_CREDENTIALS: bool = True
@@ -75,18 +89,145 @@ class Settings(BaseSettings):
     DATABASE_POOL_TIMEOUT: int = int(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
     DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", "3600"))
 
+    # DynamoDB thread pool used by async_database (keeps boto3 calls off the event loop)
+    DYNAMODB_EXECUTOR_WORKERS: int = int(os.getenv("DYNAMODB_EXECUTOR_WORKERS", "16"))
+    DYNAMODB_MAX_IN_FLIGHT: int = int(os.getenv("DYNAMODB_MAX_IN_FLIGHT", "64"))
+    DYNAMODB_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("DYNAMODB_QUEUE_TIMEOUT_SECONDS", "5"))
+
+    # Time-ordered greeting feed (GSI: feed_shard HASH, created_at RANGE)
+    # Raise FEED_SHARD_COUNT only if a single feed partition becomes write-hot.
+    FEED_INDEX_NAME: str = os.getenv("FEED_INDEX_NAME", "feed-index")
+    FEED_SHARD_COUNT: int = int(os.getenv("FEED_SHARD_COUNT", "1"))
+
+    # Global greeting count is split over this many counter items (summed on read)
+    # so concurrent creates do not conflict on one hot item. Only ever raise it.
+    GREETING_COUNTER_SHARD_COUNT: int = int(os.getenv("GREETING_COUNTER_SHARD_COUNT", "10"))
+
+    # Multi-user lookup (GET /api/greetings/users): max names per request and
+    # concurrent per-user GSI queries per request
+    GREETINGS_USERS_MAX_NAMES: int = int(os.getenv("GREETINGS_USERS_MAX_NAMES", "50"))
+    GREETINGS_USERS_CONCURRENCY: int = int(os.getenv("GREETINGS_USERS_CONCURRENCY", "10"))
+
+    # Batch ingestion (POST /api/greetings:batch, BatchWriteItem retries)
+    GREETINGS_BATCH_MAX_ITEMS: int = int(os.getenv("GREETINGS_BATCH_MAX_ITEMS", "100"))
+    DYNAMODB_BATCH_MAX_RETRIES: int = int(os.getenv("DYNAMODB_BATCH_MAX_RETRIES", "5"))
+    DYNAMODB_BATCH_BACKOFF_BASE_SECONDS: float = float(
+        os.getenv("DYNAMODB_BATCH_BACKOFF_BASE_SECONDS", "0.05")
+    )
+    DYNAMODB_BATCH_BACKOFF_MAX_SECONDS: float = float(
+        os.getenv("DYNAMODB_BATCH_BACKOFF_MAX_SECONDS", "2")
+    )
+
+    # Read-through cache for greeting queries (cache.py); CACHE_BACKEND: memory or redis.
+    # The memory backend is per process: other workers see writes after CACHE_TTL_SECONDS.
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_REDIS_URL: str = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+
+    # Write-behind buffer for create_greeting (opt-in; writes are acknowledged before flush)
+    DYNAMODB_WRITE_BEHIND_ENABLED: bool = (
+        os.getenv("DYNAMODB_WRITE_BEHIND_ENABLED", "false").lower() == "true"
+    )
+    DYNAMODB_WRITE_BUFFER_SIZE: int = int(os.getenv("DYNAMODB_WRITE_BUFFER_SIZE", "10000"))
+    DYNAMODB_WRITE_FLUSH_SIZE: int = int(os.getenv("DYNAMODB_WRITE_FLUSH_SIZE", "25"))
+    DYNAMODB_WRITE_FLUSH_INTERVAL_SECONDS: float = float(
+        os.getenv("DYNAMODB_WRITE_FLUSH_INTERVAL_SECONDS", "0.2")
+    )
+    DYNAMODB_WRITE_DRAIN_TIMEOUT_SECONDS: float = float(
+        os.getenv("DYNAMODB_WRITE_DRAIN_TIMEOUT_SECONDS", "10")
+    )
+
+    # Dependency health probing (/health/ready reads the latest background probe results)
+    HEALTH_PROBE_ENABLED: bool = os.getenv("HEALTH_PROBE_ENABLED", "true").lower() == "true"
+    HEALTH_PROBE_INTERVAL_SECONDS: float = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "15"))
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "3"))
+    HEALTH_PROBE_DEPENDENCIES: str = os.getenv(
+        "HEALTH_PROBE_DEPENDENCIES", "dynamodb,ssm,secretsmanager"
+    )
+    # SSM and Secrets Manager have env var fallbacks, so only DynamoDB gates readiness
+    HEALTH_READY_REQUIRED: str = os.getenv("HEALTH_READY_REQUIRED", "dynamodb")
+    # Probe targets (empty: the table-name parameter and the backend API key secret)
+    HEALTH_PROBE_SSM_PARAMETER: str = os.getenv("HEALTH_PROBE_SSM_PARAMETER", "")
+    HEALTH_PROBE_SECRET_ID: str = os.getenv("HEALTH_PROBE_SECRET_ID", "")
+
     # Security Configuration
     # SECRET_KEY is loaded dynamically from Secrets Manager or environment variable
     SECRET_KEY: str = _get_secret_key()
     ALLOWED_HOSTS: list[str] = os.getenv("ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
 
+    # Security response headers (empty value = header not sent)
+    SECURITY_HSTS: str = os.getenv("SECURITY_HSTS", "max-age=31536000; includeSubDomains")
+    SECURITY_CSP: str = os.getenv("SECURITY_CSP", "")
+
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+    # Requests allowed at once before the per-minute rate applies (0 = RATE_LIMIT_PER_MINUTE)
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "0"))
+    # Limits per validated X-API-Key. 0 (default): authenticated requests are
+    # limited per IP like the rest, since every caller sharing one key (the key
+    # the frontend proxy injects) would otherwise share a single bucket
+    RATE_LIMIT_API_KEY_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_API_KEY_PER_MINUTE", "0"))
+    RATE_LIMIT_API_KEY_BURST: int = int(os.getenv("RATE_LIMIT_API_KEY_BURST", "0"))
+    # Proxies (addresses or CIDR ranges, comma-separated) whose X-Forwarded-For is
+    # trusted for the client IP, e.g. the VPC range of the ALB. Empty: use the peer
+    RATE_LIMIT_TRUSTED_PROXIES: str = os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "")
+    # Idle buckets (refilled to full) are dropped from memory this often
+    RATE_LIMIT_EVICT_INTERVAL_SECONDS: float = float(
+        os.getenv("RATE_LIMIT_EVICT_INTERVAL_SECONDS", "60")
+    )
+    # Storage (ratelimit.py): memory (per process) or redis (shared by every worker
+    # and task; tokens are leased in batches of up to RATE_LIMIT_LEASE_SIZE)
+    RATE_LIMIT_STORAGE: str = os.getenv("RATE_LIMIT_STORAGE", "memory")
+    RATE_LIMIT_REDIS_URL: str = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    RATE_LIMIT_LEASE_SIZE: int = int(os.getenv("RATE_LIMIT_LEASE_SIZE", "10"))
+    RATE_LIMIT_LEASE_TTL_SECONDS: float = float(os.getenv("RATE_LIMIT_LEASE_TTL_SECONDS", "5"))
 
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    # Records are queued and written by a background thread (0 = write synchronously)
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_QUEUE_OVERFLOW: str = os.getenv("LOG_QUEUE_OVERFLOW", "drop")
+    LOG_BATCH_SIZE: int = int(os.getenv("LOG_BATCH_SIZE", "256"))
+    # Access log: one line per request; successful requests are sampled, while
+    # 5xx responses and requests slower than ACCESS_LOG_SLOW_MS are always logged
+    ACCESS_LOG_SAMPLE_RATE: float = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+    ACCESS_LOG_SLOW_MS: float = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+    ACCESS_LOG_EXCLUDE_PATHS: str = os.getenv(
+        "ACCESS_LOG_EXCLUDE_PATHS", "/health,/health/live,/health/ready"
+    )
+    ACCESS_LOG_ROUTE_LEVELS: str = os.getenv("ACCESS_LOG_ROUTE_LEVELS", "")
+
+    # Prometheus metrics (text format, unauthenticated) on METRICS_PATH of a separate
+    # listener: METRICS_PORT is not the container port the load balancer routes to,
+    # so only scrapers inside the VPC (security group permitting) reach it.
+    # Latency buckets: METRICS_LATENCY_BUCKETS, see metrics.py
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_HOST: str = os.getenv("METRICS_HOST", "0.0.0.0")
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "9100"))
+    METRICS_PATH: str = os.getenv("METRICS_PATH", "/metrics")
+
+    # Tracing (W3C traceparent): exporter "none" (default, off), "file" or "otlp"
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "none")
+    TRACING_FILE_PATH: str = os.getenv("TRACING_FILE_PATH", "/tmp/traces.jsonl")
+    TRACING_OTLP_ENDPOINT: str = os.getenv(
+        "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+    )
+    TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "test-app-backend")
+
+    # Per-request profiling: mode "off" (default, middleware not installed),
+    # "header" (requests with a valid X-Profile token signed with PROFILING_SECRET)
+    # or "always" (every request; local debugging only). Profiler "cprofile"
+    # writes .prof files, "sampling" writes flamegraph-ready collapsed stacks
+    PROFILING_MODE: str = os.getenv("PROFILING_MODE", "off")
+    PROFILING_SECRET: str = os.getenv("PROFILING_SECRET", "")
+    PROFILING_PROFILER: str = os.getenv("PROFILING_PROFILER", "cprofile")
+    PROFILING_OUTPUT_DIR: str = os.getenv("PROFILING_OUTPUT_DIR", "/tmp/profiles")
+    PROFILING_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "1"))
 
     # Testing
     TESTING: bool = os.getenv("TESTING", "false").lower() == "true"
@@ -100,5 +241,40 @@ class Settings(BaseSettings):
             return ["*"]
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    def get_health_probe_dependencies(self) -> list[str]:
+        """Parse probed dependency names from environment variable"""
+        return [name.strip() for name in self.HEALTH_PROBE_DEPENDENCIES.split(",") if name.strip()]
+
+    def get_health_ready_required(self) -> list[str]:
+        """Parse dependency names that must be healthy for readiness"""
+        return [name.strip() for name in self.HEALTH_READY_REQUIRED.split(",") if name.strip()]
+
+    def get_rate_limit_trusted_proxies(self) -> list[str]:
+        """Parse trusted proxy addresses/CIDR ranges from environment variable"""
+        return [
+            proxy.strip() for proxy in self.RATE_LIMIT_TRUSTED_PROXIES.split(",") if proxy.strip()
+        ]
+
+    def get_access_log_exclude_paths(self) -> list[str]:
+        """Parse paths left out of the access log from environment variable"""
+        return [path.strip() for path in self.ACCESS_LOG_EXCLUDE_PATHS.split(",") if path.strip()]
+
+    def get_access_log_route_levels(self) -> dict[str, str]:
+        """Parse "path-prefix=LEVEL" pairs for access log levels from environment variable"""
+        known = logging.getLevelNamesMapping()
+        levels = {}
+        for pair in self.ACCESS_LOG_ROUTE_LEVELS.split(","):
+            prefix, _, level = pair.partition("=")
+            if prefix.strip() and level.strip():
+                level = level.strip().upper()
+                if level not in known:
+                    logger.warning(
+                        f"Unknown log level {level!r} for {prefix.strip()!r} in "
+                        "ACCESS_LOG_ROUTE_LEVELS, using INFO"
+                    )
+                    level = "INFO"
+                levels[prefix.strip()] = level
+        return levels
+
 
 settings = Settings()
@@ -1,14 +1,25 @@
 """DynamoDB configuration and operations with error handling and monitoring."""
 
+import functools
+import inspect
 import logging
 import os
+import queue
+import random
+import threading
+import time
 import uuid
+import zlib
+from collections import Counter
 from datetime import UTC, datetime
 
-import boto3
+from boto3.dynamodb.types import TypeSerializer
 from botocore.exceptions import ClientError, NoCredentialsError
 
+from aws_clients import get_client, get_resource
+from cache import GREETINGS_NAMESPACE, ReadThroughCache, create_backend, user_namespace
 from config import settings
+from singleflight import singleflight
 
 
 logger = logging.getLogger(__name__)
@@ -18,6 +29,12 @@ dynamodb_client = None
 dynamodb_resource = None
 table_name = None
 database_available = False
+# Whether the time-ordered feed GSI exists, whether user-name-index is sorted by
+# created_at, and the last seen TableStatus (set from describe_table)
+feed_index_available = False
+user_index_sorted = False
+table_status = None
+USER_NAME_INDEX = "user-name-index"
 # DynamoDB Local endpoint (if configured)
 dynamodb_endpoint_url = os.getenv("DYNAMODB_ENDPOINT_URL")
 
@@ -33,7 +50,7 @@ def get_table_name_from_ssm(environment: str, table_key: str = "greetings") -> s
         Table name from SSM Parameter Store, or None if not found
     """
     try:
-        ssm_client = boto3.client("ssm", region_name=os.getenv("AWS_REGION", "us-east-1"))
+        ssm_client = get_client("ssm", region_name=os.getenv("AWS_REGION", "us-east-1"))
         parameter_name = f"/{environment}/dynamodb/{table_key}/table_name"
 
         response = ssm_client.get_parameter(Name=parameter_name)
@@ -50,6 +67,22 @@ def get_table_name_from_ssm(environment: str, table_key: str = "greetings") -> s
         return None
 
 
+def record_table_description(table_description: dict) -> None:
+    """Record the table status and optional GSI schema from describe_table (not availability)."""
+    global feed_index_available, user_index_sorted, table_status
+
+    table = table_description.get("Table", {})
+    table_status = table.get("TableStatus")
+    indexes = {index["IndexName"]: index for index in table.get("GlobalSecondaryIndexes", [])}
+    if settings.FEED_INDEX_NAME in indexes and not feed_index_available:
+        logger.info(f"Feed index '{settings.FEED_INDEX_NAME}' is available")
+    feed_index_available = settings.FEED_INDEX_NAME in indexes
+    # The Terraform-managed table keys user-name-index on user_name only (no sort key)
+    user_index_sorted = {"AttributeName": "created_at", "KeyType": "RANGE"} in indexes.get(
+        USER_NAME_INDEX, {}
+    ).get("KeySchema", [])
+
+
 # Initialize DynamoDB client
 try:
     # Get table name from SSM Parameter Store (preferred) or environment variable (fallback)
@@ -84,12 +117,13 @@ try:
         resource_config["aws_access_key_id"] = client_config["aws_access_key_id"]
         resource_config["aws_secret_access_key"] = client_config["aws_secret_access_key"]
 
-    dynamodb_client = boto3.client("dynamodb", **client_config)
-    dynamodb_resource = boto3.resource("dynamodb", **resource_config)
+    # Shared clients from the registry (pooled connections, adaptive retries)
+    dynamodb_client = get_client("dynamodb", **client_config)
+    dynamodb_resource = get_resource("dynamodb", **resource_config)
 
     # Verify table exists
     try:
-        dynamodb_client.describe_table(TableName=table_name)
+        record_table_description(dynamodb_client.describe_table(TableName=table_name))
         database_available = True
         logger.info(f"DynamoDB table '{table_name}' is available")
     except ClientError as e:
@@ -115,6 +149,7 @@ except Exception as e:
     database_available = False
 
 
+@singleflight
 def refresh_database_availability() -> bool:
     """
     Re-check whether the configured DynamoDB table exists.
@@ -129,7 +164,7 @@ def refresh_database_availability() -> bool:
         return False
 
     try:
-        dynamodb_client.describe_table(TableName=table_name)
+        record_table_description(dynamodb_client.describe_table(TableName=table_name))
         if not database_available:
             logger.info(f"DynamoDB table '{table_name}' is now available")
         database_available = True
@@ -197,6 +232,95 @@ class Greeting:
         )
 
 
+# Aggregate counter items live in the greetings table under a reserved id prefix.
+# They have no user_name attribute, so they never appear in the user-name-index GSI.
+# The global count is split over GREETING_COUNTER_SHARD_COUNT items (shard 0 keeps
+# the original single item's id) so concurrent creates do not conflict on one item.
+COUNTER_ID_PREFIX = "__counter__#"
+COUNTER_SORT_KEY = "__counter__"
+GLOBAL_COUNTER_ID = f"{COUNTER_ID_PREFIX}global"
+
+_serializer = TypeSerializer()
+
+
+class FeedIndexUnavailableError(RuntimeError):
+    """Raised when the feed GSI does not exist (callers fall back to a scan)."""
+
+
+def _feed_shard(greeting_id: str) -> str:
+    """Feed partition a greeting is written to (stable hash of its id)."""
+    return f"feed#{zlib.crc32(greeting_id.encode()) % max(settings.FEED_SHARD_COUNT, 1)}"
+
+
+def feed_shards() -> list[str]:
+    """All feed partitions, in shard order."""
+    return [f"feed#{n}" for n in range(max(settings.FEED_SHARD_COUNT, 1))]
+
+
+def _counter_key(user_name: str | None = None, shard: int = 0) -> dict:
+    """Primary key of a global counter shard, or of a user's counter item."""
+    if user_name is not None:
+        counter_id = f"{COUNTER_ID_PREFIX}user#{user_name}"
+    elif shard:
+        counter_id = f"{GLOBAL_COUNTER_ID}#{shard}"
+    else:
+        counter_id = GLOBAL_COUNTER_ID
+    return {"id": counter_id, "created_at": COUNTER_SORT_KEY}
+
+
+def _global_counter_shards() -> int:
+    return max(settings.GREETING_COUNTER_SHARD_COUNT, 1)
+
+
+def _global_counter_key() -> dict:
+    """Key of a random global counter shard to add to."""
+    return _counter_key(shard=random.randrange(_global_counter_shards()))
+
+
+def _serialize(item: dict) -> dict:
+    """Convert a plain item to DynamoDB attribute-value format (low-level client)."""
+    return {key: _serializer.serialize(value) for key, value in item.items()}
+
+
+# Read-through cache for greeting queries (see cache.py); writes invalidate namespaces
+greeting_cache = ReadThroughCache(
+    create_backend(), settings.CACHE_TTL_SECONDS, enabled=settings.CACHE_ENABLED
+)
+
+
+def _cached(namespace_for):
+    """
+    Serve a read function through greeting_cache.
+
+    `namespace_for` maps the call's bound arguments to the cache namespace that
+    writes invalidate; the key is the function name plus all arguments. The
+    cache also coalesces identical concurrent calls, so cached reads must not
+    be wrapped in @singleflight (its flights are not keyed by namespace version).
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return greeting_cache.get_or_load(
+                namespace_for(bound.arguments),
+                [func.__name__, bound.arguments],
+                lambda: func(*args, **kwargs),
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def _invalidate_greetings(user_names) -> None:
+    """Invalidate cached listings after greetings were written for `user_names`."""
+    greeting_cache.invalidate(GREETINGS_NAMESPACE, *(user_namespace(name) for name in user_names))
+
+
 # =============================================================================
 # Database Operations
 # =============================================================================
@@ -258,6 +382,13 @@ def create_greeting(user_name: str, message: str) -> Greeting:
     """
     Create a new greeting in DynamoDB.
 
+    The greeting and the global/per-user counter increments are written in one
+    transaction, so counts read by get_greeting_count stay exact. The global
+    increment goes to a random counter shard, so concurrent transactions only
+    conflict when they share a user or a shard. With
+    DYNAMODB_WRITE_BEHIND_ENABLED the greeting is queued in the write buffer
+    instead and written by its background flush.
+
     Args:
         user_name: Name of the user
         message: Greeting message
@@ -268,7 +399,7 @@ def create_greeting(user_name: str, message: str) -> Greeting:
     Raises:
         ClientError: If DynamoDB operation fails
     """
-    if not ensure_database_available() or dynamodb_resource is None or table_name is None:
+    if not ensure_database_available() or dynamodb_client is None or table_name is None:
         raise RuntimeError("DynamoDB is not available")
 
     greeting = Greeting(
@@ -277,26 +408,321 @@ def create_greeting(user_name: str, message: str) -> Greeting:
         message=message,
     )
 
-    table = dynamodb_resource.Table(table_name)
-    try:
-        table.put_item(Item=greeting.to_dict())
-        logger.info(f"Created greeting: {greeting.id} for user: {user_name}")
+    # Write-behind mode: acknowledge once buffered; a full buffer falls back to a direct write
+    if write_buffer is not None and write_buffer.submit(greeting):
+        logger.debug(f"Buffered greeting: {greeting.id} for user: {user_name}")
         return greeting
+
+    # feed_shard places the greeting in the time-ordered feed GSI
+    item = {**greeting.to_dict(), "feed_shard": _feed_shard(greeting.id)}
+    increment = {
+        "UpdateExpression": "ADD greeting_count :one",
+        "ExpressionAttributeValues": {":one": {"N": "1"}},
+    }
+    try:
+        dynamodb_client.transact_write_items(
+            TransactItems=[
+                {"Put": {"TableName": table_name, "Item": _serialize(item)}},
+                {
+                    "Update": {
+                        "TableName": table_name,
+                        "Key": _serialize(_global_counter_key()),
+                        **increment,
+                    }
+                },
+                {
+                    "Update": {
+                        "TableName": table_name,
+                        "Key": _serialize(_counter_key(user_name)),
+                        **increment,
+                    }
+                },
+            ]
+        )
     except ClientError as e:
         logger.error(f"Error creating greeting in DynamoDB: {e}")
         raise
 
+    _invalidate_greetings([user_name])
+    logger.info(f"Created greeting: {greeting.id} for user: {user_name}")
+    return greeting
+
 
-def get_greetings(skip: int = 0, limit: int = 10) -> tuple[list[Greeting], int]:
+# BatchWriteItem accepts at most 25 put/delete requests per call
+BATCH_WRITE_MAX_ITEMS = 25
+
+
+def _batch_write_chunk(items: list[dict]) -> list[dict]:
     """
-    Get all greetings with pagination.
+    Write up to 25 items with BatchWriteItem, retrying UnprocessedItems.
+
+    Retries use exponential backoff with full jitter so throttled writers do not
+    retry in lockstep.
+
+    Returns:
+        list: Items still unprocessed after DYNAMODB_BATCH_MAX_RETRIES retries
+
+    Raises:
+        ClientError: If the BatchWriteItem call itself fails
+    """
+    requests = [{"PutRequest": {"Item": _serialize(item)}} for item in items]
+
+    for attempt in range(settings.DYNAMODB_BATCH_MAX_RETRIES + 1):
+        if attempt:
+            delay = min(
+                settings.DYNAMODB_BATCH_BACKOFF_MAX_SECONDS,
+                settings.DYNAMODB_BATCH_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1),
+            )
+            time.sleep(random.uniform(0, delay))
+
+        response = dynamodb_client.batch_write_item(RequestItems={table_name: requests})
+        requests = response.get("UnprocessedItems", {}).get(table_name, [])
+        if not requests:
+            return []
+        logger.warning(
+            f"BatchWriteItem left {len(requests)} unprocessed items (attempt {attempt + 1})"
+        )
+
+    unprocessed_ids = {request["PutRequest"]["Item"]["id"]["S"] for request in requests}
+    return [item for item in items if item["id"] in unprocessed_ids]
+
+
+def _increment_counters(counts: dict[str, int]) -> None:
+    """Add per-user greeting counts (and their sum to the global counter) with UpdateItem ADD."""
+    updates = [(_global_counter_key(), sum(counts.values()))]
+    updates += [(_counter_key(user_name), count) for user_name, count in counts.items()]
+    for key, count in updates:
+        dynamodb_client.update_item(
+            TableName=table_name,
+            Key=_serialize(key),
+            UpdateExpression="ADD greeting_count :count",
+            ExpressionAttributeValues={":count": {"N": str(count)}},
+        )
+
+
+def create_greetings_batch(entries: list[tuple[str, str]]) -> list[tuple[Greeting, str | None]]:
+    """
+    Create many greetings with BatchWriteItem (25 items per call).
+
+    BatchWriteItem cannot carry counter updates, so counters are incremented
+    with one UpdateItem per distinct user after the writes (not transactional:
+    a failed counter update is logged and leaves the count short).
 
     Args:
-        skip: Number of items to skip
-        limit: Maximum number of items to return
+        entries: (user_name, message) pairs
+
+    Returns:
+        list: (greeting, error message or None) per entry, in input order
+
+    Raises:
+        RuntimeError: If DynamoDB is not available
+    """
+    if not ensure_database_available() or dynamodb_client is None or table_name is None:
+        raise RuntimeError("DynamoDB is not available")
+
+    greetings = [
+        Greeting(id=str(uuid.uuid4()), user_name=user_name, message=message)
+        for user_name, message in entries
+    ]
+    errors = _write_greetings(greetings)
+
+    logger.info(f"Batch created {len(greetings) - len(errors)}/{len(greetings)} greetings")
+    return [(g, errors.get(g.id)) for g in greetings]
+
+
+def _write_greetings(greetings: list[Greeting]) -> dict[str, str]:
+    """
+    Write greetings in BatchWriteItem chunks, then bump their counters.
+
+    Returns:
+        dict: Error message per greeting id that was not written
+    """
+    errors: dict[str, str] = {}
+
+    for start in range(0, len(greetings), BATCH_WRITE_MAX_ITEMS):
+        chunk = greetings[start : start + BATCH_WRITE_MAX_ITEMS]
+        items = [{**g.to_dict(), "feed_shard": _feed_shard(g.id)} for g in chunk]
+        try:
+            for item in _batch_write_chunk(items):
+                errors[item["id"]] = "Write throttled, retries exhausted"
+        except ClientError as e:
+            logger.error(f"Error batch writing greetings to DynamoDB: {e}")
+            for g in chunk:
+                errors[g.id] = "Database error occurred"
+
+    written = Counter(g.user_name for g in greetings if g.id not in errors)
+    if written:
+        try:
+            _increment_counters(written)
+        except ClientError as e:
+            logger.error(f"Error updating greeting counters after batch write: {e}")
+        _invalidate_greetings(written)
+
+    return errors
+
+
+class GreetingWriteBuffer:
+    """
+    Bounded write-behind buffer for greetings (opt-in, DYNAMODB_WRITE_BEHIND_ENABLED).
+
+    submit() appends to an in-memory queue and returns immediately; a background
+    thread flushes the queue in BatchWriteItem groups whenever FLUSH_SIZE items
+    are waiting or FLUSH_INTERVAL elapses. Failed writes are re-queued while the
+    buffer is running. drain() flushes what is left (called on shutdown) and
+    closes the buffer: later submit() calls return False so callers write directly.
+
+    Buffered greetings are acknowledged before they are durable and become
+    readable only after the next flush.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.DYNAMODB_WRITE_BUFFER_SIZE,
+        flush_size: int = settings.DYNAMODB_WRITE_FLUSH_SIZE,
+        flush_interval_seconds: float = settings.DYNAMODB_WRITE_FLUSH_INTERVAL_SECONDS,
+    ):
+        self.flush_size = flush_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: queue.Queue[Greeting] = queue.Queue(maxsize=max_size)
+        self._stopping = threading.Event()
+        self._closed = False
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued_total": 0,
+            "flushed_total": 0,
+            "requeued_total": 0,
+            "dropped_total": 0,
+            "flush_count": 0,
+            "last_flush_ms": 0.0,
+            "flush_ms_total": 0.0,
+        }
+
+    def start(self) -> None:
+        """Start the flush thread (no-op if already running or drained)."""
+        with self._lock:
+            if self._closed or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="greeting-write-buffer", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, greeting: Greeting) -> bool:
+        """Enqueue a greeting; return False if the buffer is full or drained."""
+        self.start()
+        with self._lock:
+            # Checked under the lock so nothing is queued after drain() closes the buffer
+            if self._closed:
+                return False
+            try:
+                self._queue.put_nowait(greeting)
+            except queue.Full:
+                return False
+            self._stats["enqueued_total"] += 1
+        return True
+
+    def drain(self, timeout: float = settings.DYNAMODB_WRITE_DRAIN_TIMEOUT_SECONDS) -> None:
+        """Stop accepting submits and re-queues, flush everything buffered and stop the thread."""
+        with self._lock:
+            self._closed = True
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.error(
+                    f"Write buffer drain timed out with {self._queue.qsize()} greetings pending"
+                )
+
+    def stats(self) -> dict:
+        """Queue depth and flush latency metrics."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_flush_ms"] = (
+            stats["flush_ms_total"] / stats["flush_count"] if stats["flush_count"] else 0.0
+        )
+        return stats
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+            elif self._stopping.is_set():
+                return
+
+    def _collect(self) -> list[Greeting]:
+        batch: list[Greeting] = []
+        deadline = time.monotonic() + self.flush_interval_seconds
+        while len(batch) < self.flush_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: list[Greeting]) -> None:
+        started = time.perf_counter()
+        try:
+            errors = _write_greetings(batch)
+        except Exception as e:
+            logger.error(f"Unexpected error flushing write buffer: {e}", exc_info=True)
+            errors = {g.id: str(e) for g in batch}
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        requeued = dropped = 0
+        for greeting in batch:
+            if greeting.id not in errors:
+                continue
+            if not self._stopping.is_set():
+                try:
+                    self._queue.put_nowait(greeting)
+                    requeued += 1
+                    continue
+                except queue.Full:
+                    pass
+            dropped += 1
+            logger.error(f"Dropped buffered greeting {greeting.id}: {errors[greeting.id]}")
+
+        with self._lock:
+            self._stats["flushed_total"] += len(batch) - len(errors)
+            self._stats["requeued_total"] += requeued
+            self._stats["dropped_total"] += dropped
+            self._stats["flush_count"] += 1
+            self._stats["last_flush_ms"] = elapsed_ms
+            self._stats["flush_ms_total"] += elapsed_ms
+
+        if requeued:
+            # Back off before retrying writes that just failed
+            self._stopping.wait(self.flush_interval_seconds)
+
+
+write_buffer = GreetingWriteBuffer() if settings.DYNAMODB_WRITE_BEHIND_ENABLED else None
+
+
+@_cached(
+    lambda args: GREETINGS_NAMESPACE
+    if args["user_name"] is None
+    else user_namespace(args["user_name"])
+)
+def get_greeting_count(user_name: str | None = None) -> int | None:
+    """
+    Read the maintained greeting count (one GetItem, or one BatchGetItem of the
+    global counter shards).
+
+    Args:
+        user_name: User whose count to read, or None for the global count
 
     Returns:
-        tuple: (list of greetings, total count)
+        int | None: Count, or None if no counter item exists yet (e.g., greetings
+        written before counters were introduced and not yet backfilled, see
+        backfill_greeting_counters)
 
     Raises:
         ClientError: If DynamoDB operation fails
@@ -304,46 +730,440 @@ def get_greetings(skip: int = 0, limit: int = 10) -> tuple[list[Greeting], int]:
     if not ensure_database_available() or dynamodb_resource is None or table_name is None:
         raise RuntimeError("DynamoDB is not available")
 
+    if user_name is None:
+        try:
+            shards = _read_counters(
+                [_counter_key(shard=n) for n in range(_global_counter_shards())]
+            )
+        except ClientError as e:
+            logger.error(f"Error reading greeting count from DynamoDB: {e}")
+            raise
+        return sum(shards.values()) if shards else None
+
     table = dynamodb_resource.Table(table_name)
+    try:
+        response = table.get_item(
+            Key=_counter_key(user_name), ProjectionExpression="greeting_count"
+        )
+    except ClientError as e:
+        logger.error(f"Error reading greeting count from DynamoDB: {e}")
+        raise
+
+    item = response.get("Item")
+    if item is None:
+        return None
+    return int(item.get("greeting_count", 0))
+
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+
+
+@singleflight
+def get_greeting_counts(user_names: list[str]) -> dict[str, int | None]:
+    """
+    Read several users' maintained greeting counts with BatchGetItem.
+
+    Args:
+        user_names: Users whose counts to read
+
+    Returns:
+        dict: Count per user, None where no counter item exists yet
+
+    Raises:
+        ClientError: If DynamoDB operation fails
+    """
+    if not ensure_database_available() or dynamodb_resource is None or table_name is None:
+        raise RuntimeError("DynamoDB is not available")
 
+    counts: dict[str, int | None] = dict.fromkeys(user_names)
     try:
-        # Scan table (for small datasets, consider using Query with GSI for better performance)
-        # Note: Scan is expensive for large tables - consider pagination with LastEvaluatedKey
-        response = table.scan(
-            Limit=limit + skip,  # Get more items to account for skip
+        found = _read_counters([_counter_key(name) for name in counts])
+    except ClientError as e:
+        logger.error(f"Error batch reading greeting counts from DynamoDB: {e}")
+        raise
+
+    for name in counts:
+        counts[name] = found.get(_counter_key(name)["id"])
+    return counts
+
+
+def _read_counters(keys: list[dict]) -> dict[str, int]:
+    """Read counter items with BatchGetItem; returns greeting_count by id for items that exist."""
+    found: dict[str, int] = {}
+    for start in range(0, len(keys), BATCH_GET_MAX_KEYS):
+        request_items = {
+            table_name: {
+                "Keys": keys[start : start + BATCH_GET_MAX_KEYS],
+                "ProjectionExpression": "id, greeting_count",
+            }
+        }
+        while request_items:
+            response = dynamodb_resource.batch_get_item(RequestItems=request_items)
+            for item in response.get("Responses", {}).get(table_name, []):
+                found[item["id"]] = int(item.get("greeting_count", 0))
+            request_items = response.get("UnprocessedKeys") or {}
+    return found
+
+
+def backfill_greeting_counters() -> dict[str, int]:
+    """
+    Rebuild the global and per-user counter items from a full table scan.
+
+    One-off for greetings written before counters existed (their counts are
+    otherwise missing, or short once a new write creates the counter item).
+    Counters are overwritten, so run it while greeting writes are paused:
+
+        python -c "import database; database.backfill_greeting_counters()"
+
+    Returns:
+        dict: Greeting count per user
+
+    Raises:
+        ClientError: If DynamoDB operation fails
+    """
+    if not ensure_database_available() or dynamodb_resource is None or table_name is None:
+        raise RuntimeError("DynamoDB is not available")
+
+    table = dynamodb_resource.Table(table_name)
+    counts: Counter[str] = Counter()
+    scan_kwargs = {
+        "ProjectionExpression": "user_name",
+        "FilterExpression": "NOT begins_with(#id, :counter_prefix)",
+        "ExpressionAttributeNames": {"#id": "id"},
+        "ExpressionAttributeValues": {":counter_prefix": COUNTER_ID_PREFIX},
+    }
+    while True:
+        response = table.scan(**scan_kwargs)
+        counts.update(
+            item["user_name"] for item in response.get("Items", []) if "user_name" in item
         )
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    # The whole global count goes to shard 0; the other shards restart at zero
+    totals = [(_counter_key(shard=n), 0) for n in range(_global_counter_shards())]
+    totals[0] = (_counter_key(), sum(counts.values()))
+    totals += [(_counter_key(user_name), count) for user_name, count in counts.items()]
+    with table.batch_writer() as batch:
+        for key, count in totals:
+            batch.put_item(Item={**key, "greeting_count": count})
+
+    greeting_cache.clear()
+    logger.info(
+        f"Backfilled greeting counters: {sum(counts.values())} greetings, {len(counts)} users"
+    )
+    return dict(counts)
+
 
-        items = response.get("Items", [])
+def backfill_feed_shards() -> int:
+    """
+    Stamp feed_shard on greetings that lack it, so they appear in the feed index.
 
-        # Apply skip and limit manually (DynamoDB doesn't support offset natively)
-        # For production, use LastEvaluatedKey for proper pagination
-        items = items[skip : skip + limit]
+    One-off for greetings written before the feed index existed (or after a
+    FEED_SHARD_COUNT change, whose old shards are no longer read). Each item is
+    updated only if its shard differs from the current one, so it is safe to
+    re-run and to run while greeting writes continue:
 
-        greetings = [Greeting.from_dict(item) for item in items]
+        python -c "import database; database.backfill_feed_shards()"
+
+    Returns:
+        int: Number of greetings updated
+
+    Raises:
+        ClientError: If DynamoDB operation fails
+    """
+    if not ensure_database_available() or dynamodb_resource is None or table_name is None:
+        raise RuntimeError("DynamoDB is not available")
 
-        # Get total count (approximate for large tables)
-        # For exact count, use a separate count operation or maintain count in separate item
-        # Note: Scan with Select="COUNT" returns approximate count for large tables
-        # For now, use the count from the scan response
-        total_count = response.get("Count", 0)
+    table = dynamodb_resource.Table(table_name)
+    updated = 0
+    scan_kwargs = {
+        "ProjectionExpression": "#id, created_at, feed_shard",
+        "FilterExpression": "NOT begins_with(#id, :counter_prefix)",
+        "ExpressionAttributeNames": {"#id": "id"},
+        "ExpressionAttributeValues": {":counter_prefix": COUNTER_ID_PREFIX},
+    }
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get("Items", []):
+            shard = _feed_shard(item["id"])
+            if item.get("feed_shard") == shard:
+                continue
+            try:
+                table.update_item(
+                    Key={"id": item["id"], "created_at": item["created_at"]},
+                    UpdateExpression="SET feed_shard = :shard",
+                    # Never recreate a greeting deleted since the scan
+                    ConditionExpression="attribute_exists(#id)",
+                    ExpressionAttributeNames={"#id": "id"},
+                    ExpressionAttributeValues={":shard": shard},
+                )
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                    raise
+                continue
+            updated += 1
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    greeting_cache.invalidate(GREETINGS_NAMESPACE)
+    logger.info(f"Backfilled feed_shard on {updated} greetings")
+    return updated
+
+
+def _scan_items(table, limit: int, start_key: dict | None = None, **scan_kwargs) -> tuple[list[dict], dict | None]:
+    """
+    Scan up to `limit` greeting items starting after `start_key`, following LastEvaluatedKey.
 
-        # If there are more items, we need to paginate (for now, return approximate count)
-        # In production, consider maintaining a separate count item or using a more efficient method
-        return greetings, total_count
+    Scan pages are capped at 1 MB, so a single call can return fewer items than
+    requested; keep reading until the limit is met or the table is exhausted.
+
+    Returns:
+        tuple: (items, LastEvaluatedKey or None if the table is exhausted)
+    """
+    items: list[dict] = []
+    last_key = start_key
+
+    # Skip aggregate counter items (Limit applies before the filter, hence the loop)
+    filter_expression = "NOT begins_with(#id, :counter_prefix)"
+    if "FilterExpression" in scan_kwargs:
+        filter_expression = f"({scan_kwargs['FilterExpression']}) AND {filter_expression}"
+    scan_kwargs["FilterExpression"] = filter_expression
+    scan_kwargs["ExpressionAttributeNames"] = {
+        **scan_kwargs.get("ExpressionAttributeNames", {}),
+        "#id": "id",
+    }
+    scan_kwargs["ExpressionAttributeValues"] = {
+        **scan_kwargs.get("ExpressionAttributeValues", {}),
+        ":counter_prefix": COUNTER_ID_PREFIX,
+    }
+
+    while True:
+        kwargs = dict(scan_kwargs, Limit=limit - len(items))
+        if last_key:
+            kwargs["ExclusiveStartKey"] = last_key
+        response = table.scan(**kwargs)
+        items.extend(response.get("Items", []))
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key or len(items) >= limit:
+            return items, last_key
+
+
+@_cached(lambda args: GREETINGS_NAMESPACE)
+def get_greetings(
+    skip: int = 0, limit: int = 10, start_key: dict | None = None
+) -> tuple[list[Greeting], int, dict | None]:
+    """
+    Get all greetings with key-based pagination.
+
+    Pass the LastEvaluatedKey of the previous page as `start_key` to continue a
+    listing; each page only reads the items it returns. `skip` is kept for
+    backward compatibility: skipped items are walked with a key-only
+    projection and discarded (ignored when `start_key` is given).
+
+    Args:
+        skip: Number of items to skip (compatibility, only without start_key)
+        limit: Maximum number of items to return
+        start_key: ExclusiveStartKey to resume from (from a previous page)
+
+    Returns:
+        tuple: (list of greetings, total count, LastEvaluatedKey or None)
+
+    Raises:
+        ClientError: If DynamoDB operation fails
+    """
+    if not ensure_database_available() or dynamodb_resource is None or table_name is None:
+        raise RuntimeError("DynamoDB is not available")
+
+    table = dynamodb_resource.Table(table_name)
+
+    try:
+        skipped = 0
+        if start_key is None and skip > 0:
+            # Walk past skipped items reading keys only
+            skipped_items, start_key = _scan_items(
+                table,
+                skip,
+                ProjectionExpression="#id, #created_at",
+                ExpressionAttributeNames={"#id": "id", "#created_at": "created_at"},
+            )
+            skipped = len(skipped_items)
+            if start_key is None:
+                total = get_greeting_count()
+                return [], skipped if total is None else total, None
+
+        items, last_key = _scan_items(table, limit, start_key)
+        greetings = [Greeting.from_dict(item) for item in items]
+
+        total = get_greeting_count()
+        if total is None:
+            # No counter item yet: fall back to the number of items read
+            total = skipped + len(greetings)
+        return greetings, total, last_key
     except ClientError as e:
         logger.error(f"Error getting greetings from DynamoDB: {e}")
         raise
 
 
-def get_user_greetings(user_name: str) -> list[Greeting]:
+def _query_items(table, limit: int, start_key: dict | None = None, **query_kwargs) -> tuple[list[dict], dict | None]:
+    """Query up to `limit` items starting after `start_key`, following LastEvaluatedKey."""
+    items: list[dict] = []
+    last_key = start_key
+
+    while True:
+        kwargs = dict(query_kwargs, Limit=limit - len(items))
+        if last_key:
+            kwargs["ExclusiveStartKey"] = last_key
+        response = table.query(**kwargs)
+        items.extend(response.get("Items", []))
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key or len(items) >= limit:
+            return items, last_key
+
+
+def _read_feed(
+    table, limit: int, positions: dict[str, dict | None], **query_kwargs
+) -> tuple[list[dict], dict[str, dict | None]]:
+    """
+    Read the newest `limit` items across feed shards, merged newest-first.
+
+    `positions` maps each unfinished shard to its ExclusiveStartKey (None = from
+    the newest item). Every shard is read until it holds `limit` items or is
+    exhausted, so the merged prefix is exact. Returns the merged items and the
+    positions to resume from; exhausted shards are dropped.
+    """
+    candidates: list[tuple[str, dict]] = []
+    shard_more: dict[str, bool] = {}
+
+    for shard, start_key in positions.items():
+        items, last_key = _query_items(
+            table,
+            limit,
+            start_key,
+            IndexName=settings.FEED_INDEX_NAME,
+            KeyConditionExpression="feed_shard = :shard",
+            ExpressionAttributeValues={":shard": shard},
+            ScanIndexForward=False,
+            **query_kwargs,
+        )
+        candidates.extend((shard, item) for item in items)
+        shard_more[shard] = last_key is not None
+
+    candidates.sort(key=lambda candidate: candidate[1]["created_at"], reverse=True)
+    taken = candidates[:limit]
+
+    next_positions = dict(positions)
+    for shard, item in taken:
+        next_positions[shard] = {
+            "id": item["id"],
+            "created_at": item["created_at"],
+            "feed_shard": shard,
+        }
+    fetched = Counter(shard for shard, _ in candidates)
+    consumed = Counter(shard for shard, _ in taken)
+    for shard in positions:
+        if fetched[shard] == consumed[shard] and not shard_more[shard]:
+            del next_positions[shard]
+
+    return [item for _, item in taken], next_positions
+
+
+@_cached(lambda args: GREETINGS_NAMESPACE)
+def get_recent_greetings(
+    limit: int = 10, skip: int = 0, positions: dict[str, dict | None] | None = None
+) -> tuple[list[Greeting], int, dict[str, dict | None] | None]:
+    """
+    Get the newest greetings from the time-ordered feed index.
+
+    With the default single feed shard this is one Query(ScanIndexForward=False)
+    per page; with FEED_SHARD_COUNT > 1 one query per shard is merged.
+
+    Args:
+        limit: Maximum number of items to return
+        skip: Number of items to skip (compatibility, only without positions)
+        positions: Per-shard resume keys from a previous page
+
+    Returns:
+        tuple: (list of greetings, total count, per-shard positions or None when exhausted)
+
+    Raises:
+        FeedIndexUnavailableError: If the feed GSI does not exist
+        ClientError: If DynamoDB operation fails
+    """
+    if not ensure_database_available() or dynamodb_resource is None or table_name is None:
+        raise RuntimeError("DynamoDB is not available")
+    if not feed_index_available:
+        raise FeedIndexUnavailableError(f"Feed index '{settings.FEED_INDEX_NAME}' not found")
+
+    table = dynamodb_resource.Table(table_name)
+
+    try:
+        if positions is None:
+            positions = dict.fromkeys(feed_shards())
+            if skip > 0:
+                # Walk past skipped items reading keys only
+                _, positions = _read_feed(
+                    table,
+                    skip,
+                    positions,
+                    ProjectionExpression="#id, created_at, feed_shard",
+                    ExpressionAttributeNames={"#id": "id"},
+                )
+
+        items: list[dict] = []
+        if positions:
+            items, positions = _read_feed(table, limit, positions)
+        greetings = [Greeting.from_dict(item) for item in items]
+
+        total = get_greeting_count()
+        return greetings, len(greetings) if total is None else total, positions or None
+    except ClientError as e:
+        logger.error(f"Error reading greeting feed from DynamoDB: {e}")
+        raise
+
+
+# Attributes a list view needs (ProjectionExpression for summary reads)
+USER_GREETINGS_SUMMARY_ATTRIBUTES = ("id", "user_name", "created_at")
+
+
+def _projection_kwargs(attributes: tuple[str, ...] | list[str] | None) -> dict:
+    """Build ProjectionExpression kwargs, using name placeholders to avoid reserved words."""
+    if not attributes:
+        return {}
+    names = {f"#p{n}": attribute for n, attribute in enumerate(attributes)}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
+    }
+
+
+@_cached(lambda args: user_namespace(args["user_name"]))
+def get_user_greetings(
+    user_name: str,
+    limit: int = 100,
+    start_key: dict | None = None,
+    attributes: tuple[str, ...] | list[str] | None = None,
+) -> tuple[list[Greeting], dict | None]:
     """
-    Get all greetings for a specific user using GSI.
+    Get a page of a user's greetings, newest first, using the user-name-index GSI.
+
+    When the index has created_at as its sort key (scripts/init-dynamodb-local.sh)
+    pages are newest first across the whole listing. The Terraform-managed index
+    is keyed on user_name only, so there pages come in index order and are sorted
+    newest first within the page, as in the scan fallback. Only `limit` items
+    are held in memory; continue with the returned LastEvaluatedKey as `start_key`.
 
     Args:
         user_name: Name of the user
+        limit: Maximum number of greetings to return
+        start_key: LastEvaluatedKey of the previous page, if any
+        attributes: Attributes to read (e.g., USER_GREETINGS_SUMMARY_ATTRIBUTES); all if None
 
     Returns:
-        list: List of greetings for the user
+        tuple: (greetings, LastEvaluatedKey or None on the last page)
 
     Raises:
         ClientError: If DynamoDB operation fails
@@ -355,17 +1175,22 @@ def get_user_greetings(user_name: str) -> list[Greeting]:
 
     try:
         # Query using GSI on user_name
-        response = table.query(
-            IndexName="user-name-index",
+        items, last_key = _query_items(
+            table,
+            limit,
+            start_key,
+            IndexName=USER_NAME_INDEX,
             KeyConditionExpression="user_name = :user_name",
             ExpressionAttributeValues={":user_name": user_name},
+            ScanIndexForward=False,
+            **_projection_kwargs(attributes),
         )
-
-        items = response.get("Items", [])
-        greetings = [Greeting.from_dict(item) for item in items]
+        if not user_index_sorted:
+            items.sort(key=lambda item: item.get("created_at", ""), reverse=True)
+        greetings = [Greeting.from_dict({"user_name": user_name, **item}) for item in items]
 
         logger.info(f"Found {len(greetings)} greetings for user: {user_name}")
-        return greetings
+        return greetings, last_key
     except ClientError as e:
         error_code = e.response.get("Error", {}).get("Code", "")
         if error_code == "ResourceNotFoundException":
@@ -374,27 +1199,36 @@ def get_user_greetings(user_name: str) -> list[Greeting]:
                 "Falling back to scan (less efficient)."
             )
             # Fallback to scan if GSI doesn't exist
-            return _get_user_greetings_scan(user_name)
+            return _get_user_greetings_scan(user_name, limit, start_key, attributes)
         logger.error(f"Error getting user greetings from DynamoDB: {e}")
         raise
 
 
-def _get_user_greetings_scan(user_name: str) -> list[Greeting]:
-    """Fallback method using scan (less efficient)."""
+def _get_user_greetings_scan(
+    user_name: str,
+    limit: int = 100,
+    start_key: dict | None = None,
+    attributes: tuple[str, ...] | list[str] | None = None,
+) -> tuple[list[Greeting], dict | None]:
+    """Fallback method using scan (less efficient, pages are in table order)."""
     if not ensure_database_available() or dynamodb_resource is None or table_name is None:
         raise RuntimeError("DynamoDB is not available")
 
     table = dynamodb_resource.Table(table_name)
 
     try:
-        response = table.scan(
+        items, last_key = _scan_items(
+            table,
+            limit,
+            start_key,
             FilterExpression="user_name = :user_name",
             ExpressionAttributeValues={":user_name": user_name},
+            **_projection_kwargs(attributes),
         )
-
-        items = response.get("Items", [])
-        greetings = [Greeting.from_dict(item) for item in items]
-        return greetings
+        # Newest first within the page
+        items.sort(key=lambda item: item.get("created_at", ""), reverse=True)
+        greetings = [Greeting.from_dict({"user_name": user_name, **item}) for item in items]
+        return greetings, last_key
     except ClientError as e:
         logger.error(f"Error scanning for user greetings: {e}")
         raise
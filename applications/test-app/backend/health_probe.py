@@ -0,0 +1,188 @@
+"""Background dependency prober for readiness checks.
+
+/health is polled by the ALB, the Docker HEALTHCHECK and docker-compose. If
+each poll called AWS, API traffic would grow with the number and frequency of
+health checkers. Instead, a background task probes DynamoDB, SSM and Secrets
+Manager every HEALTH_PROBE_INTERVAL_SECONDS and stores the results. /health/ready
+only reads the last results, so serving it never makes a network call.
+
+A dependency counts as reachable if the service answered, including a
+"not found" answer for the probed parameter or secret.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from botocore.exceptions import ClientError
+
+import database
+from aws_clients import get_client
+from config import settings
+from schemas import DependencyHealth, ReadinessResponse
+
+
+logger = logging.getLogger(__name__)
+
+# Error codes that prove the service is reachable (the probed resource just does not exist)
+_NOT_FOUND_CODES = {"ParameterNotFound", "ResourceNotFoundException"}
+
+
+def _probe_dynamodb() -> dict:
+    if database.dynamodb_client is None or database.table_name is None:
+        raise RuntimeError("DynamoDB client is not configured")
+    # Read-only: a failed probe must not mark the database unavailable for requests
+    description = database.dynamodb_client.describe_table(TableName=database.table_name)
+    database.record_table_description(description)
+    return {"table_status": database.table_status}
+
+
+def _probe_ssm() -> dict:
+    parameter = settings.HEALTH_PROBE_SSM_PARAMETER or (
+        f"/{os.getenv('ENVIRONMENT', 'dev')}/dynamodb/"
+        f"{os.getenv('DYNAMODB_TABLE_KEY', 'greetings')}/table_name"
+    )
+    try:
+        get_client("ssm").get_parameter(Name=parameter)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") not in _NOT_FOUND_CODES:
+            raise
+    return {"parameter": parameter}
+
+
+def _probe_secretsmanager() -> dict:
+    secret_id = settings.HEALTH_PROBE_SECRET_ID or (
+        f"{os.getenv('ENVIRONMENT', 'dev')}/{os.getenv('APPLICATION', 'test-app')}/backend-api-key"
+    )
+    try:
+        # describe_secret reads metadata only, never the secret value
+        get_client("secretsmanager").describe_secret(SecretId=secret_id)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") not in _NOT_FOUND_CODES:
+            raise
+    return {"secret_id": secret_id}
+
+
+PROBES: dict[str, Callable[[], dict]] = {
+    "dynamodb": _probe_dynamodb,
+    "ssm": _probe_ssm,
+    "secretsmanager": _probe_secretsmanager,
+}
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+class HealthProber:
+    """Runs dependency probes on an interval and keeps the latest results."""
+
+    def __init__(
+        self,
+        probes: dict[str, Callable[[], dict]],
+        required: set[str],
+        interval_seconds: float = settings.HEALTH_PROBE_INTERVAL_SECONDS,
+        timeout_seconds: float = settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+    ):
+        self.probes = probes
+        self.required = required
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self._results = {name: DependencyHealth(required=name in required) for name in probes}
+        self._task: asyncio.Task | None = None
+        self._render()
+
+    @property
+    def ready(self) -> bool:
+        """True once every required dependency passed its latest probe."""
+        return all(self._results[name].ok for name in self.required if name in self._results)
+
+    @property
+    def body(self) -> bytes:
+        """Pre-rendered ReadinessResponse JSON for the latest results."""
+        return self._body
+
+    def result(self, name: str) -> DependencyHealth | None:
+        """Latest result for one dependency."""
+        return self._results.get(name)
+
+    async def run_once(self) -> None:
+        """Probe every dependency concurrently and store the results."""
+        await asyncio.gather(*(self._probe(name, probe) for name, probe in self.probes.items()))
+        self._render()
+
+    async def _probe(self, name: str, probe: Callable[[], dict]) -> None:
+        previous = self._results[name]
+        started = time.perf_counter()
+        try:
+            details = await asyncio.wait_for(asyncio.to_thread(probe), self.timeout_seconds)
+            error = None
+        except TimeoutError:
+            details, error = None, f"Timed out after {self.timeout_seconds}s"
+        except Exception as e:
+            details, error = None, str(e)
+        checked_at = _now()
+
+        if error is not None and previous.ok is not False:
+            logger.warning(f"Dependency '{name}' probe failed: {error}")
+        elif error is None and previous.ok is False:
+            logger.info(f"Dependency '{name}' recovered")
+
+        self._results[name] = DependencyHealth(
+            ok=error is None,
+            required=previous.required,
+            latency_ms=round((time.perf_counter() - started) * 1000, 2),
+            last_checked=checked_at,
+            last_success=checked_at if error is None else previous.last_success,
+            error=error,
+            details=details or previous.details,
+        )
+
+    def _render(self) -> None:
+        self._body = (
+            ReadinessResponse(
+                status="ready" if self.ready else "not_ready", dependencies=self._results
+            )
+            .model_dump_json()
+            .encode()
+        )
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Health probe round failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start probing in the background on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="health-prober")
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+def create_prober() -> HealthProber:
+    """Build the prober for the dependencies named in HEALTH_PROBE_DEPENDENCIES."""
+    names = settings.get_health_probe_dependencies()
+    unknown = [name for name in names if name not in PROBES]
+    if unknown:
+        logger.warning(f"Ignoring unknown health probe dependencies: {unknown}")
+    return HealthProber(
+        {name: PROBES[name] for name in names if name in PROBES},
+        required=set(settings.get_health_ready_required()),
+    )
+
+
+prober = create_prober()
@@ -2,65 +2,239 @@
 
 import json
 import logging
+import queue
 import sys
+import threading
 from datetime import UTC, datetime
+from typing import TextIO
+
+
+try:
+    import orjson
+except ImportError:  # declared in pyproject.toml; stdlib json if missing
+    orjson = None
+
+
+# Extra attributes (from `extra=`) copied into JSON log lines when present
+LOG_EXTRA_FIELDS = (
+    # Request ID and trace ID for distributed tracing
+    "request_id",
+    "trace_id",
+    # HTTP request context
+    "method",
+    "path",
+    "status_code",
+    "client_ip",
+    "process_time",
+    # Error details
+    "error",
+)
+
+
+def _json_dumps(data: dict) -> str:
+    return json.dumps(data, default=str)
+
+
+def _orjson_dumps(data: dict) -> str:
+    return orjson.dumps(data, default=str).decode()
 
 
 class JSONFormatter(logging.Formatter):
-    """JSON formatter for structured logging with request correlation."""
+    """
+    JSON formatter for structured logging with request correlation.
+
+    The timestamp comes from record.created; the "YYYY-MM-DDTHH:MM:SS" part is
+    cached per second, so only the microseconds are formatted per record. Only
+    the attributes listed in `fields` are copied. orjson is used when installed.
+    """
+
+    def __init__(self, fields: tuple[str, ...] = LOG_EXTRA_FIELDS, use_orjson: bool = True):
+        super().__init__()
+        self.fields = fields
+        self.dumps = _orjson_dumps if use_orjson and orjson is not None else _json_dumps
+        # (second, prefix), replaced as one tuple so readers never see a mismatched pair
+        self._second_prefix = (-1, "")
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        cached_second, prefix = self._second_prefix
+        if second != cached_second:
+            prefix = datetime.fromtimestamp(second, UTC).strftime("%Y-%m-%dT%H:%M:%S")
+            self._second_prefix = (second, prefix)
+        microseconds = min(round((created - second) * 1e6), 999999)
+        return f"{prefix}.{microseconds:06d}+00:00"
 
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            "timestamp": datetime.now(UTC).isoformat(),
+            # Event time, not format time (records may be formatted later by AsyncLogHandler)
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
 
-        # Add request ID for distributed tracing (if present)
-        if hasattr(record, "request_id"):
-            log_data["request_id"] = record.request_id
-
-        # Add HTTP request context if present
-        if hasattr(record, "method"):
-            log_data["method"] = record.method
-        if hasattr(record, "path"):
-            log_data["path"] = record.path
-        if hasattr(record, "status_code"):
-            log_data["status_code"] = record.status_code
-        if hasattr(record, "client_ip"):
-            log_data["client_ip"] = record.client_ip
-        if hasattr(record, "process_time"):
-            log_data["process_time"] = record.process_time
-
-        # Add error details if present
-        if hasattr(record, "error"):
-            log_data["error"] = record.error
+        attributes = record.__dict__
+        for field in self.fields:
+            if field in attributes:
+                log_data[field] = attributes[field]
 
         # Add exception info if present
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_data)
+        return self.dumps(log_data)
+
+
+class AsyncLogHandler(logging.Handler):
+    """
+    Hand records to a background writer thread instead of writing them inline.
 
+    emit() only puts the record on a bounded queue, so formatting and stdout
+    writes happen off the event loop thread. The writer drains up to
+    `batch_size` records at a time and writes them with a single call.
 
-def setup_logging(log_level: str = "INFO", log_format: str = "json"):
+    When the queue is full, overflow="drop" discards the record and counts it
+    (the writer reports the count in a WARNING record), while overflow="block"
+    waits for space. Records are formatted after emit() returns, so mutable
+    objects passed as log arguments must not be changed afterwards.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        capacity: int = 10000,
+        overflow: str = "drop",
+        batch_size: int = 256,
+    ):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"overflow must be 'drop' or 'block', not {overflow!r}")
+        super().__init__()
+        self.stream = stream if stream is not None else sys.stdout
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=capacity)
+        self._dropped = 0
+        self._reported_dropped = 0
+        self._written = 0
+        self._batches = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.overflow == "block":
+            self._queue.put(record)
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            # Plain int increment: an occasional lost update only skews the counter
+            self._dropped += 1
+
+    def stats(self) -> dict[str, float]:
+        """Queue depth and written/dropped counters."""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "written_total": self._written,
+            "dropped_total": self._dropped,
+            "batch_count": self._batches,
+        }
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = self._STOP in batch
+            self._write([record for record in batch if record is not self._STOP])
+            if stop:
+                return
+
+    def _write(self, records: list[logging.LogRecord]) -> None:
+        dropped = self._dropped - self._reported_dropped
+        if dropped:
+            self._reported_dropped += dropped
+            records.append(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"Log queue full: dropped {dropped} records",
+                    }
+                )
+            )
+
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[-1])
+        self._written += len(lines)
+        self._batches += 1
+
+    def close(self) -> None:
+        """Write everything still queued, then stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout=5)
+        super().close()
+
+
+# Installed by setup_logging when asynchronous logging is enabled
+async_handler: AsyncLogHandler | None = None
+
+
+def setup_logging(
+    log_level: str = "INFO",
+    log_format: str = "json",
+    queue_size: int = 0,
+    overflow: str = "drop",
+    batch_size: int = 256,
+):
     """
     Setup logging configuration.
 
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_format: Output format ('json' for structured, 'text' for human-readable)
+        queue_size: Bounded queue for AsyncLogHandler; 0 writes synchronously
+        overflow: What AsyncLogHandler does when the queue is full ('drop' or 'block')
+        batch_size: Max records AsyncLogHandler writes per call
     """
+    global async_handler
+
     # Get root logger
     logger = logging.getLogger()
     logger.setLevel(getattr(logging, log_level.upper()))
 
-    # Remove existing handlers
+    # Remove existing handlers (stopping a previous writer thread)
+    for existing in logger.handlers:
+        existing.close()
     logger.handlers.clear()
 
     # Create console handler
-    handler = logging.StreamHandler(sys.stdout)
+    if queue_size > 0:
+        handler = async_handler = AsyncLogHandler(
+            sys.stdout, capacity=queue_size, overflow=overflow, batch_size=batch_size
+        )
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+        async_handler = None
     handler.setLevel(getattr(logging, log_level.upper()))
 
     # Set formatter
@@ -1,74 +1,157 @@
-import json
+import asyncio
 import logging
 import os
-import sys
 import time
 from contextlib import asynccontextmanager
 from datetime import datetime
-from pathlib import Path as PathLib
 
 import psutil
 from botocore.exceptions import ClientError
-from fastapi import FastAPI, HTTPException, Path, Query, Request, status
+from fastapi import FastAPI, HTTPException, Path, Query, Request, Response, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
 
-from auth import get_auth_dependency
-from config import settings
-from database import (
+import database
+import logging_config
+import metrics
+from async_database import (
+    DatabaseBusyError,
     create_greeting,
     ensure_database_available,
-    init_db,
-    table_name,
 )
-from database import (
+from async_database import (
+    create_greetings_batch as db_create_greetings_batch,
+)
+from async_database import (
+    get_greeting_count as db_get_greeting_count,
+)
+from async_database import (
     get_greetings as db_get_greetings,
 )
-from database import (
+from async_database import (
+    get_recent_greetings as db_get_recent_greetings,
+)
+from async_database import (
     get_user_greetings as db_get_user_greetings,
 )
+from async_database import (
+    get_users_greetings as db_get_users_greetings,
+)
+from async_database import (
+    shutdown as shutdown_database_executor,
+)
+from auth import get_auth_dependency
+from build_info import (
+    get_build_info,
+    install_reload_handler,
+    reload_build_info,
+    remove_reload_handler,
+)
+from config import settings
+from database import (
+    USER_GREETINGS_SUMMARY_ATTRIBUTES,
+    FeedIndexUnavailableError,
+    greeting_cache,
+    init_db,
+    table_name,
+    write_buffer,
+)
+from health_probe import prober as health_prober
 from logging_config import setup_logging
 from middleware import (
     ErrorHandlingMiddleware,
     LoggingMiddleware,
+    ProfilingMiddleware,
     RequestIdMiddleware,
-    SecurityHeadersMiddleware,
 )
+from pagination import InvalidCursorError, decode_cursor, encode_cursor
+from ratelimit import (
+    RateLimiter,
+    RateLimitExceededError,
+    parse_networks,
+    rate_limit_exceeded_handler,
+)
+from ratelimit import create_storage as create_rate_limit_storage
 from schemas import (
     ConfigResponse,
     DynamoDBStatusResponse,
+    GreetingBatchItemResult,
+    GreetingBatchRequest,
+    GreetingBatchResponse,
     GreetingResponse,
     GreetingsListResponse,
     HealthResponse,
     HelloResponse,
+    LivenessResponse,
     MetricsResponse,
+    ReadinessResponse,
     StatusResponse,
     UserGreetingsResponse,
+    UsersGreetingsResponse,
     VersionResponse,
 )
+from tracing import (
+    TracedJSONResponse,
+    TracedRoute,
+    create_exporter,
+    flush_tracing,
+    setup_tracing,
+)
 
 
 # Setup logging
-setup_logging(log_level=settings.LOG_LEVEL, log_format=settings.LOG_FORMAT)
+setup_logging(
+    log_level=settings.LOG_LEVEL,
+    log_format=settings.LOG_FORMAT,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    overflow=settings.LOG_QUEUE_OVERFLOW,
+    batch_size=settings.LOG_BATCH_SIZE,
+)
 logger = logging.getLogger(__name__)
+
+# Setup tracing (off unless TRACING_EXPORTER is set)
+setup_tracing(
+    create_exporter(
+        settings.TRACING_EXPORTER,
+        file_path=settings.TRACING_FILE_PATH,
+        otlp_endpoint=settings.TRACING_OTLP_ENDPOINT,
+        service_name=settings.TRACING_SERVICE_NAME,
+    ),
+    sample_rate=settings.TRACING_SAMPLE_RATE,
+)
 # CI trigger: backend touch to run full pipeline (fmt wrapper fix 2025-12-13)
 
 # Runtime metrics
 # These must be defined at module import time (handlers use them).
-request_count = 0
+# Request counts come from metrics.http_requests_total (merged across workers).
 app_start_time = time.time()
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Scopes that bind /api/greetings cursors to the listing (feed index or scan fallback)
+GREETINGS_CURSOR_SCOPE = "greetings"
+GREETINGS_FEED_CURSOR_SCOPE = "greetings:feed"
+
+
+def _user_cursor_scope(user_name: str) -> str:
+    """Cursor scope for one user's listing, so cursors cannot cross users."""
+    return f"greetings:user:{user_name}"
+
+
+# Initialize rate limiter (per process unless RATE_LIMIT_STORAGE=redis)
+limiter = RateLimiter(
+    create_rate_limit_storage(),
+    trusted_proxies=parse_networks(settings.get_rate_limit_trusted_proxies()),
+)
 
 
 def rate_limit():
     """Conditional rate limiting decorator."""
     if settings.RATE_LIMIT_ENABLED:
-        return limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")
+        return limiter.limit(
+            settings.RATE_LIMIT_PER_MINUTE,
+            settings.RATE_LIMIT_BURST or None,
+            api_key_per_minute=settings.RATE_LIMIT_API_KEY_PER_MINUTE or None,
+            api_key_burst=settings.RATE_LIMIT_API_KEY_BURST or None,
+        )
 
     # Return a no-op decorator if rate limiting is disabled
     def noop_decorator(func):
@@ -83,7 +166,7 @@ async def lifespan(app: FastAPI):
     # Startup: Initialize database only if available and not in testing mode
     # CI/CD Pipeline Test: Full pipeline validation with Dhall fixes
     # Pipeline run: Testing full deployment cycle after health diagnostics
-    if not settings.TESTING and ensure_database_available():
+    if not settings.TESTING and await ensure_database_available():
         logger.info("Initializing database...")
         try:
             init_db()
@@ -91,14 +174,45 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}", exc_info=True)
             raise
-    elif not settings.TESTING and not ensure_database_available():
+    elif not settings.TESTING:
         logger.warning(
             "Database is not available (DATABASE_URL is empty). "
             "Application will run without database features."
         )
+    if write_buffer is not None:
+        write_buffer.start()
+    if not settings.TESTING:
+        # Resolve the API key before serving so authenticated requests start as cache hits
+        from secrets import get_backend_api_key_async
+
+        try:
+            await get_backend_api_key_async()
+        except ValueError as e:
+            logger.warning(f"Could not pre-load the backend API key: {e}")
+    # Read version.json once; `kill -HUP` re-reads it
+    reload_build_info()
+    install_reload_handler()
+    if settings.HEALTH_PROBE_ENABLED:
+        health_prober.start()
+    # Only with several workers (METRICS_MULTIPROC_DIR, see serve.py)
+    if settings.METRICS_ENABLED:
+        metrics.start_snapshots()
+        # Internal listener; the app port never serves metrics
+        metrics.start_http_server(
+            settings.METRICS_PORT, settings.METRICS_HOST, settings.METRICS_PATH
+        )
     yield
-    # Shutdown: cleanup if needed
+    await health_prober.stop()
+    remove_reload_handler()
+    # Shutdown: flush buffered writes, then let in-flight DynamoDB calls finish
     logger.info("Shutting down application...")
+    if write_buffer is not None:
+        await asyncio.to_thread(write_buffer.drain)
+    await asyncio.to_thread(shutdown_database_executor)
+    await asyncio.to_thread(flush_tracing)
+    await asyncio.to_thread(metrics.stop_http_server)
+    # Final snapshot so this worker's counters outlive it
+    await asyncio.to_thread(metrics.stop_snapshots)
 
 
 app = FastAPI(
@@ -108,19 +222,33 @@ app = FastAPI(
     lifespan=lifespan,
     docs_url="/docs" if not settings.TESTING else None,
     redoc_url="/redoc" if not settings.TESTING else None,
+    # Route handlers and JSON rendering run in tracing spans (no-ops while tracing is off)
+    default_response_class=TracedJSONResponse,
 )
+app.router.route_class = TracedRoute
 
 # Add rate limiter
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_exception_handler(RateLimitExceededError, rate_limit_exceeded_handler)
 
 # Add middleware (order matters - last added is first executed)
 # RequestIdMiddleware should be first so request_id is available for all
-# other middleware
+# other middleware; it also adds the security headers
+# Profiling is innermost so profiles cover the route, not the middleware stack;
+# when PROFILING_MODE is "off" it is not installed at all
+if settings.PROFILING_MODE == "header" and not settings.PROFILING_SECRET:
+    logger.warning("PROFILING_MODE is 'header' but PROFILING_SECRET is empty; profiling disabled")
+elif settings.PROFILING_MODE != "off":
+    app.add_middleware(ProfilingMiddleware)
 app.add_middleware(ErrorHandlingMiddleware)
 app.add_middleware(LoggingMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(RequestIdMiddleware)
+# The docs UI loads scripts from a CDN, so a configured CSP is not applied there
+app.add_middleware(
+    RequestIdMiddleware,
+    route_overrides={
+        "/docs": {"Content-Security-Policy": ""},
+        "/redoc": {"Content-Security-Policy": ""},
+    },
+)
 
 # Enable CORS with environment-based configuration
 app.add_middleware(
@@ -141,71 +269,83 @@ app.add_middleware(
 )
 async def health_check():
     """Health check endpoint with database connectivity check and version info"""
-    # Get version info for response
-    version_file = PathLib("/app/version.json")
-    version_info = {"version": None, "commit": None}
-
-    if version_file.exists():
-        try:
-            with open(version_file) as f:
-                version_data = json.load(f)
-                version_info["version"] = version_data.get("version") or os.getenv("APP_VERSION") or settings.API_VERSION or "dev"
-                version_info["commit"] = version_data.get("commit") or os.getenv("GIT_COMMIT") or "unknown"
-        except (json.JSONDecodeError, OSError) as e:
-            logger.warning(f"Failed to read version.json: {e}")
-            version_info["version"] = os.getenv("APP_VERSION") or settings.API_VERSION or "dev"
-            version_info["commit"] = os.getenv("GIT_COMMIT") or "unknown"
-    else:
-        version_info["version"] = os.getenv("APP_VERSION") or settings.API_VERSION or "dev"
-        version_info["commit"] = os.getenv("GIT_COMMIT") or "unknown"
-
-    # Log version info for debugging
-    logger.debug(f"Health check version info: {version_info}")
+    info = get_build_info()
 
     # Check if database is available (refreshes automatically in DynamoDB Local mode)
-    if not ensure_database_available():
-        return HealthResponse(
-            status="healthy",
-            database="unavailable",
-            version=version_info["version"],
-            commit=version_info["commit"]
-        )
-
-    # Test database connection if available
-    try:
+    if await ensure_database_available():
         from database import dynamodb_client
+
         if dynamodb_client and table_name:
-            return HealthResponse(
-                status="healthy",
-                database="connected",
-                version=version_info["version"],
-                commit=version_info["commit"]
-            )
-        else:
-            return HealthResponse(
-                status="healthy",
-                database="unavailable",
-                version=version_info["version"],
-                commit=version_info["commit"]
-            )
-    except ClientError as e:
-        logger.error(f"DynamoDB health check failed: {e}", exc_info=True)
-        return HealthResponse(
-            status="unhealthy",
-            database="disconnected",
-            error=str(e),
-            version=version_info["version"],
-            commit=version_info["commit"]
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error in health check: {e}", exc_info=True)
-        return HealthResponse(
-            status="unhealthy",
-            database="unknown",
-            error="Internal error",
-            version=version_info["version"],
-            commit=version_info["commit"]
-        )
+            return Response(content=info.health_connected_body, media_type="application/json")
+    return Response(content=info.health_unavailable_body, media_type="application/json")
+
+
+# Liveness never depends on anything but the process itself
+LIVENESS_BODY = LivenessResponse(status="alive").model_dump_json().encode()
+
+
+@app.get(
+    "/health/live",
+    response_model=LivenessResponse,
+    tags=["health"],
+    summary="Liveness probe",
+    description="Constant response while the process can serve requests",
+)
+async def liveness():
+    """Liveness endpoint (no dependency checks)"""
+    return Response(content=LIVENESS_BODY, media_type="application/json")
+
+
+@app.get(
+    "/health/ready",
+    response_model=ReadinessResponse,
+    tags=["health"],
+    summary="Readiness probe",
+    description="Dependency health from the background prober (503 until required dependencies pass)",
+    responses={503: {"model": ReadinessResponse}},
+)
+async def readiness():
+    """Readiness endpoint serving the latest background probe results (no network calls)"""
+    if not settings.HEALTH_PROBE_ENABLED:
+        ready = database.database_available
+        body = ReadinessResponse(
+            status="ready" if ready else "not_ready", dependencies={}
+        ).model_dump_json().encode()
+    else:
+        ready, body = health_prober.ready, health_prober.body
+    return Response(
+        content=body,
+        media_type="application/json",
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+if settings.METRICS_ENABLED:
+    # Scrape-time gauges over the stats already kept by the cache, write buffer and log queue
+    metrics.register_stats(
+        "greeting_cache",
+        "Greeting read-through cache",
+        lambda: greeting_cache.stats() if greeting_cache.enabled else None,
+    )
+    metrics.register_stats(
+        "write_buffer",
+        "Write-behind buffer",
+        lambda: write_buffer.stats() if write_buffer is not None else None,
+    )
+    metrics.register_stats(
+        "log_queue",
+        "Asynchronous log queue",
+        lambda: (
+            logging_config.async_handler.stats()
+            if logging_config.async_handler is not None
+            else None
+        ),
+    )
+    metrics.register_stats(
+        "rate_limit",
+        "Rate limiter",
+        lambda: limiter.stats() if settings.RATE_LIMIT_ENABLED else None,
+    )
 
 
 @app.get(
@@ -228,12 +368,11 @@ async def get_config(request: Request):  # Pipeline trigger: test port discovery
     The API key returned here is used by the frontend to authenticate
     subsequent API requests.
     """
-    _ = request  # Required for slowapi rate limiting decorator
     try:
-        from secrets import get_backend_api_key
+        from secrets import get_backend_api_key_async
 
-        # Get API key from Secrets Manager
-        api_key = get_backend_api_key()
+        # Get API key from Secrets Manager (cached; loads run off the event loop)
+        api_key = await get_backend_api_key_async()
 
         # Get backend URL from environment or settings
         backend_url = os.getenv(
@@ -275,41 +414,9 @@ async def get_version():
     - Python version
     - Deployment environment
     """
-    # Try to read version from version.json file (created during Docker build)
-    version_file = PathLib("/app/version.json")
+    # version.json (created during Docker build) is read once at startup, see build_info.py
+    return Response(content=get_build_info().version_body, media_type="application/json")
 
-    if version_file.exists():
-        try:
-            with open(version_file) as f:
-                version_data = json.load(f)
-
-            return VersionResponse(
-                version=version_data.get(
-                    "version", os.getenv("APP_VERSION", "unknown")
-                ),
-                commit=version_data.get(
-                    "commit", os.getenv("GIT_COMMIT", "unknown")
-                ),
-                build_date=version_data.get(
-                    "build_date", os.getenv("BUILD_DATE", "unknown")
-                ),
-                python_version=version_data.get(
-                    "python_version",
-                    f"{sys.version_info.major}.{sys.version_info.minor}",
-                ),
-                environment=os.getenv("ENVIRONMENT", "development"),
-            )
-        except (json.JSONDecodeError, OSError) as e:
-            logger.warning(f"Failed to read version.json: {e}")
-
-    # Fallback to environment variables
-    return VersionResponse(
-        version=os.getenv("APP_VERSION", settings.API_VERSION),
-        commit=os.getenv("GIT_COMMIT", "unknown"),
-        build_date=os.getenv("BUILD_DATE", "unknown"),
-        python_version=f"{sys.version_info.major}.{sys.version_info.minor}",
-        environment=os.getenv("ENVIRONMENT", "development"),
-    )
 
 @app.get(
     "/api/status",
@@ -348,32 +455,9 @@ async def get_status():
 @rate_limit()
 async def hello(request: Request):
     """Simple hello endpoint (DEPLOY-TEST-1: Version info added)"""
-    global request_count
-    request_count += 1
-
     # DEPLOY-TEST-1: Show build info only in non-production environments
-    # For security: Don't expose deployment timestamps in production
-    environment = os.getenv("ENVIRONMENT", "development")
-
-    if environment.lower() != "production":
-        # In dev/staging: Show build date for verification (less sensitive than current timestamp)
-        version_file = PathLib("/app/version.json")
-        build_info = ""
-        if version_file.exists():
-            try:
-                with open(version_file) as f:
-                    version_data = json.load(f)
-                    build_date = version_data.get("build_date", "unknown")
-                    commit_val = version_data.get("commit", "unknown")
-                    commit_short = commit_val[:7] if commit_val != "unknown" else "unknown"
-                    build_info = f" (build: {commit_short}, {build_date})"
-            except (json.JSONDecodeError, OSError):
-                pass
-
-        return HelloResponse(message=f"hello from backend{build_info}")
-    else:
-        # In production: Keep it simple, no build info
-        return HelloResponse(message="hello from backend")
+    # For security: Don't expose deployment timestamps in production (see build_info.py)
+    return Response(content=get_build_info().hello_body, media_type="application/json")
 
 
 @app.get(
@@ -447,7 +531,8 @@ async def secrets_test(request: Request):
 
     for secret_name, secret_func, env_var in secret_tests:
         try:
-            secret_value = secret_func()
+            # Lookups may call SSM and Secrets Manager, so keep them off the event loop
+            secret_value = await asyncio.to_thread(secret_func)
             # Don't expose the actual secret value, just confirm it exists
             secret_length = len(secret_value)
             results["secrets_tested"].append({
@@ -522,7 +607,7 @@ async def greet_user(
 ):
     """Personalized greeting endpoint that stores greetings in DynamoDB"""
     # Check if database is available
-    if not ensure_database_available():
+    if not await ensure_database_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="DynamoDB is not available. Please ensure the table is created and IAM permissions are configured."
@@ -559,7 +644,7 @@ async def greet_user(
 
         # Store greeting in DynamoDB with proper error handling
         try:
-            greeting = create_greeting(user_name=user_clean, message=greeting_message)
+            greeting = await create_greeting(user_name=user_clean, message=greeting_message)
         except ClientError as e:
             logger.error(f"DynamoDB error: {e}", exc_info=True)
             raise HTTPException(
@@ -574,6 +659,12 @@ async def greet_user(
         )
     except (HTTPException, RequestValidationError):
         raise
+    except DatabaseBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="DynamoDB is busy. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        ) from e
     except RuntimeError as e:
         if "DynamoDB is not available" in str(e):
             raise HTTPException(
@@ -589,6 +680,111 @@ async def greet_user(
         ) from e
 
 
+@app.post(
+    "/api/greetings:batch",
+    response_model=GreetingBatchResponse,
+    tags=["greetings"],
+    summary="Greet many users",
+    description=(
+        "Create greetings for up to GREETINGS_BATCH_MAX_ITEMS users in one request "
+        "(written with BatchWriteItem) and return a result per user"
+    ),
+    dependencies=[get_auth_dependency()],
+)
+@rate_limit()
+async def greet_users_batch(request: Request, body: GreetingBatchRequest):
+    """Batch greeting endpoint for bulk onboarding jobs"""
+    if len(body.greetings) > settings.GREETINGS_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.GREETINGS_BATCH_MAX_ITEMS} greetings per batch",
+        )
+
+    if not await ensure_database_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="DynamoDB is not available. Please ensure the table is created and IAM permissions are configured."
+        )
+
+    entries = [(item.user_name, f"Hello, {item.user_name}!") for item in body.greetings]
+    try:
+        outcomes = await db_create_greetings_batch(entries)
+    except DatabaseBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="DynamoDB is busy. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        ) from e
+    except RuntimeError as e:
+        if "DynamoDB is not available" in str(e):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="DynamoDB is not available. Please ensure the table is created and IAM permissions are configured."
+            ) from e
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in greet_users_batch: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error",
+        ) from e
+
+    results = [
+        GreetingBatchItemResult(
+            user_name=greeting.user_name,
+            status="failed",
+            error=error,
+        )
+        if error
+        else GreetingBatchItemResult(
+            user_name=greeting.user_name,
+            status="created",
+            message=greeting.message,
+            id=greeting.id,
+            created_at=greeting.created_at,
+        )
+        for greeting, error in outcomes
+    ]
+    failed = sum(1 for result in results if result.status == "failed")
+    return GreetingBatchResponse(created=len(results) - failed, failed=failed, results=results)
+
+
+async def _list_greetings(skip: int, limit: int, cursor: str | None) -> tuple[list, int, str | None]:
+    """
+    Read one page of greetings, newest first from the feed index when it exists.
+
+    Falls back to a table scan (unordered) if the feed index is missing. Cursors
+    are scoped to the listing that produced them.
+
+    Raises:
+        InvalidCursorError: If the cursor is invalid for either listing
+    """
+    positions = None
+    start_key = None
+    if cursor:
+        try:
+            positions = decode_cursor(cursor, scope=GREETINGS_FEED_CURSOR_SCOPE)
+        except InvalidCursorError:
+            start_key = decode_cursor(cursor, scope=GREETINGS_CURSOR_SCOPE)
+
+    if start_key is None:
+        try:
+            greetings, total, positions = await db_get_recent_greetings(
+                limit=limit, skip=skip, positions=positions
+            )
+            next_cursor = (
+                encode_cursor(positions, scope=GREETINGS_FEED_CURSOR_SCOPE) if positions else None
+            )
+            return greetings, total, next_cursor
+        except FeedIndexUnavailableError as e:
+            if positions is not None:
+                raise InvalidCursorError("Feed cursor used without a feed index") from e
+
+    greetings, total, last_key = await db_get_greetings(skip=skip, limit=limit, start_key=start_key)
+    next_cursor = encode_cursor(last_key, scope=GREETINGS_CURSOR_SCOPE) if last_key else None
+    return greetings, total, next_cursor
+
+
 @app.get(
     "/api/greetings",
     response_model=GreetingsListResponse,
@@ -600,13 +796,18 @@ async def greet_user(
 @rate_limit()
 async def get_greetings(
     request: Request,
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    skip: int = Query(
+        0, ge=0, description="Number of records to skip (deprecated, prefer cursor)"
+    ),
     limit: int = Query(
         10, ge=1, le=100, description="Maximum number of records to return"
     ),
+    cursor: str | None = Query(
+        None, description="Continuation token from a previous page's next_cursor"
+    ),
 ):
-    """Get all greetings from DynamoDB with pagination"""
-    if not ensure_database_available():
+    """Get greetings newest-first with cursor pagination (skip kept for compatibility)"""
+    if not await ensure_database_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="DynamoDB is not available. Please ensure the table is created and IAM permissions are configured."
@@ -626,7 +827,11 @@ async def get_greetings(
 
         # Query DynamoDB with error handling
         try:
-            greetings, total = db_get_greetings(skip=skip, limit=limit)
+            greetings, total, next_cursor = await _list_greetings(skip, limit, cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from e
         except ClientError as e:
             logger.error(f"DynamoDB error in get_greetings: {e}", exc_info=True)
             raise HTTPException(
@@ -635,10 +840,20 @@ async def get_greetings(
             ) from e
 
         return GreetingsListResponse(
-            total=total, greetings=greetings, skip=skip, limit=limit
+            total=total,
+            greetings=greetings,
+            skip=skip,
+            limit=limit,
+            next_cursor=next_cursor,
         )
     except HTTPException:
         raise
+    except DatabaseBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="DynamoDB is busy. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        ) from e
     except RuntimeError as e:
         if "DynamoDB is not available" in str(e):
             raise HTTPException(
@@ -654,21 +869,122 @@ async def get_greetings(
         ) from e
 
 
+# Declared before /api/greetings/{user} so "users" is not taken as a user name
+@app.get(
+    "/api/greetings/users",
+    response_model=UsersGreetingsResponse,
+    tags=["greetings"],
+    summary="Get greetings for several users",
+    description="Retrieve greetings for a comma-separated list of users in one request",
+    dependencies=[get_auth_dependency()],
+)
+@rate_limit()
+async def get_users_greetings(
+    request: Request,
+    names: str = Query(..., min_length=1, description="Comma-separated user names"),
+    limit: int = Query(
+        100, ge=1, le=1000, description="Maximum number of greetings per user"
+    ),
+    summary_only: bool = Query(
+        False, alias="summary", description="Return only id, user_name and created_at"
+    ),
+):
+    """Get greetings for several users, querying the user-name GSI concurrently"""
+    # Validate and de-duplicate names, keeping request order
+    user_names = list(dict.fromkeys(name.strip() for name in names.split(",") if name.strip()))
+    if not user_names:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one user name is required",
+        )
+    if len(user_names) > settings.GREETINGS_USERS_MAX_NAMES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many user names (max {settings.GREETINGS_USERS_MAX_NAMES})",
+        )
+    if any(len(name) > 100 for name in user_names):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User name too long (max 100 characters)",
+        )
+
+    if not await ensure_database_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="DynamoDB is not available. Please ensure the table is created and IAM permissions are configured."
+        )
+
+    try:
+        results = await db_get_users_greetings(
+            user_names,
+            limit=limit,
+            attributes=USER_GREETINGS_SUMMARY_ATTRIBUTES if summary_only else None,
+        )
+    except ClientError as e:
+        logger.error(f"DynamoDB error in get_users_greetings: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred",
+        ) from e
+    except DatabaseBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="DynamoDB is busy. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        ) from e
+    except RuntimeError as e:
+        if "DynamoDB is not available" in str(e):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="DynamoDB is not available. Please ensure the table is created and IAM permissions are configured."
+            ) from e
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in get_users_greetings: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error",
+        ) from e
+
+    return UsersGreetingsResponse(
+        users={
+            user_name: UserGreetingsResponse(
+                user=user_name,
+                count=len(greetings) if count is None else count,
+                greetings=greetings,
+                next_cursor=(
+                    encode_cursor(last_key, _user_cursor_scope(user_name)) if last_key else None
+                ),
+            )
+            for user_name, (greetings, count, last_key) in results.items()
+        }
+    )
+
+
 @app.get(
     "/api/greetings/{user}",
     response_model=UserGreetingsResponse,
     tags=["greetings"],
     summary="Get user greetings",
-    description="Retrieve all greetings for a specific user",
+    description="Retrieve a specific user's greetings, newest first, with cursor pagination",
     dependencies=[get_auth_dependency()],
 )
 @rate_limit()
 async def get_user_greetings(
     request: Request,
     user: str = Path(..., min_length=1, max_length=100, description="User name"),
+    limit: int = Query(
+        100, ge=1, le=1000, description="Maximum number of greetings to return"
+    ),
+    cursor: str | None = Query(
+        None, description="Continuation token from a previous page's next_cursor"
+    ),
+    summary_only: bool = Query(
+        False, alias="summary", description="Return only id, user_name and created_at"
+    ),
 ):
-    """Get all greetings for a specific user from DynamoDB"""
-    if not ensure_database_available():
+    """Get a page of a specific user's greetings from DynamoDB"""
+    if not await ensure_database_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="DynamoDB is not available. Please ensure the table is created and IAM permissions are configured."
@@ -683,9 +999,23 @@ async def get_user_greetings(
                 detail="User name cannot be empty",
             )
 
-        # Query DynamoDB with error handling
+        # Query DynamoDB with error handling (greetings and maintained count in parallel)
         try:
-            greetings = db_get_user_greetings(user_name=user_clean)
+            scope = _user_cursor_scope(user_clean)
+            start_key = decode_cursor(cursor, scope) if cursor else None
+            (greetings, last_key), count = await asyncio.gather(
+                db_get_user_greetings(
+                    user_name=user_clean,
+                    limit=limit,
+                    start_key=start_key,
+                    attributes=USER_GREETINGS_SUMMARY_ATTRIBUTES if summary_only else None,
+                ),
+                db_get_greeting_count(user_name=user_clean),
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from e
         except ClientError as e:
             logger.error(f"DynamoDB error in get_user_greetings: {e}", exc_info=True)
             raise HTTPException(
@@ -694,10 +1024,19 @@ async def get_user_greetings(
             ) from e
 
         return UserGreetingsResponse(
-            user=user_clean, count=len(greetings), greetings=greetings
+            user=user_clean,
+            count=len(greetings) if count is None else count,
+            greetings=greetings,
+            next_cursor=encode_cursor(last_key, scope) if last_key else None,
         )
     except HTTPException:
         raise
+    except DatabaseBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="DynamoDB is busy. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        ) from e
     except RuntimeError as e:
         if "DynamoDB is not available" in str(e):
             raise HTTPException(
@@ -729,9 +1068,10 @@ async def get_metrics(request: Request):
     - Total requests processed
     - Active connections
     - Memory usage
+    - Write-behind buffer depth and flush latency (when enabled)
+    - Greeting cache hit ratio (when enabled)
+    - Log queue depth and dropped records (when logging asynchronously)
     """
-    global request_count
-
     # Calculate uptime
     uptime_seconds = time.time() - app_start_time
 
@@ -749,10 +1089,17 @@ async def get_metrics(request: Request):
 
     return MetricsResponse(
         uptime_seconds=round(uptime_seconds, 2),
-        total_requests=request_count,
+        total_requests=int(metrics.REGISTRY.total("http_requests_total")),
         active_connections=active_connections,
         memory_usage_mb=round(memory_usage_mb, 2),
         timestamp=datetime.utcnow().isoformat() + "Z",
+        write_buffer=write_buffer.stats() if write_buffer is not None else None,
+        cache=greeting_cache.stats() if greeting_cache.enabled else None,
+        logging=(
+            logging_config.async_handler.stats()
+            if logging_config.async_handler is not None
+            else None
+        ),
     )
 
 
@@ -775,7 +1122,7 @@ async def get_dynamodb_status(request: Request):
     endpoint_url = os.getenv("DYNAMODB_ENDPOINT_URL")
     region = os.getenv("AWS_REGION", "us-east-1")
 
-    if not ensure_database_available():
+    if not await ensure_database_available():
         return DynamoDBStatusResponse(
             available=False,
             table_name=table_name,
@@ -784,14 +1131,8 @@ async def get_dynamodb_status(request: Request):
             message="DynamoDB is not available. Table may not exist or IAM permissions may be missing.",
         )
 
-    # Try to get table status
-    table_status = None
-    try:
-        if dynamodb_client and table_name:
-            response = dynamodb_client.describe_table(TableName=table_name)
-            table_status = response.get("Table", {}).get("TableStatus", "UNKNOWN")
-    except Exception as e:
-        logger.warning(f"Could not get table status: {e}")
+    # Table status as last seen by describe_table (kept fresh by the health prober)
+    table_status = database.table_status if dynamodb_client and table_name else None
 
     return DynamoDBStatusResponse(
         available=True,
@@ -0,0 +1,562 @@
+"""In-process metrics exposed in the Prometheus text format.
+
+A small dependency-free registry: counters, gauges and histograms with
+labels, plus callback gauges that read existing stats (cache, write buffer,
+log queue) at scrape time. render() produces the text that start_http_server()
+serves on METRICS_PATH of a separate listener (METRICS_PORT), so the scrape
+surface is never reachable through the load balancer that routes the app port.
+
+Only the standard library is imported here, so low-level modules
+(aws_clients, secrets) can record metrics without import cycles. Every
+metric is thread-safe: DynamoDB calls are recorded from executor threads.
+"""
+
+import bisect
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds (env var: this module is imported before config.py loads)
+METRICS_LATENCY_BUCKETS = tuple(
+    float(bucket)
+    for bucket in os.getenv(
+        "METRICS_LATENCY_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10"
+    ).split(",")
+    if bucket.strip()
+)
+
+# Directory shared by the workers of one server; set by serve.py when it starts
+# more than one, so any worker can answer a scrape with the totals of all of them
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_SNAPSHOT_INTERVAL = float(os.getenv("METRICS_SNAPSHOT_INTERVAL", "5"))
+
+# Starlette appends "; charset=utf-8" for text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+M = TypeVar("M", bound="_Metric")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[Any, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base for labelled metrics: one child value per label combination."""
+
+    type_name = ""
+    # How values from several workers combine in Registry.render: "sum" adds
+    # every worker's values, "livesum" only live workers', "pid" labels each
+    multiprocess_mode = "sum"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[Any, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any) -> Any:
+        """Child metric for one combination of label values (rendered with str())."""
+        # Hot path: a dict hit on the values as given; they are stringified at render time
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[tuple[str, float]]:
+        """(series, value) pairs, e.g. ('requests_total{route="/a"}', 2)."""
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterable[tuple[str, float]]:
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)}", child.value
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+    multiprocess_mode = "livesum"
+
+    def dec(self, amount: float = 1) -> None:
+        """Decrement the unlabelled gauge."""
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        """Set the unlabelled gauge."""
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds: tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = METRICS_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(float(bucket) for bucket in buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        """Record a value on the unlabelled histogram."""
+        self.labels().observe(value)
+
+    def samples(self) -> Iterable[tuple[str, float]]:
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for upper_bound, count in zip((*self.upper_bounds, float("inf")), counts, strict=True):
+                cumulative += count
+                le = f'le="{_format_value(upper_bound)}"'
+                labels = _format_labels(self.labelnames, key, le)
+                yield f"{self.name}_bucket{labels}", cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels}", total
+            yield f"{self.name}_count{labels}", cumulative
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose values are read from a callback at scrape time."""
+
+    type_name = "gauge"
+    multiprocess_mode = "pid"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[tuple[str, ...], float] | None],
+        labelnames: Iterable[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self) -> Iterable[tuple[str, float]]:
+        for key, value in (self.callback() or {}).items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)}", value
+
+
+class Registry:
+    """
+    Ordered collection of metrics rendered together.
+
+    With `multiproc_dir` set (several server workers, see serve.py), each
+    worker saves its values there with write_snapshot() and render() merges
+    the other workers' latest snapshots into its own live values.
+    """
+
+    def __init__(self, multiproc_dir: str = ""):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self.multiproc_dir = multiproc_dir
+
+    def register(self, metric: M) -> M:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def collect(self, names: Iterable[str] | None = None) -> dict[str, dict]:
+        """This process's metrics: {name: {"type", "help", "mode", "samples": {series: value}}}."""
+        with self._lock:
+            if names is None:
+                metrics = list(self._metrics.values())
+            else:
+                metrics = [self._metrics[name] for name in names if name in self._metrics]
+        return {
+            metric.name: {
+                "type": metric.type_name,
+                "help": metric.documentation,
+                "mode": metric.multiprocess_mode,
+                "samples": dict(metric.samples()),
+            }
+            for metric in metrics
+        }
+
+    def total(self, name: str) -> float:
+        """Sum of a counter's samples over all labels (and all workers)."""
+        families = self.collect([name])
+        if self.multiproc_dir:
+            snapshots = [
+                (pid, {name: snapshot[name]})
+                for pid, snapshot in self._read_snapshots()
+                if name in snapshot
+            ]
+            families = _merge_workers(families, snapshots)
+        family = families.get(name)
+        return sum(family["samples"].values()) if family else 0.0
+
+    def render(self) -> bytes:
+        """All metrics in the Prometheus text exposition format."""
+        families = self.collect()
+        if self.multiproc_dir:
+            families = _merge_workers(families, self._read_snapshots())
+        lines = []
+        for name, family in families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            lines.extend(
+                f"{series} {_format_value(value)}" for series, value in family["samples"].items()
+            )
+        return ("\n".join(lines) + "\n").encode()
+
+    def write_snapshot(self) -> None:
+        """Save this worker's values for the others to merge (atomic replace)."""
+        path = os.path.join(self.multiproc_dir, f"{os.getpid()}.json")
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(self.collect(), f)
+        os.replace(f"{path}.tmp", path)
+
+    def _read_snapshots(self) -> list[tuple[int, dict]]:
+        """Other workers' snapshots as (pid, families)."""
+        snapshots = []
+        for entry in os.scandir(self.multiproc_dir):
+            pid, ext = os.path.splitext(entry.name)
+            if ext != ".json" or not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            try:
+                with open(entry.path) as f:
+                    snapshots.append((int(pid), json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _with_label(series: str, label: str) -> str:
+    if series.endswith("}"):
+        return f"{series[:-1]},{label}}}"
+    return f"{series}{{{label}}}"
+
+
+def _merge_workers(own: dict[str, dict], snapshots: list[tuple[int, dict]]) -> dict[str, dict]:
+    """
+    Combine this worker's families with other workers' snapshots.
+
+    Counters and histograms are summed, including workers that have exited
+    (their requests still happened). Gauges are summed over live workers;
+    callback gauges (per-worker cache and queue stats) get a pid label instead.
+    """
+    merged: dict[str, dict] = {}
+    for pid, families in [(os.getpid(), own), *snapshots]:
+        alive = pid == os.getpid() or _pid_alive(pid)
+        for name, family in families.items():
+            mode = family["mode"]
+            if mode != "sum" and not alive:
+                continue
+            samples = merged.setdefault(name, {**family, "samples": {}})["samples"]
+            for series, value in family["samples"].items():
+                if mode == "pid":
+                    samples[_with_label(series, f'pid="{pid}"')] = value
+                else:
+                    samples[series] = samples.get(series, 0) + value
+    return merged
+
+
+REGISTRY = Registry(METRICS_MULTIPROC_DIR)
+
+# HTTP (recorded by middleware.LoggingMiddleware)
+http_requests_total = REGISTRY.register(
+    Counter(
+        "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+    )
+)
+http_request_duration_seconds = REGISTRY.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+)
+http_requests_in_flight = REGISTRY.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being served")
+)
+
+# AWS calls (recorded by botocore event hooks, see instrument_client)
+aws_call_duration_seconds = REGISTRY.register(
+    Histogram(
+        "aws_call_duration_seconds",
+        "AWS API call latency by operation, including retries",
+        ("service", "operation"),
+    )
+)
+aws_call_errors_total = REGISTRY.register(
+    Counter(
+        "aws_call_errors_total",
+        "Failed AWS API calls by operation and error code",
+        ("service", "operation", "code"),
+    )
+)
+
+# Secrets (recorded by secrets._fetch_secret_value)
+secret_fetch_duration_seconds = REGISTRY.register(
+    Histogram(
+        "secret_fetch_duration_seconds",
+        "Uncached secret lookups (SSM discovery + Secrets Manager)",
+        ("outcome",),
+    )
+)
+
+
+def register_stats(
+    prefix: str, documentation: str, stats: Callable[[], dict[str, float] | None]
+) -> None:
+    """
+    Expose a stats() dict (cache, write buffer, log queue) as `<prefix>_<key>` gauges.
+
+    The callback is read at scrape time; keys present on the first call define
+    the gauges. A callback returning None (feature disabled) exposes nothing.
+    """
+    for key in stats() or {}:
+        REGISTRY.unregister(f"{prefix}_{key}")
+        REGISTRY.register(
+            CallbackGauge(
+                f"{prefix}_{key}",
+                f"{documentation} ({key})",
+                lambda key=key: _stat_sample(stats, key),
+            )
+        )
+
+
+def _stat_sample(stats: Callable[[], dict[str, float] | None], key: str) -> dict | None:
+    values = stats()
+    if not values or key not in values:
+        return None
+    return {(): values[key]}
+
+
+def _before_call(model: Any, context: dict, **kwargs: Any) -> None:
+    context["metrics_call"] = (
+        model.service_model.endpoint_prefix,
+        model.name,
+        time.perf_counter(),
+    )
+
+
+def _after_call(http_response: Any, parsed: dict, context: dict, **kwargs: Any) -> None:
+    call = context.pop("metrics_call", None)
+    if call is None:
+        return
+    service, operation, started = call
+    aws_call_duration_seconds.labels(service, operation).observe(time.perf_counter() - started)
+    if http_response.status_code >= 300:
+        code = parsed.get("Error", {}).get("Code") or str(http_response.status_code)
+        aws_call_errors_total.labels(service, operation, code).inc()
+
+
+def _after_call_error(exception: Exception, context: dict, **kwargs: Any) -> None:
+    # Raised before a response was parsed (connection errors, timeouts)
+    call = context.pop("metrics_call", None)
+    if call is None:
+        return
+    service, operation, started = call
+    aws_call_duration_seconds.labels(service, operation).observe(time.perf_counter() - started)
+    aws_call_errors_total.labels(service, operation, type(exception).__name__).inc()
+
+
+def instrument_client(client: Any) -> None:
+    """Record latency and errors for every API call made through a boto3 client."""
+    events = client.meta.events
+    events.register("before-call.*.*", _before_call, unique_id="metrics-before-call")
+    events.register("after-call.*.*", _after_call, unique_id="metrics-after-call")
+    events.register("after-call-error.*.*", _after_call_error, unique_id="metrics-after-call-error")
+
+
+_snapshot_stop = threading.Event()
+_snapshot_thread: threading.Thread | None = None
+
+
+def _write_snapshot() -> None:
+    try:
+        REGISTRY.write_snapshot()
+    except OSError as e:
+        logger.warning(f"Could not write metrics snapshot: {e}")
+
+
+def _write_snapshots(interval: float) -> None:
+    _write_snapshot()
+    while not _snapshot_stop.wait(interval):
+        _write_snapshot()
+    _write_snapshot()
+
+
+def start_snapshots(interval: float = METRICS_SNAPSHOT_INTERVAL) -> None:
+    """Write this worker's snapshot every interval (no-op without METRICS_MULTIPROC_DIR)."""
+    global _snapshot_thread
+    if not REGISTRY.multiproc_dir or _snapshot_thread is not None:
+        return
+    _snapshot_stop.clear()
+    _snapshot_thread = threading.Thread(
+        target=_write_snapshots, args=(interval,), name="metrics-snapshot", daemon=True
+    )
+    _snapshot_thread.start()
+
+
+def stop_snapshots() -> None:
+    """Stop the snapshot thread after a final write, keeping this worker's counters."""
+    global _snapshot_thread
+    if _snapshot_thread is None:
+        return
+    _snapshot_stop.set()
+    _snapshot_thread.join()
+    _snapshot_thread = None
+
+
+class _MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        # Every worker binds the port; the kernel spreads scrapes over them and
+        # each renders the merged registry
+        if hasattr(socket, "SO_REUSEPORT"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+def _metrics_handler(path: str, registry: Registry) -> type[BaseHTTPRequestHandler]:
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server method name
+            if self.path.partition("?")[0] != path:
+                self.send_error(404)
+                return
+            body = registry.render()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            # Scrapes are not access-logged
+            pass
+
+    return MetricsHandler
+
+
+_http_server: ThreadingHTTPServer | None = None
+
+
+def start_http_server(
+    port: int, host: str = "0.0.0.0", path: str = "/metrics", registry: Registry | None = None
+) -> ThreadingHTTPServer | None:
+    """
+    Serve the registry on its own listener (host:port/path) from a daemon thread.
+
+    Returns None (after logging) if the port cannot be bound: metrics are not
+    worth failing startup for.
+    """
+    global _http_server
+    if _http_server is None:
+        try:
+            server = _MetricsServer((host, port), _metrics_handler(path, registry or REGISTRY))
+        except OSError as e:
+            logger.warning(f"Could not start metrics listener on {host}:{port}: {e}")
+            return None
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        _http_server = server
+    return _http_server
+
+
+def stop_http_server() -> None:
+    """Stop the metrics listener, if started."""
+    global _http_server
+    if _http_server is None:
+        return
+    _http_server.shutdown()
+    _http_server.server_close()
+    _http_server = None
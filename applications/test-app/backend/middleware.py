@@ -1,112 +1,293 @@
-"""Custom middleware for security, logging, request tracking, and error handling."""
+"""Custom middleware for security, logging, request tracking, error handling and profiling.
 
+Each middleware is plain ASGI rather than a BaseHTTPMiddleware subclass.
+BaseHTTPMiddleware runs the downstream app in a separate task and pipes the
+response through a memory stream, which costs several event loop round trips
+per layer on every request and buffers streaming responses. Wrapping `send` to
+edit the http.response.start message does the same job inline.
+"""
+
+import asyncio
 import logging
+import random
 import time
 import uuid
-from collections.abc import Callable
 
-from fastapi import Request, status
+from fastapi import status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import metrics
+import profiling
+import tracing
+from config import settings
 
 
 logger = logging.getLogger(__name__)
 
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
+def _header(scope: Scope, name: bytes) -> str | None:
+    """First value of a request header (name must be lowercase)."""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _request_id(scope: Scope) -> str:
+    """Request ID stored by RequestIdMiddleware (request.state.request_id)."""
+    return scope.get("state", {}).get("request_id", "unknown")
+
+
+def build_security_headers(overrides: dict[str, str] | None = None) -> list[tuple[bytes, bytes]]:
+    """
+    Encode the security response headers once, as raw ASGI header pairs.
+
+    Args:
+        overrides: Header values replacing the defaults; an empty value drops the header
+
+    Returns:
+        list: (lowercase name, value) byte pairs, ready to append to http.response.start
     """
-    Add unique request ID for distributed tracing.
+    headers = {
+        "X-Content-Type-Options": "nosniff",
+        "X-Frame-Options": "DENY",
+        "X-XSS-Protection": "1; mode=block",
+        "Strict-Transport-Security": settings.SECURITY_HSTS,
+        "Content-Security-Policy": settings.SECURITY_CSP,
+        "Referrer-Policy": "strict-origin-when-cross-origin",
+        "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+    }
+    headers.update(overrides or {})
+    return [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in headers.items()
+        if value
+    ]
+
+
+class RequestIdMiddleware:
+    """
+    Add unique request ID for distributed tracing, plus the security headers.
 
     The request ID is:
     - Taken from incoming X-Request-ID header if present
     - Generated as UUID if not present
     - Stored in request.state.request_id for access in handlers
     - Added to response headers as X-Request-ID
+
+    When tracing is enabled, the request runs in a server span that continues
+    the caller's W3C traceparent (trace ID in request.state.trace_id).
+
+    Security headers are encoded once (see build_security_headers) and appended
+    to http.response.start as raw pairs. A route overrides one by setting that
+    header on its own response; `route_overrides` maps path prefixes to header
+    overrides for routes that cannot (e.g. the docs UI).
     """
 
-    async def dispatch(self, request: Request, call_next: Callable):
-        # Get existing request ID or generate new one
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+    def __init__(
+        self,
+        app: ASGIApp,
+        security_headers: list[tuple[bytes, bytes]] | None = None,
+        route_overrides: dict[str, dict[str, str]] | None = None,
+    ):
+        self.app = app
+        self.security_headers = (
+            build_security_headers() if security_headers is None else security_headers
+        )
+        # Longest prefix first so the most specific override wins
+        self.route_overrides = [
+            (prefix, build_security_headers(overrides))
+            for prefix, overrides in sorted(
+                (route_overrides or {}).items(), key=lambda item: len(item[0]), reverse=True
+            )
+        ]
+
+    def _headers_for(self, path: str) -> list[tuple[bytes, bytes]]:
+        for prefix, headers in self.route_overrides:
+            if path.startswith(prefix):
+                return headers
+        return self.security_headers
 
-        # Store in request state for access in handlers
-        request.state.request_id = request_id
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Process request
-        response = await call_next(request)
+        # Get existing request ID or generate new one
+        request_id = _header(scope, b"x-request-id") or str(uuid.uuid4())
 
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
+        # Store in request state (scope["state"] backs request.state)
+        scope.setdefault("state", {})["request_id"] = request_id
 
-        return response
+        extra_headers = [(b"x-request-id", request_id.encode("latin-1"))]
+        extra_headers += (
+            self._headers_for(scope["path"]) if self.route_overrides else self.security_headers
+        )
 
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Copy: the list may belong to a Response object
+                headers = list(message.get("headers", ()))
+                set_by_route = {name for name, _ in headers}
+                headers += [pair for pair in extra_headers if pair[0] not in set_by_route]
+                message["headers"] = headers
+            await send(message)
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to all responses."""
+        if tracing.enabled():
+            await self._traced(scope, receive, send_with_headers)
+        else:
+            await self.app(scope, receive, send_with_headers)
 
-    async def dispatch(self, request: Request, call_next: Callable):
-        response = await call_next(request)
+    async def _traced(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the request in a server span continuing the caller's W3C traceparent."""
+        method = scope["method"]
+        status_code = None
 
-        # Security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
+        async def send_recording_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-        return response
+        with tracing.start_span(
+            f"{method} {scope['path']}",
+            tracing.SPAN_KIND_SERVER,
+            attributes={
+                "http.method": method,
+                "http.target": scope["path"],
+                "request_id": scope["state"]["request_id"],
+            },
+            traceparent=_header(scope, b"traceparent"),
+        ) as span:
+            scope["state"]["trace_id"] = span.trace_id
+            await self.app(scope, receive, send_recording_status)
+            route = scope.get("route")
+            if route is not None:
+                # Name by route template so spans group like the metrics do
+                span.name = f"{method} {route.path}"
+                span.set_attribute("http.route", route.path)
+            span.set_attribute("http.status_code", status_code)
+            if status_code is None or status_code >= 500:
+                span.set_error(f"HTTP {status_code}")
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Log all requests and responses with request ID correlation."""
+class LoggingMiddleware:
+    """
+    Access log with request ID correlation: one combined line per request.
 
-    async def dispatch(self, request: Request, call_next: Callable):
-        start_time = time.time()
+    Successful requests are logged with probability `sample_rate`; 5xx
+    responses and requests slower than `slow_ms` are always logged (at ERROR
+    and WARNING). Paths in `exclude_paths` (health checks) are only logged when
+    they fail or are slow; a 503 there means "not ready" and is logged at
+    WARNING once when it starts, not on every probe. `route_levels` maps path prefixes to the level used
+    for their successful requests, e.g. {"/api/metrics": "DEBUG"}.
 
-        # Get request ID (set by RequestIdMiddleware)
-        request_id = getattr(request.state, "request_id", "unknown")
+    It also records the HTTP metrics (requests by route and status, latency
+    histogram, in-flight gauge), since it already times every request.
+    """
 
-        # Log request
-        logger.info(
-            f"Request: {request.method} {request.url.path}",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "client_ip": request.client.host if request.client else None,
-            },
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float | None = None,
+        slow_ms: float | None = None,
+        exclude_paths: list[str] | None = None,
+        route_levels: dict[str, str] | None = None,
+    ):
+        self.app = app
+        self.sample_rate = settings.ACCESS_LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+        slow_ms = settings.ACCESS_LOG_SLOW_MS if slow_ms is None else slow_ms
+        self.slow_seconds = slow_ms / 1000
+        self.exclude_paths = frozenset(
+            settings.get_access_log_exclude_paths() if exclude_paths is None else exclude_paths
         )
+        if route_levels is None:
+            route_levels = settings.get_access_log_route_levels()
+        known = logging.getLevelNamesMapping()
+        unknown = [level for level in route_levels.values() if level.upper() not in known]
+        if unknown:
+            raise ValueError(f"Unknown access log level(s): {unknown}")
+        # Longest prefix first so the most specific level wins
+        self.route_levels = [
+            (prefix, known[level.upper()])
+            for prefix, level in sorted(
+                route_levels.items(), key=lambda item: len(item[0]), reverse=True
+            )
+        ]
+        # Last status per excluded path, so repeated 503s are logged once
+        self._last_status: dict[str, int | None] = {}
 
-        try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
+    def _level_for(self, path: str) -> int:
+        for prefix, level in self.route_levels:
+            if path.startswith(prefix):
+                return level
+        return logging.INFO
 
-            # Log response
-            logger.info(
-                f"Response: {request.method} {request.url.path} - {response.status_code}",
-                extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status_code": response.status_code,
-                    "process_time": process_time,
-                },
-            )
+    def _access_level(self, path: str, status_code: int | None, process_time: float) -> int | None:
+        """Level for the access line, or None to skip it."""
+        if path in self.exclude_paths:
+            previous = self._last_status.get(path)
+            self._last_status[path] = status_code
+            if status_code == 503:
+                return logging.WARNING if previous != 503 else None
+        if status_code is None or status_code >= 500:
+            return logging.ERROR
+        if process_time >= self.slow_seconds:
+            return logging.WARNING
+        if path in self.exclude_paths:
+            return None
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return None
+        return self._level_for(path) if self.route_levels else logging.INFO
+
+    @staticmethod
+    def _record_metrics(scope: Scope, method: str, status_code: int | None, duration: float):
+        # Route template (set by FastAPI on match), not the raw path: bounded label values
+        route = scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        metrics.http_requests_in_flight.dec()
+        metrics.http_requests_total.labels(method, route_path, status_code).inc()
+        metrics.http_request_duration_seconds.labels(method, route_path).observe(duration)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-            # Add process time header
-            response.headers["X-Process-Time"] = str(process_time)
+        start_time = time.time()
+        status_code = None
+        metrics.http_requests_in_flight.inc()
+
+        async def send_with_process_time(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add process time header
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-process-time", str(time.time() - start_time).encode("latin-1")),
+                ]
+            await send(message)
+
+        method = scope["method"]
+        path = scope.get("root_path", "") + scope["path"]
 
-            return response
+        try:
+            with tracing.start_span("middleware.LoggingMiddleware"):
+                await self.app(scope, receive, send_with_process_time)
         except Exception as e:
             process_time = time.time() - start_time
+            self._record_metrics(scope, method, status_code or 500, process_time)
             logger.error(
-                f"Error processing request: {request.method} {request.url.path}",
+                f"Error processing request: {method} {path}",
                 extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "path": request.url.path,
+                    # Request ID set by RequestIdMiddleware
+                    "request_id": _request_id(scope),
+                    "method": method,
+                    "path": path,
                     "error": str(e),
                     "process_time": process_time,
                 },
@@ -114,43 +295,179 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             )
             raise
 
+        process_time = time.time() - start_time
+        self._record_metrics(scope, method, status_code, process_time)
+        level = self._access_level(path, status_code, process_time)
+        if level is None or not logger.isEnabledFor(level):
+            return
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
+        client = scope.get("client")
+        extra = {
+            "request_id": _request_id(scope),
+            "method": method,
+            "path": path,
+            "status_code": status_code,
+            "client_ip": client[0] if client else None,
+            "process_time": process_time,
+        }
+        # Trace ID (set by RequestIdMiddleware when tracing is enabled)
+        trace_id = scope["state"].get("trace_id") if "state" in scope else None
+        if trace_id:
+            extra["trace_id"] = trace_id
+        logger.log(level, f"{method} {path} {status_code} {process_time * 1000:.1f}ms", extra=extra)
+
+
+class ErrorHandlingMiddleware:
     """Global error handling middleware with request ID correlation."""
 
-    async def dispatch(self, request: Request, call_next: Callable):
-        # Get request ID for error correlation
-        request_id = getattr(request.state, "request_id", "unknown")
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
         try:
-            response = await call_next(request)
-            return response
-        except StarletteHTTPException as e:
+            with tracing.start_span("middleware.ErrorHandlingMiddleware"):
+                await self.app(scope, receive, send_tracking_start)
+        except Exception as e:
+            # Once headers are sent the status can no longer change; let the
+            # server abort the connection
+            if response_started:
+                raise
+            response = self._error_response(e, _request_id(scope))
+            await response(scope, receive, send)
+
+    @staticmethod
+    def _error_response(exc: Exception, request_id: str) -> JSONResponse:
+        if isinstance(exc, StarletteHTTPException):
             return JSONResponse(
-                status_code=e.status_code,
+                status_code=exc.status_code,
                 content={
-                    "error": e.detail,
-                    "status_code": e.status_code,
+                    "error": exc.detail,
+                    "status_code": exc.status_code,
                     "request_id": request_id,
                 },
             )
-        except RequestValidationError as e:
+        if isinstance(exc, RequestValidationError):
             return JSONResponse(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 content={
                     "error": "Validation error",
-                    "detail": e.errors(),
+                    "detail": exc.errors(),
                     "status_code": 422,
                     "request_id": request_id,
                 },
             )
-        except Exception as e:
-            logger.exception(f"Unhandled exception: {str(e)}", extra={"request_id": request_id})
-            return JSONResponse(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                content={
-                    "error": "Internal server error",
-                    "status_code": 500,
-                    "request_id": request_id,
-                },
-            )
+        logger.exception(f"Unhandled exception: {str(exc)}", extra={"request_id": request_id})
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "error": "Internal server error",
+                "status_code": 500,
+                "request_id": request_id,
+            },
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profiling (see profiling.py).
+
+    mode "header" profiles requests carrying a valid signed X-Profile header;
+    "always" profiles every request (local debugging only). main.py only
+    installs this middleware when PROFILING_MODE is not "off", so disabled
+    profiling adds nothing to the request path.
+
+    The profile is written to `output_dir` (path returned in X-Profile-File),
+    or replaces the response body when the request sends
+    "X-Profile-Output: response" (original status in X-Profile-Status).
+    One request is profiled at a time; concurrent ones run unprofiled.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        mode: str | None = None,
+        secret: str | None = None,
+        profiler: str | None = None,
+        output_dir: str | None = None,
+        interval_ms: float | None = None,
+    ):
+        self.app = app
+        self.mode = settings.PROFILING_MODE if mode is None else mode
+        if self.mode not in ("header", "always"):
+            raise ValueError(f"profiling mode must be 'header' or 'always', not {self.mode!r}")
+        self.secret = settings.PROFILING_SECRET if secret is None else secret
+        self.profiler = settings.PROFILING_PROFILER if profiler is None else profiler
+        self.output_dir = settings.PROFILING_OUTPUT_DIR if output_dir is None else output_dir
+        interval_ms = settings.PROFILING_SAMPLE_INTERVAL_MS if interval_ms is None else interval_ms
+        self.interval_seconds = interval_ms / 1000
+        self._active = False
+
+    def _wants_profile(self, scope: Scope) -> bool:
+        if self.mode == "always":
+            return True
+        token = _header(scope, b"x-profile")
+        return token is not None and profiling.verify_profile_token(token, self.secret)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._active or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        inline = _header(scope, b"x-profile-output") == "response"
+        profile = profiling.RequestProfile(self.profiler, self.interval_seconds)
+        label = f"{scope['method']}-{scope['path']}-{_request_id(scope)}"
+        path = profiling.profile_path(self.output_dir, label, profile.extension)
+        status_code = None
+
+        async def send_with_profile(message: Message) -> None:
+            nonlocal status_code
+            if inline:
+                # Swallow the real response; the profile is sent in its place
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                return
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-profile-file", path.encode("latin-1")),
+                ]
+            await send(message)
+
+        self._active = True
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            profile.stop()
+            self._active = False
+            if not inline:
+                await asyncio.to_thread(profile.write, path)
+                logger.info(f"Profile written to {path}", extra={"request_id": _request_id(scope)})
+        if not inline:
+            return
+
+        body = (await asyncio.to_thread(profile.text)).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"x-profile-status", str(status_code).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,87 @@
+"""Opaque, signed continuation tokens for DynamoDB pagination.
+
+A cursor wraps a DynamoDB LastEvaluatedKey so clients can resume a listing
+with ExclusiveStartKey without learning the table's key schema. Tokens are
+HMAC-signed with SECRET_KEY and bound to a scope (the listing they came from),
+so tampered or cross-endpoint cursors are rejected instead of being passed to
+DynamoDB.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+from typing import Any
+
+from config import settings
+
+
+# Truncated HMAC-SHA256 tag length (bytes)
+_SIGNATURE_BYTES = 16
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed, tampered with, or from another scope."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(scope: str, payload: bytes) -> bytes:
+    message = scope.encode() + b"\x00" + payload
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).digest()[
+        :_SIGNATURE_BYTES
+    ]
+
+
+def encode_cursor(last_evaluated_key: dict[str, Any], scope: str) -> str:
+    """
+    Encode a DynamoDB LastEvaluatedKey as an opaque cursor.
+
+    Args:
+        last_evaluated_key: Key returned by Scan/Query (string attributes)
+        scope: Listing the cursor belongs to (e.g., 'greetings')
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = json.dumps(last_evaluated_key, separators=(",", ":"), sort_keys=True).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_sign(scope, payload))}"
+
+
+def decode_cursor(cursor: str, scope: str) -> dict[str, Any]:
+    """
+    Decode and verify a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor token from a previous response
+        scope: Listing the cursor must belong to
+
+    Returns:
+        dict: ExclusiveStartKey for the next DynamoDB request
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or its signature does not match
+    """
+    try:
+        encoded_payload, encoded_signature = cursor.split(".", 1)
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except ValueError as e:
+        raise InvalidCursorError("Malformed cursor") from e
+
+    if not hmac.compare_digest(signature, _sign(scope, payload)):
+        raise InvalidCursorError("Invalid cursor signature")
+
+    try:
+        key = json.loads(payload)
+    except json.JSONDecodeError as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if not isinstance(key, dict) or not key:
+        raise InvalidCursorError("Malformed cursor")
+    return key
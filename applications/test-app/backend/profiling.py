@@ -0,0 +1,138 @@
+"""Per-request profiling for ProfilingMiddleware.
+
+Two profilers:
+- cprofile: deterministic (cProfile), written as a .prof file for pstats/snakeviz
+- sampling: samples the event loop thread's stack every interval and writes
+  collapsed stacks ("frame;frame;frame count" lines), ready for flamegraph.pl
+  or speedscope
+
+Both observe the event loop thread, so anything else running on the loop during
+the request (other requests, background tasks) shows up too; profile on an
+otherwise idle instance for clean results.
+
+Requests opt in with a signed X-Profile header: "<expires>.<signature>", where
+signature is the hex HMAC-SHA256 of the expiry timestamp under PROFILING_SECRET
+(see sign_profile_token). Tokens are short-lived so a leaked one stops working.
+Adding "X-Profile-Output: response" returns the profile as the response body
+instead of writing it to PROFILING_OUTPUT_DIR.
+"""
+
+import cProfile
+import hashlib
+import hmac
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+
+def sign_profile_token(secret: str, ttl_seconds: int = 300, now: float | None = None) -> str:
+    """Create an X-Profile header value valid for ttl_seconds."""
+    expires = int((now if now is not None else time.time()) + ttl_seconds)
+    signature = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_profile_token(token: str, secret: str, now: float | None = None) -> bool:
+    """True if token was signed with secret and has not expired."""
+    if not secret or not token:
+        return False
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit():
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(signature, expected):
+        return False
+    return int(expires) >= (now if now is not None else time.time())
+
+
+class StackSampler:
+    """Samples one thread's Python stack on an interval from a helper thread."""
+
+    def __init__(self, thread_id: int, interval_seconds: float = 0.001):
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def collapsed(self) -> str:
+        """Collapsed-stack text (one "stack count" line per distinct stack)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfile:
+    """Profiles the current thread between start() and stop() with the chosen profiler."""
+
+    def __init__(self, profiler: str, interval_seconds: float = 0.001):
+        if profiler not in ("cprofile", "sampling"):
+            raise ValueError(f"profiler must be 'cprofile' or 'sampling', not {profiler!r}")
+        self.profiler = profiler
+        self.interval_seconds = interval_seconds
+        self._profile: cProfile.Profile | None = None
+        self._sampler: StackSampler | None = None
+
+    @property
+    def extension(self) -> str:
+        return "prof" if self.profiler == "cprofile" else "collapsed"
+
+    def start(self) -> None:
+        if self.profiler == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = StackSampler(threading.get_ident(), self.interval_seconds)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+
+    def text(self) -> str:
+        """The profile as text: collapsed stacks, or pstats sorted by cumulative time."""
+        if self._sampler is not None:
+            return self._sampler.collapsed()
+        out = io.StringIO()
+        if self._profile is not None:
+            pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(50)
+        return out.getvalue()
+
+    def write(self, path: str) -> None:
+        """Write the profile (.prof binary or collapsed-stack text) to path."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if self._profile is not None:
+            self._profile.dump_stats(path)
+        else:
+            with open(path, "w") as f:
+                f.write(self.text())
+
+
+def profile_path(directory: str, label: str, extension: str) -> str:
+    """Unique file path for one request's profile, e.g. 1700000000000-GET_api_greet-<id>.prof."""
+    safe_label = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_")[:100]
+    return os.path.join(directory, f"{int(time.time() * 1000)}-{safe_label}.{extension}")
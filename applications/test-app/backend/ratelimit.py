@@ -0,0 +1,481 @@
+"""Rate limiting for API routes: GCRA per client and route.
+
+Clients are IP addresses, taken from X-Forwarded-For only behind
+RATE_LIMIT_TRUSTED_PROXIES, or API keys (hashed) when a per-key limit is set.
+
+GCRA (generic cell rate algorithm) keeps one timestamp per key, the
+theoretical arrival time (TAT). Each request moves it forward by the emission
+interval (60 / RATE_LIMIT_PER_MINUTE seconds) and is refused if that would put
+it more than `burst` intervals ahead of now. This is a sliding limit with no
+window edges to burst across, and O(1) state per key.
+
+Storage (RATE_LIMIT_STORAGE):
+- memory (default): per-process GCRA, checked inline on the event loop (no
+  locks, no awaits). With several workers or tasks each enforces its own limit.
+- redis: one GCRA state per key shared by every worker and task. Workers take
+  tokens in batches (leases) with one atomic script call and spend them
+  locally; the next batch is fetched in the background when a lease runs low,
+  so Redis sees one round trip per batch, not per request. Unspent tokens
+  expire after RATE_LIMIT_LEASE_TTL_SECONDS, which bounds how long a worker can
+  run ahead of the shared state. If Redis is unreachable each worker falls
+  back to its own memory limiter.
+"""
+
+import asyncio
+import functools
+import inspect
+import ipaddress
+import logging
+import math
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+
+from config import settings
+from singleflight import AsyncSingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+
+class Limit:
+    """Sustained rate and burst size for one rate-limited route."""
+
+    __slots__ = ("per_minute", "burst", "interval")
+
+    def __init__(self, per_minute: float, burst: int | None = None):
+        if per_minute <= 0:
+            raise ValueError(f"per_minute must be positive, not {per_minute}")
+        self.per_minute = per_minute
+        # Default: a minute's worth, like a one-minute window without the edges
+        self.burst = burst or max(1, int(per_minute))
+        self.interval = 60.0 / per_minute
+
+    def __str__(self) -> str:
+        return f"{self.per_minute:g} per 1 minute"
+
+
+def gcra(tat: float, now: float, limit: Limit, tokens: int = 1) -> tuple[int, float]:
+    """
+    Take up to `tokens` from a GCRA bucket; returns (granted, new_tat).
+
+    A key whose TAT is in the past holds a full bucket of `burst` tokens.
+    """
+    tat = max(tat, now)
+    available = int((now - tat) / limit.interval + limit.burst + 1e-9)
+    granted = max(0, min(tokens, available))
+    return granted, tat + granted * limit.interval
+
+
+def retry_after(tat: float, now: float, limit: Limit) -> float:
+    """Seconds until the bucket with this TAT has a token again."""
+    return max(0.0, tat + limit.interval - (now + limit.burst * limit.interval))
+
+
+class RateLimitExceededError(Exception):
+    """Raised by RateLimiter when a request is over its limit."""
+
+    def __init__(self, limit: Limit, retry_after: float):
+        super().__init__(f"Rate limit exceeded: {limit}")
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+class RateLimitStorage:
+    """Storage interface used by RateLimiter."""
+
+    async def acquire(self, key: str, limit: Limit) -> tuple[bool, float]:
+        """Take one token for key; returns (allowed, seconds until retry if refused)."""
+        raise NotImplementedError
+
+    def stats(self) -> dict[str, float]:
+        return {}
+
+
+class MemoryStorage(RateLimitStorage):
+    """
+    Per-process GCRA state.
+
+    Only used from the event loop thread, and take() never awaits, so the
+    read-modify-write of a key's TAT needs no lock.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = 100_000,
+        evict_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_keys = max_keys
+        self.evict_interval = evict_interval
+        self._clock = clock
+        # One float per active key; idle keys are evicted every evict_interval
+        self._tats: dict[str, float] = {}
+        self._next_evict = clock() + evict_interval
+
+    def take(self, key: str, limit: Limit) -> tuple[bool, float]:
+        now = self._clock()
+        granted, tat = gcra(self._tats.get(key, now), now, limit)
+        if not granted:
+            return False, retry_after(tat, now, limit)
+        self._tats[key] = tat
+        if now >= self._next_evict or len(self._tats) > self.max_keys:
+            self._prune(now)
+        return True, 0.0
+
+    async def acquire(self, key: str, limit: Limit) -> tuple[bool, float]:
+        return self.take(key, limit)
+
+    def _prune(self, now: float) -> None:
+        # Idle keys: a TAT in the past is the same as no entry (full bucket)
+        self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+        self._next_evict = now + self.evict_interval
+        # Still too many: forget the oldest keys (they start over with a full bucket)
+        excess = len(self._tats) - self.max_keys
+        if excess > 0:
+            for key in list(self._tats)[:excess]:
+                del self._tats[key]
+
+    def stats(self) -> dict[str, float]:
+        return {"keys": len(self._tats)}
+
+
+class SharedStore:
+    """Shared GCRA state (blocking calls, run on a thread by LeasedStorage)."""
+
+    def take(self, key: str, limit: Limit, tokens: int) -> tuple[int, float]:
+        """Atomically take up to `tokens`; returns (granted, seconds until retry if none)."""
+        raise NotImplementedError
+
+
+class InMemorySharedStore(SharedStore):
+    """SharedStore in this process, for tests and single-host stand-ins."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tats: dict[str, float] = {}
+        self.calls = 0
+
+    def take(self, key: str, limit: Limit, tokens: int) -> tuple[int, float]:
+        with self._lock:
+            self.calls += 1
+            now = self._clock()
+            granted, tat = gcra(self._tats.get(key, now), now, limit, tokens)
+            self._tats[key] = tat
+        return granted, retry_after(tat, now, limit) if not granted else 0.0
+
+
+# KEYS[1]: key; ARGV: interval, burst, tokens. Uses the Redis clock so every
+# worker and task agrees on "now"; the key expires once its bucket is full again.
+_GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local tokens = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local available = math.floor((now - tat) / interval + burst + 1e-9)
+local granted = math.max(0, math.min(tokens, available))
+if granted > 0 then
+  tat = tat + granted * interval
+  redis.call('SET', KEYS[1], string.format('%.6f', tat), 'PX', math.ceil((tat - now) * 1000))
+end
+local retry = math.max(0, tat + interval - (now + burst * interval))
+return {granted, string.format('%.6f', retry)}
+"""
+
+
+class RedisSharedStore(SharedStore):
+    """SharedStore on Redis: GCRA in a Lua script, one round trip per take()."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RATE_LIMIT_STORAGE=redis requires the 'redis' package (pip install redis)"
+            ) from e
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_GCRA_SCRIPT)
+
+    def take(self, key: str, limit: Limit, tokens: int) -> tuple[int, float]:
+        granted, wait = self._script(
+            keys=[self.prefix + key], args=[limit.interval, limit.burst, tokens]
+        )
+        return int(granted), float(wait)
+
+
+class _Lease:
+    __slots__ = ("tokens", "size", "expires")
+
+    def __init__(self, size: int):
+        self.tokens = 0
+        self.size = size
+        self.expires = 0.0
+
+
+class LeasedStorage(RateLimitStorage):
+    """
+    Spends tokens leased in batches from a SharedStore.
+
+    Lease sizes adapt per key: they double while leases are used up and halve
+    when tokens expire unspent, up to `lease_size` and a quarter of the burst
+    (so one worker cannot hold a key's whole bucket). Refused keys are refused
+    locally until their retry time, so rejected traffic costs no round trips.
+    """
+
+    def __init__(
+        self,
+        shared: SharedStore,
+        lease_size: int = 10,
+        lease_ttl: float = 5.0,
+        fallback: MemoryStorage | None = None,
+        max_keys: int = 100_000,
+        evict_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.shared = shared
+        self.lease_size = max(1, lease_size)
+        self.lease_ttl = lease_ttl
+        self.fallback = fallback or MemoryStorage(max_keys, evict_interval, clock)
+        self.max_keys = max_keys
+        self.evict_interval = evict_interval
+        self._clock = clock
+        self._next_evict = clock() + evict_interval
+        self._leases: dict[str, _Lease] = {}
+        self._denied_until: dict[str, float] = {}
+        self._refills = AsyncSingleFlight()
+        self._prefetches: set[asyncio.Task] = set()
+        self._degraded = False
+        self.shared_calls = 0
+        self.fallbacks = 0
+
+    def _spend(self, key: str, limit: Limit, now: float) -> bool:
+        lease = self._leases.get(key)
+        if lease is None or lease.tokens == 0 or lease.expires <= now:
+            return False
+        lease.tokens -= 1
+        if lease.tokens <= lease.size // 2:
+            # Fetch the next batch before this one runs out
+            task = asyncio.ensure_future(self._refill(key, limit))
+            self._prefetches.add(task)
+            task.add_done_callback(self._prefetches.discard)
+        return True
+
+    async def acquire(self, key: str, limit: Limit) -> tuple[bool, float]:
+        now = self._clock()
+        if self._spend(key, limit, now):
+            return True, 0.0
+        denied_until = self._denied_until.get(key)
+        if denied_until is not None and now < denied_until:
+            return False, denied_until - now
+
+        if not await self._refill(key, limit):
+            self.fallbacks += 1
+            return self.fallback.take(key, limit)
+        now = self._clock()
+        if self._spend(key, limit, now):
+            return True, 0.0
+        return False, max(0.0, self._denied_until.get(key, now + limit.interval) - now)
+
+    async def _refill(self, key: str, limit: Limit) -> bool:
+        """Lease more tokens for key (coalesced per key); False if the store failed."""
+        try:
+            await self._refills.do(key, lambda: self._fetch_lease(key, limit))
+        except Exception as e:
+            if not self._degraded:
+                logger.warning(f"Shared rate limit storage failed, limiting per process: {e}")
+            self._degraded = True
+            return False
+        if self._degraded:
+            logger.info("Shared rate limit storage recovered")
+            self._degraded = False
+        return True
+
+    async def _fetch_lease(self, key: str, limit: Limit) -> None:
+        now = self._clock()
+        max_size = max(1, min(self.lease_size, limit.burst // 4))
+        lease = self._leases.get(key)
+        if lease is None:
+            size = 1
+        elif lease.expires <= now and lease.tokens > 0:
+            size = max(1, lease.size // 2)
+        else:
+            size = min(max_size, lease.size * 2)
+
+        self.shared_calls += 1
+        granted, wait = await asyncio.to_thread(self.shared.take, key, limit, size)
+
+        now = self._clock()
+        lease = self._leases.get(key)
+        if lease is None or lease.expires <= now:
+            lease = self._leases[key] = _Lease(size)
+            if now >= self._next_evict or len(self._leases) > self.max_keys:
+                self._prune(now)
+        lease.size = size
+        if granted:
+            lease.tokens += granted
+            lease.expires = now + self.lease_ttl
+            self._denied_until.pop(key, None)
+        else:
+            self._denied_until[key] = now + wait
+
+    def _prune(self, now: float) -> None:
+        self._leases = {key: lease for key, lease in self._leases.items() if lease.expires > now}
+        self._denied_until = {key: t for key, t in self._denied_until.items() if t > now}
+        self._next_evict = now + self.evict_interval
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "keys": len(self._leases),
+            "shared_calls": self.shared_calls,
+            "fallbacks": self.fallbacks,
+        }
+
+
+IPNetwork = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+def parse_networks(values: Iterable[str]) -> list[IPNetwork]:
+    """Parse addresses or CIDR ranges (e.g. the VPC range the load balancer runs in)."""
+    return [ipaddress.ip_network(value, strict=False) for value in values]
+
+
+def _in_networks(address: str, networks: Sequence[IPNetwork]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_address(request: Request, trusted_proxies: Sequence[IPNetwork] = ()) -> str:
+    """
+    The client's IP address.
+
+    When the connection comes from a trusted proxy (the ALB), X-Forwarded-For
+    is read right to left and the first address outside trusted_proxies is the
+    client. Entries further left were sent by the client and could be forged.
+    """
+    peer = request.client.host if request.client else "127.0.0.1"
+    if not trusted_proxies or not _in_networks(peer, trusted_proxies):
+        return peer
+    hops = [
+        hop.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for hop in header.split(",")
+        if hop.strip()
+    ]
+    for hop in reversed(hops):
+        if not _in_networks(hop, trusted_proxies):
+            return hop
+    return hops[0] if hops else peer
+
+
+class RateLimiter:
+    """
+    Route decorator enforcing a Limit per client and route.
+
+    Clients are identified by IP address. Routes given an API key limit
+    identify authenticated clients by their validated API key instead (the
+    fingerprint auth.verify_api_key stores in request.state.api_key_hash), so
+    each key has its own bucket. Without one, callers sharing a key (e.g. a
+    key injected by the frontend proxy) still get a bucket per IP.
+    """
+
+    def __init__(self, storage: RateLimitStorage, trusted_proxies: Sequence[IPNetwork] = ()):
+        self.storage = storage
+        self.trusted_proxies = trusted_proxies
+        self.allowed = 0
+        self.rejected = 0
+
+    def client_key(self, request: Request, by_api_key: bool = True) -> tuple[str, bool]:
+        """(key, whether it is an API key) identifying the client of a request."""
+        api_key_hash = getattr(request.state, "api_key_hash", None) if by_api_key else None
+        if api_key_hash:
+            return f"key:{api_key_hash}", True
+        return f"ip:{client_address(request, self.trusted_proxies)}", False
+
+    async def check(
+        self, request: Request, route: str, limit: Limit, key_limit: Limit | None = None
+    ) -> None:
+        """Take a token for this request, or raise RateLimitExceededError."""
+        client, is_api_key = self.client_key(request, by_api_key=key_limit is not None)
+        if is_api_key:
+            limit = key_limit
+        allowed, wait = await self.storage.acquire(f"{route}:{client}", limit)
+        if not allowed:
+            self.rejected += 1
+            raise RateLimitExceededError(limit, wait)
+        self.allowed += 1
+
+    def limit(
+        self,
+        per_minute: float,
+        burst: int | None = None,
+        api_key_per_minute: float | None = None,
+        api_key_burst: int | None = None,
+    ) -> Callable:
+        """
+        Decorate an async route that takes a `request: Request` argument.
+
+        per_minute/burst apply per client IP. With api_key_per_minute set,
+        authenticated requests are limited per API key at that rate instead.
+        """
+        limit = Limit(per_minute, burst)
+        key_limit = Limit(api_key_per_minute, api_key_burst) if api_key_per_minute else None
+
+        def decorator(func: Callable) -> Callable:
+            if "request" not in inspect.signature(func).parameters:
+                raise TypeError(
+                    f"{func.__qualname__} needs a 'request' argument to be rate limited"
+                )
+            # Route names are short and stable across workers (shared storage keys)
+            route = func.__name__
+
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                await self.check(kwargs["request"], route, limit, key_limit)
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def stats(self) -> dict[str, float]:
+        return {"allowed": self.allowed, "rejected": self.rejected, **self.storage.stats()}
+
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceededError) -> JSONResponse:
+    """429 response in the API error format, with Retry-After."""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "error": str(exc),
+            "status_code": status.HTTP_429_TOO_MANY_REQUESTS,
+            "request_id": getattr(request.state, "request_id", "unknown"),
+        },
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
+def create_storage() -> RateLimitStorage:
+    """Build the storage selected by RATE_LIMIT_STORAGE."""
+    if settings.RATE_LIMIT_STORAGE == "redis":
+        return LeasedStorage(
+            RedisSharedStore(settings.RATE_LIMIT_REDIS_URL),
+            lease_size=settings.RATE_LIMIT_LEASE_SIZE,
+            lease_ttl=settings.RATE_LIMIT_LEASE_TTL_SECONDS,
+            evict_interval=settings.RATE_LIMIT_EVICT_INTERVAL_SECONDS,
+        )
+    if settings.RATE_LIMIT_STORAGE != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_STORAGE '{settings.RATE_LIMIT_STORAGE}', using memory")
+    return MemoryStorage(evict_interval=settings.RATE_LIMIT_EVICT_INTERVAL_SECONDS)
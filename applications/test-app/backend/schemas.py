@@ -38,6 +38,31 @@ class HealthResponse(BaseModel):
     commit: str | None = Field(None, description="Git commit SHA")
 
 
+class LivenessResponse(BaseModel):
+    """Liveness response schema"""
+
+    status: str
+
+
+class DependencyHealth(BaseModel):
+    """Latest background probe result for one dependency"""
+
+    ok: bool | None = Field(None, description="Result of the last probe (null until probed)")
+    required: bool = Field(False, description="Whether readiness depends on this dependency")
+    latency_ms: float | None = Field(None, description="Duration of the last probe")
+    last_checked: str | None = Field(None, description="Timestamp of the last probe")
+    last_success: str | None = Field(None, description="Timestamp of the last successful probe")
+    error: str | None = None
+    details: dict[str, str | None] | None = None
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness response schema"""
+
+    status: str
+    dependencies: dict[str, DependencyHealth]
+
+
 class HelloResponse(BaseModel):
     """Hello endpoint response schema"""
 
@@ -48,8 +73,8 @@ class GreetingCreate(BaseModel):
     """
     Greeting creation schema for request body validation.
 
-    Note: Currently unused as the greet endpoint takes user_name as a path parameter.
-    Kept for future use if POST /api/greetings endpoint is added.
+    Used by POST /api/greetings:batch (the single greet endpoint takes user_name
+    as a path parameter).
     """
 
     user_name: str = Field(..., min_length=1, max_length=100, description="User name")
@@ -67,6 +92,33 @@ class GreetingCreate(BaseModel):
         return sanitized
 
 
+class GreetingBatchRequest(BaseModel):
+    """Batch greeting creation request schema"""
+
+    greetings: list[GreetingCreate] = Field(
+        ..., min_length=1, description="Users to greet (max GREETINGS_BATCH_MAX_ITEMS)"
+    )
+
+
+class GreetingBatchItemResult(BaseModel):
+    """Per-item result of a batch greeting request"""
+
+    user_name: str
+    status: str = Field(..., description="'created' or 'failed'")
+    message: str | None = None
+    id: str | None = None
+    created_at: str | None = None
+    error: str | None = None
+
+
+class GreetingBatchResponse(BaseModel):
+    """Batch greeting creation response schema"""
+
+    created: int
+    failed: int
+    results: list[GreetingBatchItemResult]
+
+
 class GreetingResponse(BaseModel):
     """Greeting response schema"""
 
@@ -95,6 +147,9 @@ class GreetingsListResponse(BaseModel):
     greetings: list[GreetingItem]
     skip: int
     limit: int
+    next_cursor: str | None = Field(
+        None, description="Opaque token for the next page (pass as ?cursor=); null on the last page"
+    )
 
 
 class UserGreetingsResponse(BaseModel):
@@ -103,6 +158,15 @@ class UserGreetingsResponse(BaseModel):
     user: str
     count: int
     greetings: list[GreetingItem]
+    next_cursor: str | None = Field(
+        None, description="Opaque token for the next page (pass as ?cursor=); null on the last page"
+    )
+
+
+class UsersGreetingsResponse(BaseModel):
+    """Multi-user greetings response schema"""
+
+    users: dict[str, UserGreetingsResponse]
 
 
 class ErrorResponse(BaseModel):
@@ -160,3 +224,12 @@ class MetricsResponse(BaseModel):
     active_connections: int = Field(..., description="Current active connections")
     memory_usage_mb: float = Field(..., description="Memory usage in MB")
     timestamp: str = Field(..., description="Timestamp when metrics were collected")
+    write_buffer: dict[str, float] | None = Field(
+        None, description="Write-behind buffer stats (queue depth, flush latency), if enabled"
+    )
+    cache: dict[str, float] | None = Field(
+        None, description="Greeting cache hits, misses and hit ratio, if enabled"
+    )
+    logging: dict[str, float] | None = Field(
+        None, description="Async log queue depth and written/dropped records, if enabled"
+    )
@@ -2,19 +2,203 @@
 
 This module provides dynamic secret discovery and retrieval without hardcoding ARNs.
 Secrets are discovered via SSM Parameter Store, then retrieved from Secrets Manager.
+
+Resolved values are kept in an in-process TTL cache so hot paths (API key
+verification) do not hit SSM and Secrets Manager on every request. Entries are
+refreshed in the background shortly before they expire, and the last good value
+keeps being served while AWS is unavailable. Async callers use the *_async
+variants, which answer fresh hits inline and run loads in a worker thread.
 """
 
+import asyncio
 import json
 import logging
 import os
+import threading
+import time
+from collections.abc import Callable, Hashable
 from typing import Any
 
-import boto3
 from botocore.exceptions import ClientError
 
+from metrics import secret_fetch_duration_seconds
+from singleflight import SingleFlight, raise_shared
+from tracing import start_span
+
 
 logger = logging.getLogger(__name__)
 
+# Secret cache tuning (seconds). A TTL of 0 disables caching entirely.
+# Rotation takes effect within one TTL; refresh starts REFRESH_AHEAD seconds before expiry.
+SECRETS_CACHE_TTL_SECONDS = float(os.getenv("SECRETS_CACHE_TTL_SECONDS", "300"))
+SECRETS_CACHE_REFRESH_AHEAD_SECONDS = float(os.getenv("SECRETS_CACHE_REFRESH_AHEAD_SECONDS", "60"))
+# How long a failed lookup (with no last good value) is remembered before retrying
+SECRETS_CACHE_ERROR_TTL_SECONDS = float(os.getenv("SECRETS_CACHE_ERROR_TTL_SECONDS", "30"))
+
+
+class _CacheEntry:
+    """Cached secret value (or lookup error) with its refresh schedule."""
+
+    __slots__ = ("value", "error", "expires_at", "refresh_at", "refreshing")
+
+    def __init__(
+        self,
+        value: str | None,
+        error: Exception | None,
+        expires_at: float,
+        refresh_at: float,
+    ):
+        self.value = value
+        self.error = error
+        self.expires_at = expires_at
+        self.refresh_at = refresh_at
+        self.refreshing = False
+
+
+class SecretCache:
+    """
+    Thread-safe in-process TTL cache for resolved secret values.
+
+    - Fresh entries are served from memory without any AWS call
+    - Entries inside the refresh-ahead window are served immediately while a
+      background thread reloads them
+    - Expired entries are reloaded synchronously; if the reload fails the last
+      good value keeps being served and the next attempt is deferred
+    - Failed lookups with no last good value are cached for a short error TTL
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = SECRETS_CACHE_TTL_SECONDS,
+        refresh_ahead_seconds: float = SECRETS_CACHE_REFRESH_AHEAD_SECONDS,
+        error_ttl_seconds: float = SECRETS_CACHE_ERROR_TTL_SECONDS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        # Never refresh earlier than half-way through the TTL
+        self.refresh_ahead_seconds = min(refresh_ahead_seconds, ttl_seconds / 2)
+        self.error_ttl_seconds = error_ttl_seconds
+        self._entries: dict[Hashable, _CacheEntry] = {}
+        self._lock = threading.Lock()
+        # Concurrent loads of one key (cold, expired or disabled cache) share one fetch
+        self._flights = SingleFlight()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, cache_key: Hashable, loader: Callable[[], str]) -> str:
+        """
+        Return the cached value for cache_key, loading it with loader() if needed.
+
+        Raises:
+            Exception: Whatever loader() raised, if no last good value is available
+        """
+        if not self.enabled:
+            return self._flights.do(cache_key, loader)
+
+        now = time.monotonic()
+        entry = self._entries.get(cache_key)
+
+        if entry is not None and now < entry.expires_at:
+            if entry.error is not None:
+                raise_shared(entry.error)
+            if now >= entry.refresh_at:
+                self._schedule_refresh(cache_key, entry, loader)
+            return entry.value
+
+        # Missing or expired: load synchronously, one loader per key at a time
+        return self._flights.do(cache_key, lambda: self._load_if_stale(cache_key, loader))
+
+    def needs_load(self, cache_key: Hashable) -> bool:
+        """Whether get(cache_key) would call the loader (missing, expired or caching off)."""
+        if not self.enabled:
+            return True
+        entry = self._entries.get(cache_key)
+        return entry is None or time.monotonic() >= entry.expires_at
+
+    def invalidate(self, cache_key: Hashable | None = None) -> None:
+        """Drop one cached entry, or every entry if cache_key is None."""
+        with self._lock:
+            if cache_key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(cache_key, None)
+
+    def _load_if_stale(self, cache_key: Hashable, loader: Callable[[], str]) -> str:
+        # Another flight may have stored a fresh entry since get() looked
+        entry = self._entries.get(cache_key)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            if entry.error is not None:
+                raise_shared(entry.error)
+            return entry.value
+        return self._load(cache_key, loader, entry)
+
+    def _load(
+        self, cache_key: Hashable, loader: Callable[[], str], previous: _CacheEntry | None
+    ) -> str:
+        try:
+            value = loader()
+        except Exception as e:
+            now = time.monotonic()
+            if previous is not None and previous.value is not None:
+                # Serve the last good value and retry after the error TTL
+                logger.warning(
+                    f"Secret refresh failed for {cache_key!r}, serving last good value: {e}"
+                )
+                previous.expires_at = now + self.error_ttl_seconds
+                previous.refresh_at = previous.expires_at
+                return previous.value
+            with self._lock:
+                self._entries[cache_key] = _CacheEntry(
+                    None, e, now + self.error_ttl_seconds, now + self.error_ttl_seconds
+                )
+            raise
+
+        self._store(cache_key, value)
+        return value
+
+    def _store(self, cache_key: Hashable, value: str) -> None:
+        now = time.monotonic()
+        entry = _CacheEntry(
+            value,
+            None,
+            expires_at=now + self.ttl_seconds,
+            refresh_at=now + self.ttl_seconds - self.refresh_ahead_seconds,
+        )
+        with self._lock:
+            self._entries[cache_key] = entry
+
+    def _schedule_refresh(
+        self, cache_key: Hashable, entry: _CacheEntry, loader: Callable[[], str]
+    ) -> None:
+        with self._lock:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+
+        def refresh() -> None:
+            try:
+                self._store(cache_key, self._flights.do(cache_key, loader))
+                logger.debug(f"Refreshed cached secret {cache_key!r}")
+            except Exception as e:
+                # Keep serving the current value until it expires, retry after the error TTL
+                logger.warning(f"Background refresh failed for secret {cache_key!r}: {e}")
+                entry.refresh_at = min(
+                    entry.expires_at, time.monotonic() + self.error_ttl_seconds
+                )
+            finally:
+                entry.refreshing = False
+
+        threading.Thread(target=refresh, name="secret-cache-refresh", daemon=True).start()
+
+
+_secret_cache = SecretCache()
+
+
+def invalidate_secret_cache() -> None:
+    """Drop all cached secret values (e.g., after a manual rotation)."""
+    _secret_cache.invalidate()
+
 
 def discover_secret_name(secret_identifier: str, region: str | None = None) -> str:
     """
@@ -42,8 +226,11 @@ def discover_secret_name(secret_identifier: str, region: str | None = None) -> s
     # SSM Parameter path: /{environment}/{application}/secrets/{secret_identifier}/secret_name
     ssm_parameter_name = f"/{environment}/{application}/secrets/{secret_identifier}/secret_name"
 
+    # Import here: boto3's import chain can load this module (it shadows stdlib `secrets`)
+    from aws_clients import get_client
+
     try:
-        ssm_client = boto3.client("ssm", region_name=region)
+        ssm_client = get_client("ssm", region_name=region)
         response = ssm_client.get_parameter(Name=ssm_parameter_name)
         secret_name = response["Parameter"]["Value"]
         logger.debug(f"Discovered secret name '{secret_name}' for identifier '{secret_identifier}'")
@@ -88,8 +275,10 @@ def get_secret_from_secrets_manager(
     if region is None:
         region = os.getenv("AWS_REGION", "us-east-1")
 
+    from aws_clients import get_client  # Lazy import, see discover_secret_name
+
     try:
-        client = boto3.client("secretsmanager", region_name=region)
+        client = get_client("secretsmanager", region_name=region)
 
         response = client.get_secret_value(SecretId=secret_name)
         secret_string = response["SecretString"]
@@ -129,10 +318,11 @@ def get_secret_value(
     Get a secret value dynamically with automatic discovery.
 
     This function:
-    1. Discovers secret name from SSM Parameter Store (if use_discovery=True)
-    2. Retrieves secret value from Secrets Manager
-    3. Extracts specific key if secret is JSON
-    4. Falls back to environment variable if secret not found
+    1. Returns the cached value if it is still fresh (see SecretCache)
+    2. Discovers secret name from SSM Parameter Store (if use_discovery=True)
+    3. Retrieves secret value from Secrets Manager
+    4. Extracts specific key if secret is JSON
+    5. Falls back to environment variable if secret not found
 
     Args:
         secret_identifier: Secret identifier (e.g., 'jwt-signing-key', 'external-api-key')
@@ -148,6 +338,95 @@ def get_secret_value(
     Raises:
         ValueError: If secret not found and no fallback available
     """
+    cache_key = _cache_key(secret_identifier, key, region, use_discovery)
+
+    # Try Secrets Manager first (production), served from the in-process cache when fresh
+    try:
+        return _secret_cache.get(
+            cache_key,
+            lambda: _fetch_secret_value(secret_identifier, key, region, use_discovery),
+        )
+    except Exception as e:
+        logger.warning(f"Could not retrieve secret '{secret_identifier}' from Secrets Manager: {e}")
+
+        # Fallback to environment variable (local development)
+        if env_var_fallback:
+            value = os.getenv(env_var_fallback)
+            if value:
+                logger.info(f"Using {env_var_fallback} from environment variable (local dev)")
+                return value
+
+        # No fallback available
+        raise ValueError(
+            f"Secret '{secret_identifier}' not found in Secrets Manager "
+            f"and {env_var_fallback or 'environment variable'} not set"
+        ) from e
+
+
+async def get_secret_value_async(
+    secret_identifier: str,
+    key: str | None = None,
+    env_var_fallback: str | None = None,
+    region: str | None = None,
+    use_discovery: bool = True,
+) -> str:
+    """
+    get_secret_value for async handlers.
+
+    Fresh cache hits are answered inline; cold or expired lookups run in a worker
+    thread so SSM and Secrets Manager calls never block the event loop.
+
+    Raises:
+        ValueError: If secret not found and no fallback available
+    """
+    return await _call_off_loop_if_cold(
+        _cache_key(secret_identifier, key, region, use_discovery),
+        get_secret_value,
+        secret_identifier,
+        key,
+        env_var_fallback,
+        region,
+        use_discovery,
+    )
+
+
+async def _call_off_loop_if_cold(cache_key: Hashable, func: Callable[..., str], *args) -> str:
+    """Call func inline on a fresh cache hit, otherwise in a worker thread."""
+    if _secret_cache.needs_load(cache_key):
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+def _cache_key(
+    secret_identifier: str, key: str | None, region: str | None, use_discovery: bool
+) -> Hashable:
+    return (secret_identifier, key, region, use_discovery)
+
+
+def _fetch_secret_value(
+    secret_identifier: str,
+    key: str | None,
+    region: str | None,
+    use_discovery: bool,
+) -> str:
+    """Resolve a secret value from SSM discovery + Secrets Manager (uncached)."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with start_span("secrets.fetch", attributes={"secret.identifier": secret_identifier}):
+            value = _resolve_secret_value(secret_identifier, key, region, use_discovery)
+        outcome = "success"
+        return value
+    finally:
+        secret_fetch_duration_seconds.labels(outcome).observe(time.perf_counter() - started)
+
+
+def _resolve_secret_value(
+    secret_identifier: str,
+    key: str | None,
+    region: str | None,
+    use_discovery: bool,
+) -> str:
     # Discover secret name from SSM Parameter Store (dynamic discovery)
     if use_discovery:
         try:
@@ -167,38 +446,20 @@ def get_secret_value(
         else:
             secret_name = secret_identifier
 
-    # Try Secrets Manager first (production)
-    try:
-        secret = get_secret_from_secrets_manager(secret_name, region)
-
-        # Extract value based on key
-        if key:
-            value = secret.get(key)
-            if value is None:
-                raise ValueError(
-                    f"Key '{key}' not found in secret '{secret_name}'. "
-                    f"Available keys: {list(secret.keys())}"
-                )
-            return str(value)
-        else:
-            # Return "value" key for string secrets, or first value for JSON
-            return secret.get("value") or str(list(secret.values())[0])
-
-    except Exception as e:
-        logger.warning(f"Could not retrieve secret '{secret_identifier}' from Secrets Manager: {e}")
+    secret = get_secret_from_secrets_manager(secret_name, region)
 
-        # Fallback to environment variable (local development)
-        if env_var_fallback:
-            value = os.getenv(env_var_fallback)
-            if value:
-                logger.info(f"Using {env_var_fallback} from environment variable (local dev)")
-                return value
+    # Extract value based on key
+    if key:
+        value = secret.get(key)
+        if value is None:
+            raise ValueError(
+                f"Key '{key}' not found in secret '{secret_name}'. "
+                f"Available keys: {list(secret.keys())}"
+            )
+        return str(value)
 
-        # No fallback available
-        raise ValueError(
-            f"Secret '{secret_identifier}' not found in Secrets Manager "
-            f"and {env_var_fallback or 'environment variable'} not set"
-        ) from e
+    # Return "value" key for string secrets, or first value for JSON
+    return secret.get("value") or str(list(secret.values())[0])
 
 
 # Convenience functions for common secret types
@@ -292,6 +553,19 @@ def get_backend_api_key(env_var: str | None = None) -> str:
     )
 
 
+async def get_backend_api_key_async() -> str:
+    """
+    get_backend_api_key for async handlers (loads off the event loop, see
+    get_secret_value_async).
+
+    Raises:
+        ValueError: If secret not found and no fallback available
+    """
+    return await _call_off_loop_if_cold(
+        _cache_key("backend-api-key", "value", None, True), get_backend_api_key
+    )
+
+
 def get_api_key(service_name: str, env_var: str | None = None) -> str:
     """
     Get API key for a service (generic function).
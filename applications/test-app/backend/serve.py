@@ -0,0 +1,154 @@
+"""Production entry point: uvicorn workers sized to the container's CPU quota.
+
+    python serve.py
+
+Worker count is SERVER_WORKERS, or (when 0) SERVER_WORKERS_PER_CPU times the
+CPUs the container may use: the cgroup CPU quota (docker `cpus:`, ECS task
+cpu) rather than the host's core count, which os.cpu_count() reports. uvloop
+and httptools are used when installed (uvicorn[standard]).
+
+Each worker is a separate process with its own memory. Prometheus metrics
+(and the /api/metrics request count read from them) are merged across workers
+via METRICS_MULTIPROC_DIR, set here. The greeting cache and the rate limiter
+are only correct across workers with shared backends (CACHE_BACKEND=redis,
+RATE_LIMIT_STORAGE=redis): a memory cache serves other workers' stale
+listings, and memory rate limits multiply by the worker count. So with a
+memory backend in use, automatic sizing starts one worker, and an explicit
+SERVER_WORKERS above 1 refuses to start. To run several workers, set
+CACHE_BACKEND=redis with CACHE_REDIS_URL and RATE_LIMIT_STORAGE=redis with
+RATE_LIMIT_REDIS_URL (the redis client is a declared dependency of the app).
+"""
+
+import glob
+import importlib.util
+import logging
+import math
+import os
+import tempfile
+from collections.abc import Sequence
+from typing import Any
+
+import uvicorn
+
+from config import settings
+from logging_config import setup_logging
+
+
+logger = logging.getLogger("serve")
+
+
+def cgroup_cpu_limit(root: str = "/sys/fs/cgroup") -> float | None:
+    """CPUs allowed by the cgroup CPU quota, or None when unlimited or unknown."""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open(os.path.join(root, "cpu.max")) as f:
+            quota, period = f.read().split()[:2]
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1: quota of -1 means unlimited
+        with open(os.path.join(root, "cpu", "cpu.cfs_quota_us")) as f:
+            quota = int(f.read())
+        with open(os.path.join(root, "cpu", "cpu.cfs_period_us")) as f:
+            period = int(f.read())
+    except (OSError, ValueError):
+        return None
+    return quota / period if quota > 0 and period > 0 else None
+
+
+def available_cpus() -> float:
+    """CPUs this process can use: the cgroup quota, capped by the CPU affinity mask."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    limit = cgroup_cpu_limit()
+    return min(limit, cpus or 1) if limit else float(cpus or 1)
+
+
+def per_process_state() -> list[str]:
+    """Enabled backends that keep their state in each worker's memory."""
+    backends = []
+    if settings.CACHE_ENABLED and settings.CACHE_BACKEND == "memory":
+        backends.append("CACHE_BACKEND=memory")
+    if settings.RATE_LIMIT_ENABLED and settings.RATE_LIMIT_STORAGE == "memory":
+        backends.append("RATE_LIMIT_STORAGE=memory")
+    return backends
+
+
+def worker_count(
+    configured: int, per_cpu: float, cpus: float, per_process: Sequence[str] = ()
+) -> int:
+    """
+    Configured worker count, or per_cpu workers per available CPU (at least 1).
+
+    With per-process backends in use, automatic sizing gives one worker and an
+    explicit count above 1 raises ValueError.
+    """
+    if configured > 1 and per_process:
+        raise ValueError(
+            f"SERVER_WORKERS={configured} needs shared state, but {', '.join(per_process)} "
+            "is per worker; use the redis backends or SERVER_WORKERS=1"
+        )
+    if configured > 0:
+        return configured
+    if per_process:
+        return 1
+    return max(1, math.ceil(cpus * per_cpu))
+
+
+def server_options(workers: int) -> dict[str, Any]:
+    """Keyword arguments for uvicorn.run."""
+    return {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "workers": workers,
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE_SECONDS,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        "forwarded_allow_ips": settings.SERVER_FORWARDED_ALLOW_IPS,
+        # LoggingMiddleware writes the access log
+        "access_log": False,
+        "log_level": settings.LOG_LEVEL.lower(),
+    }
+
+
+def prepare_multiprocess_metrics() -> str:
+    """Create (or empty) the directory workers share metric snapshots through."""
+    directory = os.environ.get("METRICS_MULTIPROC_DIR") or tempfile.mkdtemp(prefix="metrics-")
+    os.makedirs(directory, exist_ok=True)
+    # Snapshots from a previous run would be counted as exited workers
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        os.remove(path)
+    # Workers inherit the environment and read it when metrics.py is imported
+    os.environ["METRICS_MULTIPROC_DIR"] = directory
+    return directory
+
+
+def main() -> None:
+    setup_logging(log_level=settings.LOG_LEVEL, log_format=settings.LOG_FORMAT)
+    cpus = available_cpus()
+    per_process = per_process_state()
+    try:
+        workers = worker_count(
+            settings.SERVER_WORKERS, settings.SERVER_WORKERS_PER_CPU, cpus, per_process
+        )
+    except ValueError as e:
+        logger.error(str(e))
+        raise SystemExit(1) from e
+    options = server_options(workers)
+    logger.info(
+        f"Starting {workers} worker(s) for {cpus:g} CPU(s) "
+        f"(loop={options['loop']}, http={options['http']})"
+    )
+    if per_process and settings.SERVER_WORKERS == 0:
+        logger.info(f"Single worker: {', '.join(per_process)} keeps state per worker")
+    if workers > 1:
+        prepare_multiprocess_metrics()
+    uvicorn.run("main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Request coalescing ("single-flight") for identical concurrent calls.
+
+When several callers ask for the same thing at once (a popular user's page on
+a cold cache, describe_table during a health-check burst, a secret whose cache
+entry just expired), only the first caller runs the backend call; the others
+wait for it and share its result or exception. Nothing is cached: a call that
+starts after the in-flight one finished runs again.
+
+- SingleFlight: for blocking code running on threads (cache.py, database.py,
+  secrets.py)
+- AsyncSingleFlight: for coroutines on an event loop (async_database.py);
+  waiters do not hold executor threads or in-flight slots while they wait
+
+This module must not import config or boto3 (it is used by secrets.py).
+"""
+
+import asyncio
+import copy
+import functools
+import json
+import threading
+import weakref
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+
+T = TypeVar("T")
+
+
+def call_key(func: Callable, args: tuple, kwargs: dict) -> str:
+    """Key identifying a call by function and arguments (arguments must be JSON-like)."""
+    return json.dumps(
+        [func.__module__, func.__qualname__, args, kwargs], sort_keys=True, default=str
+    )
+
+
+def raise_shared(error: Exception):
+    """
+    Raise a fresh copy of an exception shared by several callers, chained from it.
+
+    Raising the shared instance itself from several threads (or repeatedly)
+    appends every caller's frames to its one traceback and overwrites its
+    __context__.
+    """
+    raise copy.copy(error) from error
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "completed")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Exception | None = None
+        # False if the leader was interrupted (KeyboardInterrupt, SystemExit)
+        self.completed = False
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Run func(), or wait for the in-flight call with the same key and share its outcome."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise_shared(call.error)
+            if not call.completed:
+                # The leader's interrupt is not ours to raise: run the call again
+                return self.do(key, func)
+            return call.result
+
+        try:
+            call.result = func()
+            call.completed = True
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Collapse concurrent awaits with the same key into one task (per event loop)."""
+
+    def __init__(self):
+        # Tasks belong to the loop that created them, so keep one table per loop
+        self._calls: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[Hashable, asyncio.Future]
+        ] = weakref.WeakKeyDictionary()
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Await func(), or the in-flight task with the same key."""
+        calls = self._calls.setdefault(asyncio.get_running_loop(), {})
+        task = calls.get(key)
+        leader = task is None
+        if leader:
+            task = asyncio.ensure_future(func())
+            calls[key] = task
+            task.add_done_callback(lambda done: calls.pop(key) if calls.get(key) is done else None)
+        else:
+            self.coalesced += 1
+        # Shield so one caller's cancellation (client disconnect) does not cancel the others
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            if leader:
+                raise
+            raise_shared(e)
+
+
+def singleflight(func: Callable[..., T]) -> Callable[..., T]:
+    """Decorate a blocking function so identical concurrent calls share one execution."""
+    flights = SingleFlight()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        return flights.do(call_key(func, args, kwargs), lambda: func(*args, **kwargs))
+
+    wrapper.flights = flights  # type: ignore[attr-defined]
+    return wrapper
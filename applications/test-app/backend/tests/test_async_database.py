@@ -0,0 +1,140 @@
+"""
+Unit tests for the async DynamoDB layer (bounded executor with backpressure).
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import async_database
+from config import settings
+
+
+@pytest.mark.unit
+class TestRunInExecutor:
+    """Test suite for async_database.run_in_executor."""
+
+    async def test_blocking_call_does_not_block_event_loop(self):
+        """Test that a slow database call leaves the event loop free."""
+        loop_thread = threading.get_ident()
+        ticks = 0
+
+        def slow_call():
+            time.sleep(0.2)
+            return threading.get_ident()
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        worker_thread, _ = await asyncio.gather(async_database.run_in_executor(slow_call), ticker())
+
+        assert worker_thread != loop_thread
+        assert ticks == 5
+
+    async def test_rejects_when_in_flight_limit_exhausted(self, monkeypatch):
+        """Test that callers get DatabaseBusyError instead of queueing forever."""
+        monkeypatch.setattr(settings, "DYNAMODB_MAX_IN_FLIGHT", 1)
+        monkeypatch.setattr(settings, "DYNAMODB_QUEUE_TIMEOUT_SECONDS", 0.05)
+        monkeypatch.setattr(async_database, "_semaphores", type(async_database._semaphores)())
+        release = threading.Event()
+
+        first = asyncio.create_task(async_database.run_in_executor(release.wait, 1))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(async_database.DatabaseBusyError):
+            await async_database.run_in_executor(lambda: None)
+
+        release.set()
+        assert await first is True
+
+    async def test_cancelled_call_keeps_slot_until_done(self, monkeypatch):
+        """Test that cancelling a caller frees its slot only when the thread finishes."""
+        monkeypatch.setattr(settings, "DYNAMODB_MAX_IN_FLIGHT", 1)
+        monkeypatch.setattr(settings, "DYNAMODB_QUEUE_TIMEOUT_SECONDS", 0.05)
+        monkeypatch.setattr(async_database, "_semaphores", type(async_database._semaphores)())
+        release = threading.Event()
+
+        first = asyncio.create_task(async_database.run_in_executor(release.wait, 1))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        with pytest.raises(async_database.DatabaseBusyError):
+            await async_database.run_in_executor(lambda: None)
+
+        release.set()
+        assert await async_database.run_in_executor(lambda: 42) == 42
+
+    async def test_timed_out_waiters_leave_full_capacity(self, monkeypatch):
+        """Test that waiters rejected on timeout never keep a slot."""
+        monkeypatch.setattr(settings, "DYNAMODB_MAX_IN_FLIGHT", 3)
+        monkeypatch.setattr(settings, "DYNAMODB_QUEUE_TIMEOUT_SECONDS", 0.02)
+        monkeypatch.setattr(async_database, "_semaphores", type(async_database._semaphores)())
+        release = threading.Event()
+
+        holders = [
+            asyncio.create_task(async_database.run_in_executor(release.wait, 1)) for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        waiters = [
+            asyncio.create_task(async_database.run_in_executor(lambda: None)) for _ in range(20)
+        ]
+        await asyncio.sleep(0)
+        # Block the loop past the queue timeout while the holders finish, so slot
+        # releases and waiter timeouts are handled in the same loop iteration
+        release.set()
+        time.sleep(0.05)
+        await asyncio.gather(*holders, *waiters, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+        # Every slot is free again: DYNAMODB_MAX_IN_FLIGHT calls run at once
+        started = threading.Barrier(3, timeout=1)
+        results = await asyncio.gather(
+            *(async_database.run_in_executor(started.wait) for _ in range(3))
+        )
+        assert sorted(results) == [0, 1, 2]
+
+    async def test_executor_recreated_after_shutdown(self):
+        """Test that shutdown() does not break later calls (e.g., repeated lifespans)."""
+        async_database.shutdown()
+        assert await async_database.run_in_executor(lambda: 42) == 42
+
+
+@pytest.mark.unit
+class TestGetUsersGreetings:
+    """Test suite for async_database.get_users_greetings."""
+
+    async def test_fan_out_is_bounded_and_ordered(self, monkeypatch):
+        """Test that per-user queries overlap up to the limit and results keep request order."""
+        monkeypatch.setattr(settings, "GREETINGS_USERS_CONCURRENCY", 2)
+        lock = threading.Lock()
+        in_flight = peak = 0
+
+        def fake_user_greetings(user_name, **kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            return [user_name], None
+
+        monkeypatch.setattr(async_database.database, "get_user_greetings", fake_user_greetings)
+        monkeypatch.setattr(
+            async_database.database,
+            "get_greeting_counts",
+            lambda names: {name: len(name) for name in names},
+        )
+
+        results = await async_database.get_users_greetings(["c", "bb", "a", "dddd"])
+
+        assert list(results) == ["c", "bb", "a", "dddd"]
+        assert results["bb"] == (["bb"], 2, None)
+        assert peak == 2
@@ -0,0 +1,61 @@
+"""
+Unit tests for the shared boto3 client registry.
+"""
+
+import pytest
+
+import aws_clients
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    """Start and finish every test with an empty registry."""
+    aws_clients.reset_clients()
+    yield
+    aws_clients.reset_clients()
+
+
+@pytest.mark.unit
+class TestClientRegistry:
+    """Test suite for client/resource sharing and configuration."""
+
+    def test_same_arguments_share_one_client(self):
+        """Test that repeated lookups return the same client instance."""
+        first = aws_clients.get_client("ssm", region_name="us-east-1")
+        second = aws_clients.get_client("ssm", region_name="us-east-1")
+        assert first is second
+
+    def test_default_region_matches_explicit_region(self, monkeypatch):
+        """Test that the default region resolves to the same registry entry."""
+        monkeypatch.setenv("AWS_REGION", "eu-west-1")
+        assert aws_clients.get_client("ssm") is aws_clients.get_client(
+            "ssm", region_name="eu-west-1"
+        )
+
+    @pytest.mark.parametrize(
+        ("left", "right"),
+        [
+            ({"region_name": "us-east-1"}, {"region_name": "eu-west-1"}),
+            ({}, {"endpoint_url": "http://localhost:8000"}),
+        ],
+    )
+    def test_region_and_endpoint_are_part_of_the_key(self, left, right):
+        """Test that different regions or endpoints get separate clients."""
+        assert aws_clients.get_client("dynamodb", **left) is not aws_clients.get_client(
+            "dynamodb", **right
+        )
+
+    def test_client_uses_tuned_config(self):
+        """Test that pool size, timeouts and retry mode come from the shared config."""
+        client = aws_clients.get_client("dynamodb", region_name="us-east-1")
+        config = client.meta.config
+
+        assert config.max_pool_connections == aws_clients.AWS_MAX_POOL_CONNECTIONS
+        assert config.connect_timeout == aws_clients.AWS_CONNECT_TIMEOUT_SECONDS
+        assert config.read_timeout == aws_clients.AWS_READ_TIMEOUT_SECONDS
+        assert config.retries["mode"] == aws_clients.AWS_RETRY_MODE
+
+    def test_resources_are_shared(self):
+        """Test that resources are cached like clients."""
+        first = aws_clients.get_resource("dynamodb", region_name="us-east-1")
+        assert first is aws_clients.get_resource("dynamodb", region_name="us-east-1")
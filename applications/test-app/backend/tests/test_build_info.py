@@ -0,0 +1,83 @@
+"""
+Unit tests for build info loading and pre-rendered health/version/hello bodies.
+"""
+
+import asyncio
+import json
+import os
+import signal
+
+import pytest
+
+import build_info
+
+
+@pytest.fixture
+def version_file(tmp_path, monkeypatch):
+    """Point build_info at a temporary version.json and return a writer for it."""
+    path = tmp_path / "version.json"
+    monkeypatch.setattr(build_info, "VERSION_FILE", str(path))
+    monkeypatch.delenv("ENVIRONMENT", raising=False)
+
+    def write(**data):
+        path.write_text(json.dumps(data))
+
+    return write
+
+
+@pytest.mark.unit
+class TestBuildInfo:
+    """Test suite for build_info."""
+
+    def test_bodies_use_version_file(self, version_file):
+        """Test that /version, /health and /api/hello bodies come from version.json."""
+        version_file(version="1.2.3", commit="abcdef123456", build_date="2025-01-01")
+
+        info = build_info.reload_build_info()
+
+        assert json.loads(info.version_body)["version"] == "1.2.3"
+        assert json.loads(info.health_connected_body) == {
+            "status": "healthy",
+            "database": "connected",
+            "error": None,
+            "version": "1.2.3",
+            "commit": "abcdef123456",
+        }
+        assert json.loads(info.hello_body)["message"] == (
+            "hello from backend (build: abcdef1, 2025-01-01)"
+        )
+
+    def test_missing_file_falls_back_to_environment(self, version_file, monkeypatch):
+        """Test that env vars are used when version.json does not exist."""
+        monkeypatch.setenv("APP_VERSION", "9.9.9")
+        monkeypatch.setenv("GIT_COMMIT", "fedcba")
+
+        info = build_info.reload_build_info()
+
+        assert json.loads(info.version_body)["commit"] == "fedcba"
+        assert json.loads(info.health_unavailable_body)["version"] == "9.9.9"
+        assert json.loads(info.hello_body)["message"] == "hello from backend"
+
+    def test_production_hello_hides_build(self, version_file, monkeypatch):
+        """Test that /api/hello omits build details in production."""
+        version_file(version="1.2.3", commit="abcdef123456", build_date="2025-01-01")
+        monkeypatch.setenv("ENVIRONMENT", "production")
+
+        info = build_info.reload_build_info()
+
+        assert json.loads(info.hello_body)["message"] == "hello from backend"
+
+    async def test_sighup_reloads(self, version_file):
+        """Test that SIGHUP re-reads version.json."""
+        version_file(version="1.0.0")
+        build_info.reload_build_info()
+        if not build_info.install_reload_handler():
+            pytest.skip("signal handlers unavailable on this platform")
+        try:
+            version_file(version="2.0.0")
+            os.kill(os.getpid(), signal.SIGHUP)
+            await asyncio.sleep(0.05)
+        finally:
+            build_info.remove_reload_handler()
+
+        assert build_info.get_build_info().version == "2.0.0"
@@ -0,0 +1,176 @@
+"""
+Unit tests for the read-through greeting cache (in-memory backend).
+"""
+
+import threading
+import time
+
+import pytest
+
+from cache import MISSING, InMemoryBackend, ReadThroughCache, user_namespace
+
+
+class CountingLoader:
+    """Loader that records how often it was called."""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+@pytest.fixture
+def cache():
+    return ReadThroughCache(InMemoryBackend(max_entries=100), ttl_seconds=60)
+
+
+@pytest.mark.unit
+class TestInMemoryBackend:
+    """Test suite for cache.InMemoryBackend."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is evicted past max_entries."""
+        backend = InMemoryBackend(max_entries=2)
+        backend.set("a", 1, 60)
+        backend.set("b", 2, 60)
+        backend.get("a")
+        backend.set("c", 3, 60)
+
+        assert backend.get("a") == 1
+        assert backend.get("b") is MISSING
+        assert backend.get("c") == 3
+
+    def test_entries_expire_after_ttl(self):
+        """Test that entries are dropped once their TTL has passed."""
+        backend = InMemoryBackend()
+        backend.set("a", 1, 0.01)
+        time.sleep(0.02)
+
+        assert backend.get("a") is MISSING
+
+
+@pytest.mark.unit
+class TestReadThroughCache:
+    """Test suite for cache.ReadThroughCache."""
+
+    def test_second_read_is_served_from_cache(self, cache):
+        """Test that the loader runs once for repeated reads of the same key."""
+        loader = CountingLoader(["greeting"])
+
+        assert cache.get_or_load("greetings", ["page", 1], loader) == ["greeting"]
+        assert cache.get_or_load("greetings", ["page", 1], loader) == ["greeting"]
+        assert loader.calls == 1
+        assert cache.stats()["hit_ratio"] == 0.5
+
+    def test_none_is_cached(self, cache):
+        """Test that a None result (e.g. missing counter) is cached, not reloaded."""
+        loader = CountingLoader(None)
+
+        cache.get_or_load("greetings", "count", loader)
+        cache.get_or_load("greetings", "count", loader)
+
+        assert loader.calls == 1
+
+    def test_invalidate_only_affects_its_namespace(self, cache):
+        """Test that invalidating one user's namespace leaves other users cached."""
+        alice = CountingLoader(["a"])
+        bob = CountingLoader(["b"])
+        cache.get_or_load(user_namespace("alice"), "page", alice)
+        cache.get_or_load(user_namespace("bob"), "page", bob)
+
+        cache.invalidate(user_namespace("alice"))
+        cache.get_or_load(user_namespace("alice"), "page", alice)
+        cache.get_or_load(user_namespace("bob"), "page", bob)
+
+        assert alice.calls == 2
+        assert bob.calls == 1
+
+    def test_shared_backend_propagates_invalidation(self):
+        """Test that two caches on one backend (e.g. two workers) see each other's writes."""
+        backend = InMemoryBackend()
+        worker_a = ReadThroughCache(backend, ttl_seconds=60)
+        worker_b = ReadThroughCache(backend, ttl_seconds=60)
+        loader = CountingLoader(["greeting"])
+
+        worker_a.get_or_load("greetings", "page", loader)
+        worker_b.invalidate("greetings")
+        worker_a.get_or_load("greetings", "page", loader)
+
+        assert loader.calls == 2
+
+    def test_concurrent_misses_share_one_load(self, cache):
+        """Test that identical concurrent misses call the loader once."""
+        release = threading.Event()
+        calls = []
+
+        def slow_loader():
+            calls.append(1)
+            release.wait(5)
+            return ["greeting"]
+
+        results = []
+        readers = [
+            threading.Thread(
+                target=lambda: results.append(cache.get_or_load("greetings", "page", slow_loader))
+            )
+            for _ in range(5)
+        ]
+        for reader in readers:
+            reader.start()
+        time.sleep(0.05)
+        release.set()
+        for reader in readers:
+            reader.join(5)
+
+        assert results == [["greeting"]] * 5
+        assert len(calls) == 1
+
+    def test_load_started_before_invalidation_is_not_shared(self, cache):
+        """Test that a reader after a write does not join (and cache) a pre-write load."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def pre_write_loader():
+            started.set()
+            release.wait(5)
+            return ["old"]
+
+        old_reader = threading.Thread(
+            target=cache.get_or_load, args=("greetings", "page", pre_write_loader)
+        )
+        old_reader.start()
+        assert started.wait(5)
+
+        cache.invalidate("greetings")
+        post_write = CountingLoader(["old", "new"])
+        new_value = cache.get_or_load("greetings", "page", post_write)
+        release.set()
+        old_reader.join(5)
+
+        assert new_value == ["old", "new"]
+        assert post_write.calls == 1
+        assert cache.get_or_load("greetings", "page", CountingLoader(["stale"])) == ["old", "new"]
+
+    def test_backend_errors_fall_back_to_loader(self, cache, monkeypatch):
+        """Test that a failing backend costs a reload instead of an error."""
+
+        def broken(*args):
+            raise ConnectionError("cache down")
+
+        monkeypatch.setattr(cache.backend, "get", broken)
+        loader = CountingLoader(["greeting"])
+
+        assert cache.get_or_load("greetings", "page", loader) == ["greeting"]
+
+    def test_disabled_cache_always_loads(self):
+        """Test that CACHE_ENABLED=false bypasses the backend entirely."""
+        cache = ReadThroughCache(InMemoryBackend(), ttl_seconds=60, enabled=False)
+        loader = CountingLoader(1)
+
+        cache.get_or_load("greetings", "count", loader)
+        cache.get_or_load("greetings", "count", loader)
+
+        assert loader.calls == 2
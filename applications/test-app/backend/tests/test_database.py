@@ -0,0 +1,572 @@
+"""
+Unit tests for DynamoDB batch writes (no AWS access, fake low-level client).
+"""
+
+import contextlib
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+import database
+from config import settings
+
+
+class FakeBatchClient:
+    """Minimal stand-in for the DynamoDB client's batch_write_item."""
+
+    def __init__(self, unprocessed_rounds: int):
+        self.unprocessed_rounds = unprocessed_rounds
+        self.calls: list[int] = []
+
+    def batch_write_item(self, RequestItems):  # noqa: N803 - boto3 argument name
+        requests = RequestItems[database.table_name]
+        self.calls.append(len(requests))
+        if len(self.calls) <= self.unprocessed_rounds:
+            # Throttle the second half of the batch
+            return {"UnprocessedItems": {database.table_name: requests[len(requests) // 2 :]}}
+        return {"UnprocessedItems": {}}
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    """Patch the shared client and disable backoff sleeps."""
+    monkeypatch.setattr(database, "table_name", "test-greetings")
+    monkeypatch.setattr(settings, "DYNAMODB_BATCH_BACKOFF_BASE_SECONDS", 0)
+
+    def install(unprocessed_rounds: int) -> FakeBatchClient:
+        client = FakeBatchClient(unprocessed_rounds)
+        monkeypatch.setattr(database, "dynamodb_client", client)
+        return client
+
+    return install
+
+
+def _items(count: int) -> list[dict]:
+    return [{"id": f"id-{n}", "created_at": "2025-01-01T00:00:00+00:00"} for n in range(count)]
+
+
+@pytest.mark.unit
+class TestBatchWriteChunk:
+    """Test suite for database._batch_write_chunk."""
+
+    def test_unprocessed_items_are_retried(self, fake_client):
+        """Test that UnprocessedItems are resubmitted until accepted."""
+        client = fake_client(unprocessed_rounds=2)
+
+        assert database._batch_write_chunk(_items(8)) == []
+        assert client.calls == [8, 4, 2]
+
+    def test_items_left_after_retries_are_reported(self, fake_client, monkeypatch):
+        """Test that items still unprocessed after the retry budget are returned."""
+        monkeypatch.setattr(settings, "DYNAMODB_BATCH_MAX_RETRIES", 1)
+        fake_client(unprocessed_rounds=10)
+
+        leftover = database._batch_write_chunk(_items(8))
+
+        assert [item["id"] for item in leftover] == ["id-6", "id-7"]
+
+
+def _greeting(n: int) -> database.Greeting:
+    return database.Greeting(id=f"id-{n}", user_name=f"user{n}", message="Hello")
+
+
+@pytest.fixture
+def recorded_writes(monkeypatch):
+    """Replace _write_greetings with a recorder; ids in `failing` fail once."""
+    batches: list[list[str]] = []
+    failing: set[str] = set()
+
+    def fake_write(greetings):
+        batches.append([g.id for g in greetings])
+        errors = {g.id: "Database error occurred" for g in greetings if g.id in failing}
+        failing.difference_update(errors)
+        return errors
+
+    monkeypatch.setattr(database, "_write_greetings", fake_write)
+    return batches, failing
+
+
+@pytest.mark.unit
+class TestGreetingWriteBuffer:
+    """Test suite for database.GreetingWriteBuffer."""
+
+    def test_drain_flushes_in_flush_size_groups(self, recorded_writes):
+        """Test that buffered greetings are written in groups and drained on stop."""
+        batches, _ = recorded_writes
+        buffer = database.GreetingWriteBuffer(
+            max_size=100, flush_size=2, flush_interval_seconds=0.05
+        )
+
+        for n in range(5):
+            assert buffer.submit(_greeting(n))
+        buffer.drain(timeout=5)
+
+        assert sorted(i for batch in batches for i in batch) == [f"id-{n}" for n in range(5)]
+        assert all(len(batch) <= 2 for batch in batches)
+        stats = buffer.stats()
+        assert stats["flushed_total"] == 5
+        assert stats["queue_depth"] == 0
+
+    def test_failed_writes_are_requeued(self, recorded_writes):
+        """Test that a greeting whose write failed is retried on a later flush."""
+        batches, failing = recorded_writes
+        failing.add("id-0")
+        buffer = database.GreetingWriteBuffer(
+            max_size=10, flush_size=10, flush_interval_seconds=0.05
+        )
+
+        buffer.submit(_greeting(0))
+        buffer.submit(_greeting(1))
+        for _ in range(100):
+            if buffer.stats()["flushed_total"] == 2:
+                break
+            time.sleep(0.02)
+        buffer.drain(timeout=5)
+
+        assert batches[-1] == ["id-0"]
+        assert buffer.stats()["requeued_total"] == 1
+        assert buffer.stats()["dropped_total"] == 0
+
+    def test_submit_reports_full_buffer(self, recorded_writes):
+        """Test that submit returns False instead of blocking when the buffer is full."""
+        buffer = database.GreetingWriteBuffer(max_size=1, flush_size=10, flush_interval_seconds=5)
+        buffer._stopping.set()  # keep the flush thread from emptying the queue early
+        buffer._thread = threading.current_thread()
+
+        assert buffer.submit(_greeting(0))
+        assert not buffer.submit(_greeting(1))
+
+    def test_submit_after_drain_is_refused(self, recorded_writes):
+        """Test that a drained buffer refuses greetings instead of starting a new thread."""
+        batches, _ = recorded_writes
+        buffer = database.GreetingWriteBuffer(
+            max_size=10, flush_size=10, flush_interval_seconds=0.05
+        )
+        buffer.submit(_greeting(0))
+        buffer.drain(timeout=5)
+        thread = buffer._thread
+
+        assert not buffer.submit(_greeting(1))
+        assert buffer._thread is thread
+        assert not thread.is_alive()
+        assert buffer.stats()["queue_depth"] == 0
+        assert batches == [["id-0"]]
+
+
+class FakePagedTable:
+    """Table stand-in whose query/scan return at most `page_size` items per call."""
+
+    def __init__(self, items: list[dict], page_size: int):
+        self.items = items
+        self.page_size = page_size
+        self.calls: list[dict] = []
+
+    def _page(self, **kwargs):
+        self.calls.append(kwargs)
+        start = kwargs.get("ExclusiveStartKey", {}).get("offset", 0)
+        end = min(start + self.page_size, start + kwargs["Limit"], len(self.items))
+        response = {"Items": self.items[start:end]}
+        if end < len(self.items):
+            response["LastEvaluatedKey"] = {"offset": end}
+        return response
+
+    query = _page
+    scan = _page
+
+
+@pytest.fixture
+def paged_table(monkeypatch):
+    """Install a FakePagedTable behind database.dynamodb_resource."""
+
+    def install(
+        items: list[dict], page_size: int, table_class: type[FakePagedTable] = FakePagedTable
+    ) -> FakePagedTable:
+        table = table_class(items, page_size)
+        resource = type("FakeResource", (), {"Table": lambda self, name: table})()
+        monkeypatch.setattr(database, "dynamodb_resource", resource)
+        monkeypatch.setattr(database, "table_name", "test-greetings")
+        monkeypatch.setattr(database, "database_available", True)
+        database.greeting_cache.clear()
+        return table
+
+    return install
+
+
+@pytest.mark.unit
+class TestGetUserGreetings:
+    """Test suite for database.get_user_greetings pagination."""
+
+    def test_follows_pages_up_to_limit(self, paged_table, monkeypatch):
+        """Test that short pages are followed until `limit` items are read."""
+        items = [{"id": f"id-{n}", "created_at": f"2025-01-0{n}"} for n in range(1, 8)]
+        table = paged_table(items, page_size=2)
+        monkeypatch.setattr(database, "user_index_sorted", True)
+
+        greetings, last_key = database.get_user_greetings("alice", limit=5)
+
+        assert [g.id for g in greetings] == [f"id-{n}" for n in range(1, 6)]
+        assert all(g.user_name == "alice" for g in greetings)
+        assert last_key == {"offset": 5}
+        assert table.calls[0]["ScanIndexForward"] is False
+
+        greetings, last_key = database.get_user_greetings("alice", limit=5, start_key=last_key)
+
+        assert [g.id for g in greetings] == ["id-6", "id-7"]
+        assert last_key is None
+
+    def test_unsorted_index_sorts_each_page(self, paged_table, monkeypatch):
+        """Test that a user_name-only index (the Terraform schema) gives newest-first pages."""
+        items = [{"id": f"id-{n}", "created_at": f"2025-01-0{n}"} for n in (2, 5, 1, 4, 3)]
+        paged_table(items, page_size=10)
+        monkeypatch.setattr(database, "user_index_sorted", False)
+
+        greetings, last_key = database.get_user_greetings("alice", limit=3)
+
+        assert [g.id for g in greetings] == ["id-5", "id-2", "id-1"]
+        assert last_key == {"offset": 3}
+
+    @pytest.mark.parametrize(
+        ("key_schema", "expected"),
+        [
+            ([{"AttributeName": "user_name", "KeyType": "HASH"}], False),
+            (
+                [
+                    {"AttributeName": "user_name", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                True,
+            ),
+        ],
+    )
+    def test_index_schema_is_detected(self, monkeypatch, key_schema, expected):
+        """Test that describe_table tells whether user-name-index is sorted by created_at."""
+        monkeypatch.setattr(database, "user_index_sorted", None)
+        monkeypatch.setattr(database, "feed_index_available", False)
+        monkeypatch.setattr(database, "table_status", None)
+        indexes = [{"IndexName": "user-name-index", "KeySchema": key_schema}]
+
+        database.record_table_description({"Table": {"GlobalSecondaryIndexes": indexes}})
+
+        assert database.user_index_sorted is expected
+        assert database.feed_index_available is False
+
+    def test_projection_uses_name_placeholders(self, paged_table):
+        """Test that summary reads send a ProjectionExpression with placeholders."""
+        table = paged_table([], page_size=10)
+
+        database.get_user_greetings("alice", attributes=database.USER_GREETINGS_SUMMARY_ATTRIBUTES)
+
+        assert table.calls[0]["ProjectionExpression"] == "#p0, #p1, #p2"
+        assert table.calls[0]["ExpressionAttributeNames"] == {
+            "#p0": "id",
+            "#p1": "user_name",
+            "#p2": "created_at",
+        }
+
+    def test_scan_fallback_is_paginated(self, paged_table):
+        """Test that the scan fallback combines the user filter with the counter filter."""
+        items = [{"id": f"id-{n}", "created_at": f"2025-01-0{n}"} for n in range(1, 4)]
+        table = paged_table(items, page_size=2)
+
+        greetings, last_key = database._get_user_greetings_scan("alice", limit=2)
+
+        assert [g.id for g in greetings] == ["id-2", "id-1"]
+        assert last_key == {"offset": 2}
+        assert table.calls[0]["FilterExpression"] == (
+            "(user_name = :user_name) AND NOT begins_with(#id, :counter_prefix)"
+        )
+
+
+class FakeFeedTable(FakePagedTable):
+    """Feed GSI stand-in: per-shard newest-first queries resuming after an item key."""
+
+    def query(self, **kwargs):
+        self.calls.append(kwargs)
+        shard = kwargs["ExpressionAttributeValues"][":shard"]
+        items = sorted(
+            (item for item in self.items if item["feed_shard"] == shard),
+            key=lambda item: item["created_at"],
+            reverse=True,
+        )
+        start = 0
+        if "ExclusiveStartKey" in kwargs:
+            ids = [item["id"] for item in items]
+            start = ids.index(kwargs["ExclusiveStartKey"]["id"]) + 1
+        end = min(start + self.page_size, start + kwargs["Limit"], len(items))
+        response = {"Items": items[start:end]}
+        if end < len(items):
+            last = items[end - 1]
+            response["LastEvaluatedKey"] = {
+                "id": last["id"],
+                "created_at": last["created_at"],
+                "feed_shard": shard,
+            }
+        return response
+
+
+def _feed_items(shards: list[int]) -> list[dict]:
+    """One item per entry, oldest first, in the given feed shard."""
+    return [
+        {"id": f"id-{n}", "created_at": f"2025-01-01T00:00:{n:02d}", "feed_shard": f"feed#{shard}"}
+        for n, shard in enumerate(shards)
+    ]
+
+
+@pytest.fixture
+def feed_table(paged_table, monkeypatch):
+    """Install a FakeFeedTable with the feed index available and no counters."""
+    monkeypatch.setattr(database, "feed_index_available", True)
+    monkeypatch.setattr(database, "get_greeting_count", lambda: None)
+
+    def install(items: list[dict], shard_count: int, page_size: int = 2) -> FakeFeedTable:
+        monkeypatch.setattr(settings, "FEED_SHARD_COUNT", shard_count)
+        return paged_table(items, page_size, table_class=FakeFeedTable)
+
+    return install
+
+
+def _queried_shards(table: FakeFeedTable) -> set[str]:
+    return {call["ExpressionAttributeValues"][":shard"] for call in table.calls}
+
+
+@pytest.mark.unit
+class TestGetRecentGreetings:
+    """Test suite for database.get_recent_greetings across feed shards."""
+
+    def test_pages_merge_shards_newest_first(self, feed_table):
+        """Test that resuming from positions walks every shard once, newest first."""
+        items = _feed_items([0, 2, 1, 1, 0, 2, 2, 0, 1, 0, 1])
+        feed_table(items, shard_count=3)
+
+        pages = []
+        greetings, _, positions = database.get_recent_greetings(limit=4)
+        pages.append([g.id for g in greetings])
+        while positions:
+            greetings, _, positions = database.get_recent_greetings(limit=4, positions=positions)
+            pages.append([g.id for g in greetings])
+
+        assert [len(page) for page in pages] == [4, 4, 3]
+        assert [i for page in pages for i in page] == [f"id-{n}" for n in range(10, -1, -1)]
+
+    def test_positions_resume_after_last_item_per_shard(self, feed_table):
+        """Test that each shard's position is the key of the last item taken from it."""
+        feed_table(_feed_items([0, 1, 0, 1, 0, 1]), shard_count=2)
+
+        greetings, _, positions = database.get_recent_greetings(limit=3)
+
+        assert [g.id for g in greetings] == ["id-5", "id-4", "id-3"]
+        assert positions == {
+            "feed#0": {"id": "id-4", "created_at": "2025-01-01T00:00:04", "feed_shard": "feed#0"},
+            "feed#1": {"id": "id-3", "created_at": "2025-01-01T00:00:03", "feed_shard": "feed#1"},
+        }
+
+    def test_exhausted_shards_are_dropped(self, feed_table):
+        """Test that shards with nothing left are removed and no longer queried."""
+        # feed#0 holds only the newest item, feed#2 is empty
+        table = feed_table(_feed_items([1, 1, 1, 1, 0]), shard_count=3)
+
+        greetings, _, positions = database.get_recent_greetings(limit=2)
+
+        assert [g.id for g in greetings] == ["id-4", "id-3"]
+        assert list(positions) == ["feed#1"]
+
+        table.calls.clear()
+        greetings, _, positions = database.get_recent_greetings(limit=5, positions=positions)
+
+        assert [g.id for g in greetings] == ["id-2", "id-1", "id-0"]
+        assert positions is None
+        assert _queried_shards(table) == {"feed#1"}
+
+    def test_skip_walks_keys_only(self, feed_table):
+        """Test that skip reads projected keys, then the page starts right after them."""
+        table = feed_table(_feed_items([0, 1, 0, 1, 0, 1, 0]), shard_count=2)
+
+        greetings, _, _ = database.get_recent_greetings(limit=2, skip=3)
+
+        assert [g.id for g in greetings] == ["id-3", "id-2"]
+        skip_calls = [call for call in table.calls if "ProjectionExpression" in call]
+        assert skip_calls
+        assert all(call["Limit"] <= 3 for call in skip_calls)
+        assert all(
+            call["ProjectionExpression"] == "#id, created_at, feed_shard" for call in skip_calls
+        )
+
+
+class FakeCounterStore:
+    """In-memory table behind both the low-level client and the resource."""
+
+    def __init__(self, items: list[dict] | None = None):
+        self.items = {(item["id"], item["created_at"]): dict(item) for item in items or []}
+        self.transactions: list[list[dict]] = []
+
+    # Low-level client
+    def transact_write_items(self, TransactItems):  # noqa: N803 - boto3 argument name
+        self.transactions.append(TransactItems)
+        for op in TransactItems:
+            if "Put" in op:
+                item = {key: value["S"] for key, value in op["Put"]["Item"].items()}
+                self.items[(item["id"], item["created_at"])] = item
+            if "Update" in op:
+                key = op["Update"]["Key"]
+                item = self.items.setdefault(
+                    (key["id"]["S"], key["created_at"]["S"]),
+                    {"id": key["id"]["S"], "created_at": key["created_at"]["S"]},
+                )
+                item["greeting_count"] = item.get("greeting_count", 0) + 1
+
+    # Resource
+    def Table(self, name):  # noqa: N802 - boto3 method name
+        return self
+
+    def batch_get_item(self, RequestItems):  # noqa: N803 - boto3 argument name
+        ((name, request),) = RequestItems.items()
+        keys = [(key["id"], key["created_at"]) for key in request["Keys"]]
+        return {"Responses": {name: [self.items[key] for key in keys if key in self.items]}}
+
+    def get_item(self, Key, **kwargs):  # noqa: N803 - boto3 argument name
+        item = self.items.get((Key["id"], Key["created_at"]))
+        return {"Item": item} if item else {}
+
+    def scan(self, **kwargs):
+        items = [item for (item_id, _), item in self.items.items() if "__counter__" not in item_id]
+        return {"Items": items}
+
+    def update_item(self, Key, ExpressionAttributeValues, **kwargs):  # noqa: N803 - boto3 names
+        # Only the feed backfill's conditional "SET feed_shard = :shard"
+        item = self.items.get((Key["id"], Key["created_at"]))
+        if item is None:
+            raise ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem")
+        item["feed_shard"] = ExpressionAttributeValues[":shard"]
+
+    @contextlib.contextmanager
+    def batch_writer(self):
+        yield self
+
+    def put_item(self, Item):  # noqa: N803 - boto3 argument name
+        self.items[(Item["id"], Item["created_at"])] = dict(Item)
+
+
+@pytest.fixture
+def counter_store(monkeypatch):
+    """Install a FakeCounterStore as the DynamoDB client and resource."""
+
+    def install(items: list[dict] | None = None) -> FakeCounterStore:
+        store = FakeCounterStore(items)
+        monkeypatch.setattr(database, "dynamodb_client", store)
+        monkeypatch.setattr(database, "dynamodb_resource", store)
+        monkeypatch.setattr(database, "table_name", "test-greetings")
+        monkeypatch.setattr(database, "database_available", True)
+        monkeypatch.setattr(database, "write_buffer", None)
+        database.greeting_cache.clear()
+        return store
+
+    return install
+
+
+@pytest.mark.unit
+class TestGreetingCounters:
+    """Test suite for sharded global and per-user greeting counters."""
+
+    def test_creates_spread_global_count_over_shards(self, counter_store, monkeypatch):
+        """Test that creates add to different global shards and reads sum them."""
+        monkeypatch.setattr(settings, "GREETING_COUNTER_SHARD_COUNT", 4)
+        store = counter_store()
+
+        for n in range(40):
+            database.create_greeting(f"user{n % 2}", "Hello")
+
+        global_ids = {
+            op["Update"]["Key"]["id"]["S"]
+            for transaction in store.transactions
+            for op in transaction
+            if "Update" in op and "#global" in op["Update"]["Key"]["id"]["S"]
+        }
+        assert len(global_ids) > 1
+        assert database.get_greeting_count() == 40
+        assert database.get_greeting_counts(["user0", "user1", "nobody"]) == {
+            "user0": 20,
+            "user1": 20,
+            "nobody": None,
+        }
+
+    def test_read_started_before_a_write_is_not_cached_after_it(self, counter_store, monkeypatch):
+        """Test that a reader after an invalidation does not share and cache a pre-write read."""
+        store = counter_store()
+        monkeypatch.setattr(database.greeting_cache, "enabled", True)
+        started = threading.Event()
+        release = threading.Event()
+        counts = iter([1, 2])
+
+        def get_item_in_order(Key, **kwargs):  # noqa: N803 - boto3 argument name
+            # The first read is in flight when the write lands and sees the old count
+            count = next(counts)
+            if count == 1:
+                started.set()
+                release.wait(5)
+            return {"Item": {"greeting_count": count}}
+
+        monkeypatch.setattr(store, "get_item", get_item_in_order)
+        old_reader = threading.Thread(target=database.get_greeting_count, args=("alice",))
+        old_reader.start()
+        assert started.wait(5)
+
+        database._invalidate_greetings(["alice"])
+        new_reader = threading.Thread(target=database.get_greeting_count, args=("alice",))
+        new_reader.start()
+        time.sleep(0.05)
+        release.set()
+        old_reader.join(5)
+        new_reader.join(5)
+
+        assert database.get_greeting_count("alice") == 2
+
+    def test_missing_counters_read_as_none(self, counter_store):
+        """Test that a table without counter items reports no count."""
+        counter_store()
+
+        assert database.get_greeting_count() is None
+
+    def test_backfill_counts_existing_greetings(self, counter_store, monkeypatch):
+        """Test that the backfill replaces short counters with the scanned counts."""
+        monkeypatch.setattr(settings, "GREETING_COUNTER_SHARD_COUNT", 3)
+        legacy = [
+            {"id": f"id-{n}", "created_at": "2025-01-01", "user_name": f"user{n % 3}"}
+            for n in range(9)
+        ]
+        store = counter_store(legacy)
+        # A write after deploy created the counters without the legacy greetings
+        database.create_greeting("user0", "Hello")
+
+        assert database.backfill_greeting_counters() == {"user0": 4, "user1": 3, "user2": 3}
+
+        assert database.get_greeting_count() == 10
+        assert database.get_greeting_count("user0") == 4
+        assert len(store.items) == 10 + 3 + 3
+
+
+@pytest.mark.unit
+class TestFeedBackfill:
+    """Test suite for database.backfill_feed_shards."""
+
+    def test_stamps_greetings_missing_a_current_shard(self, counter_store, monkeypatch):
+        """Test that legacy and re-sharded greetings get their shard and others are left alone."""
+        monkeypatch.setattr(settings, "FEED_SHARD_COUNT", 2)
+        legacy = [
+            {"id": f"id-{n}", "created_at": "2025-01-01", "user_name": "alice"} for n in range(3)
+        ]
+        stamped = {
+            "id": "id-3",
+            "created_at": "2025-01-02",
+            "feed_shard": database._feed_shard("id-3"),
+        }
+        resharded = {"id": "id-4", "created_at": "2025-01-03", "feed_shard": "feed#7"}
+        store = counter_store([*legacy, stamped, resharded])
+
+        assert database.backfill_feed_shards() == 4
+
+        assert all(
+            item["feed_shard"] == database._feed_shard(item["id"]) for item in store.items.values()
+        )
+        assert database.backfill_feed_shards() == 0
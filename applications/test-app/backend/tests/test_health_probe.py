@@ -0,0 +1,109 @@
+"""
+Unit tests for the background dependency prober.
+"""
+
+import json
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+import database
+import health_probe
+from health_probe import HealthProber
+
+
+def _ok():
+    return {"table_status": "ACTIVE"}
+
+
+def _down():
+    raise ConnectionError("endpoint unreachable")
+
+
+@pytest.mark.unit
+class TestHealthProber:
+    """Test suite for health_probe.HealthProber."""
+
+    def test_not_ready_before_first_probe(self):
+        """Test that readiness is false until required dependencies have been probed."""
+        prober = HealthProber({"dynamodb": _ok}, required={"dynamodb"})
+
+        assert prober.ready is False
+        assert json.loads(prober.body)["dependencies"]["dynamodb"]["ok"] is None
+
+    async def test_results_are_recorded(self):
+        """Test that a probe round stores status, latency and last success per dependency."""
+        prober = HealthProber({"dynamodb": _ok, "ssm": _down}, required={"dynamodb"})
+
+        await prober.run_once()
+
+        body = json.loads(prober.body)
+        assert prober.ready is True
+        assert body["status"] == "ready"
+        assert body["dependencies"]["dynamodb"]["details"] == {"table_status": "ACTIVE"}
+        assert body["dependencies"]["dynamodb"]["last_success"] is not None
+        assert body["dependencies"]["ssm"]["ok"] is False
+        assert body["dependencies"]["ssm"]["error"] == "endpoint unreachable"
+        assert body["dependencies"]["ssm"]["latency_ms"] >= 0
+
+    async def test_failure_keeps_last_success(self):
+        """Test that a failing required dependency flips readiness but keeps last_success."""
+        probes = {"dynamodb": _ok}
+        prober = HealthProber(probes, required={"dynamodb"})
+        await prober.run_once()
+        last_success = prober.result("dynamodb").last_success
+
+        probes["dynamodb"] = _down
+        await prober.run_once()
+
+        assert prober.ready is False
+        assert prober.result("dynamodb").last_success == last_success
+
+    async def test_slow_probe_times_out(self):
+        """Test that a hanging dependency is reported as failed after the probe timeout."""
+        prober = HealthProber(
+            {"dynamodb": lambda: time.sleep(0.5)}, required={"dynamodb"}, timeout_seconds=0.05
+        )
+
+        await prober.run_once()
+
+        assert prober.result("dynamodb").ok is False
+        assert "Timed out" in prober.result("dynamodb").error
+
+
+class FakeDynamoDBClient:
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+
+    def describe_table(self, TableName):  # noqa: N803 - boto3 argument name
+        if self.error is not None:
+            raise self.error
+        return {"Table": {"TableName": TableName, "TableStatus": "ACTIVE"}}
+
+
+@pytest.mark.unit
+class TestDynamoDBProbe:
+    """Test suite for the DynamoDB probe."""
+
+    @pytest.fixture(autouse=True)
+    def _table(self, monkeypatch):
+        monkeypatch.setattr(database, "table_name", "test-greetings")
+        monkeypatch.setattr(database, "database_available", True)
+        monkeypatch.setattr(database, "table_status", None)
+
+    def test_reports_table_status(self, monkeypatch):
+        """Test that a successful probe reports the described table status."""
+        monkeypatch.setattr(database, "dynamodb_client", FakeDynamoDBClient())
+
+        assert health_probe._probe_dynamodb() == {"table_status": "ACTIVE"}
+
+    def test_failure_leaves_database_available(self, monkeypatch):
+        """Test that a transient probe error does not mark DynamoDB unavailable for requests."""
+        error = ClientError({"Error": {"Code": "ThrottlingException"}}, "DescribeTable")
+        monkeypatch.setattr(database, "dynamodb_client", FakeDynamoDBClient(error))
+
+        with pytest.raises(ClientError):
+            health_probe._probe_dynamodb()
+
+        assert database.database_available is True
@@ -0,0 +1,118 @@
+"""
+Unit tests for structured logging and the asynchronous log handler.
+"""
+
+import io
+import json
+import logging
+import threading
+from datetime import UTC, datetime
+
+import pytest
+
+import logging_config
+from logging_config import AsyncLogHandler, JSONFormatter
+
+
+class BlockingStream(io.StringIO):
+    """StringIO whose write() waits until released (a backed-up stdout)."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait(5)
+        return super().write(text)
+
+
+def _record(message: str, **extra) -> logging.LogRecord:
+    return logging.makeLogRecord(
+        {"name": "test", "levelno": logging.INFO, "levelname": "INFO", "msg": message, **extra}
+    )
+
+
+@pytest.mark.unit
+class TestJSONFormatter:
+    """Test suite for logging_config.JSONFormatter."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_fields_and_timestamp(self, use_orjson):
+        """Test that allowlisted extras are included and the timestamp is the event time."""
+        record = _record("Response: GET /health - 200", request_id="req-1", status_code=200)
+        record.created = datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=UTC).timestamp()
+        record.internal = "not allowlisted"
+
+        line = json.loads(JSONFormatter(use_orjson=use_orjson).format(record))
+
+        assert line == {
+            "timestamp": "2025-01-02T03:04:05.678901+00:00",
+            "level": "INFO",
+            "logger": "test",
+            "message": "Response: GET /health - 200",
+            "request_id": "req-1",
+            "status_code": 200,
+        }
+
+    def test_timestamp_prefix_follows_second(self):
+        """Test that the cached second prefix is refreshed when the second changes."""
+        formatter = JSONFormatter()
+        record = _record("tick")
+        base = datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC).timestamp()
+
+        stamps = []
+        for offset in (0.25, 0.5, 1.125):
+            record.created = base + offset
+            stamps.append(json.loads(formatter.format(record))["timestamp"])
+
+        assert stamps == [
+            "2025-01-02T03:04:05.250000+00:00",
+            "2025-01-02T03:04:05.500000+00:00",
+            "2025-01-02T03:04:06.125000+00:00",
+        ]
+
+    def test_non_serializable_extra(self):
+        """Test that values the serializer cannot encode are logged as strings."""
+        line = json.loads(JSONFormatter().format(_record("x", error=ValueError("bad"))))
+
+        assert line["error"] == "bad"
+
+
+@pytest.mark.unit
+class TestAsyncLogHandler:
+    """Test suite for logging_config.AsyncLogHandler."""
+
+    def test_records_are_formatted_and_written(self):
+        """Test that queued records are written as JSON lines by the writer thread."""
+        stream = io.StringIO()
+        handler = AsyncLogHandler(stream)
+        handler.setFormatter(JSONFormatter())
+
+        handler.emit(_record("first", request_id="req-1"))
+        handler.emit(_record("second"))
+        handler.close()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line["message"] for line in lines] == ["first", "second"]
+        assert lines[0]["request_id"] == "req-1"
+        assert handler.stats()["written_total"] == 2
+
+    def test_full_queue_drops_and_reports(self):
+        """Test that emit() never waits on a stalled stream and drops are reported."""
+        stream = BlockingStream()
+        handler = AsyncLogHandler(stream, capacity=2, batch_size=1)
+        handler.setFormatter(JSONFormatter())
+
+        for i in range(20):
+            handler.emit(_record(f"record {i}"))
+        dropped = handler.stats()["dropped_total"]
+        stream.release.set()
+        handler.close()
+
+        assert dropped > 0
+        assert f"dropped {dropped} records" in stream.getvalue()
+
+    def test_invalid_overflow_policy(self):
+        """Test that unknown overflow policies are rejected."""
+        with pytest.raises(ValueError, match="overflow"):
+            AsyncLogHandler(io.StringIO(), overflow="spill")
@@ -12,11 +12,42 @@ Tests follow the Arrange-Act-Assert pattern and use pytest fixtures
 for better maintainability and reusability.
 """
 
+import asyncio
 from datetime import datetime
 
 import pytest
 from fastapi.testclient import TestClient
 
+import database
+import main
+from health_probe import HealthProber
+from pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def api_client(monkeypatch) -> TestClient:
+    """
+    Test client for routes whose DynamoDB calls are monkeypatched per test.
+
+    DynamoDB is reported available; tests replace the main.db_* functions they
+    exercise. The lifespan is not run, so no background tasks are started.
+    """
+
+    async def available() -> bool:
+        return True
+
+    monkeypatch.setattr(main, "ensure_database_available", available)
+    return TestClient(main.app)
+
+
+def _greeting(n: int, user_name: str = "Alice") -> database.Greeting:
+    return database.Greeting(
+        id=f"id-{n}",
+        user_name=user_name,
+        message=f"Hello, {user_name}!",
+        created_at=f"2025-01-01T00:00:{n:02d}+00:00",
+    )
+
 
 # ============================================================================
 # Health Check Endpoint Tests
@@ -51,6 +82,63 @@ class TestHealthEndpoint:
         assert data["status"] == "healthy"
 
 
+@pytest.mark.unit
+class TestLivenessAndReadinessEndpoints:
+    """Test suite for the /health/live and /health/ready endpoints."""
+
+    @pytest.fixture
+    def prober(self, monkeypatch) -> HealthProber:
+        """Serve readiness from a fresh prober with one required dependency."""
+        prober = HealthProber({"dynamodb": lambda: {"table_status": "ACTIVE"}}, {"dynamodb"})
+        monkeypatch.setattr(main.settings, "HEALTH_PROBE_ENABLED", True)
+        monkeypatch.setattr(main, "health_prober", prober)
+        return prober
+
+    def test_liveness_returns_200(self, api_client: TestClient):
+        """Test that liveness answers without checking dependencies."""
+        response = api_client.get("/health/live")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+
+    def test_not_ready_before_first_probe(self, api_client: TestClient, prober):
+        """Test that readiness is 503 until the required dependencies have passed."""
+        response = api_client.get("/health/ready")
+
+        assert response.status_code == 503
+        data = response.json()
+        assert data["status"] == "not_ready"
+        assert data["dependencies"]["dynamodb"]["ok"] is None
+
+    def test_ready_after_successful_probe(self, api_client: TestClient, prober):
+        """Test that readiness serves the latest probe results with 200."""
+        asyncio.run(prober.run_once())
+
+        response = api_client.get("/health/ready")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["dependencies"]["dynamodb"]["ok"] is True
+        assert data["dependencies"]["dynamodb"]["details"] == {"table_status": "ACTIVE"}
+
+    @pytest.mark.parametrize(
+        ("available", "status_code", "status"),
+        [(True, 200, "ready"), (False, 503, "not_ready")],
+    )
+    def test_readiness_without_prober_uses_database_flag(
+        self, api_client: TestClient, monkeypatch, available, status_code, status
+    ):
+        """Test that HEALTH_PROBE_ENABLED=false reports database.database_available."""
+        monkeypatch.setattr(main.settings, "HEALTH_PROBE_ENABLED", False)
+        monkeypatch.setattr(database, "database_available", available)
+
+        response = api_client.get("/health/ready")
+
+        assert response.status_code == status_code
+        assert response.json() == {"status": status, "dependencies": {}}
+
+
 # ============================================================================
 # Hello Endpoint Tests
 # ============================================================================
@@ -134,6 +222,11 @@ class TestMetricsEndpoint:
         # Request count should have increased
         assert data2["total_requests"] >= initial_count
 
+    def test_prometheus_metrics_not_on_app_port(self, api_client: TestClient):
+        """Test that the Prometheus text is not served by the app (only on METRICS_PORT)."""
+        response = api_client.get("/metrics")
+        assert response.status_code == 404
+
 
 class TestHelloEndpoint:
     """Test suite for the /api/hello endpoint."""
@@ -267,6 +360,72 @@ class TestGreetEndpoint:
         assert data1["id"] != data2["id"]
 
 
+@pytest.mark.unit
+class TestGreetingsBatchEndpoint:
+    """Test suite for the POST /api/greetings:batch endpoint."""
+
+    def test_results_map_created_and_failed_items(self, api_client: TestClient, monkeypatch):
+        """Test that each user gets a created or failed result, in request order."""
+        received = []
+
+        async def create_batch(entries):
+            received.extend(entries)
+            return [
+                (_greeting(1, "Alice"), None),
+                (_greeting(2, "Bob"), "Write throttled, retries exhausted"),
+                (_greeting(3, "Carol"), None),
+            ]
+
+        monkeypatch.setattr(main, "db_create_greetings_batch", create_batch)
+
+        response = api_client.post(
+            "/api/greetings:batch",
+            json={"greetings": [{"user_name": n} for n in ("Alice", "Bob", "Carol")]},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert received == [(n, f"Hello, {n}!") for n in ("Alice", "Bob", "Carol")]
+        assert data["created"] == 2
+        assert data["failed"] == 1
+        assert [r["status"] for r in data["results"]] == ["created", "failed", "created"]
+        assert data["results"][0]["id"] == "id-1"
+        assert data["results"][0]["message"] == "Hello, Alice!"
+        assert data["results"][1]["error"] == "Write throttled, retries exhausted"
+        assert data["results"][1]["id"] is None
+
+    def test_over_limit_batch_is_rejected(self, api_client: TestClient, monkeypatch):
+        """Test that batches above GREETINGS_BATCH_MAX_ITEMS give 400 without writing."""
+        monkeypatch.setattr(main.settings, "GREETINGS_BATCH_MAX_ITEMS", 2)
+
+        async def create_batch(entries):
+            raise AssertionError("over-limit batches must not be written")
+
+        monkeypatch.setattr(main, "db_create_greetings_batch", create_batch)
+
+        response = api_client.post(
+            "/api/greetings:batch",
+            json={"greetings": [{"user_name": f"user{n}"} for n in range(3)]},
+        )
+
+        assert response.status_code == 400
+
+    def test_busy_database_returns_503_with_retry_after(self, api_client: TestClient, monkeypatch):
+        """Test that executor backpressure is reported as a retryable 503."""
+
+        async def create_batch(entries):
+            raise main.DatabaseBusyError("no free slot")
+
+        monkeypatch.setattr(main, "db_create_greetings_batch", create_batch)
+
+        response = api_client.post(
+            "/api/greetings:batch", json={"greetings": [{"user_name": "Alice"}]}
+        )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+
 # ============================================================================
 # Get All Greetings Endpoint Tests
 # ============================================================================
@@ -368,6 +527,163 @@ class TestGetGreetingsEndpoint:
             assert "created_at" in greeting
 
 
+@pytest.mark.unit
+class TestGreetingsCursor:
+    """Test suite for /api/greetings cursors (feed index and scan fallback)."""
+
+    def test_feed_cursor_resumes_from_positions(self, api_client: TestClient, monkeypatch):
+        """Test that the feed listing returns a feed cursor that carries shard positions."""
+        page_positions = {"feed#0": {"id": "id-2", "created_at": "2025-01-01T00:00:02+00:00"}}
+        calls = []
+
+        async def recent(limit, skip, positions):
+            calls.append(positions)
+            if positions is None:
+                return [_greeting(3), _greeting(2)], 3, page_positions
+            return [_greeting(1)], 3, None
+
+        monkeypatch.setattr(main, "db_get_recent_greetings", recent)
+
+        first = api_client.get("/api/greetings?limit=2").json()
+        cursor = first["next_cursor"]
+
+        assert [g["id"] for g in first["greetings"]] == ["id-3", "id-2"]
+        assert decode_cursor(cursor, main.GREETINGS_FEED_CURSOR_SCOPE) == page_positions
+
+        second = api_client.get("/api/greetings", params={"limit": 2, "cursor": cursor}).json()
+
+        assert [g["id"] for g in second["greetings"]] == ["id-1"]
+        assert second["next_cursor"] is None
+        assert calls == [None, page_positions]
+
+    def test_scan_cursor_without_feed_index(self, api_client: TestClient, monkeypatch):
+        """Test that the scan fallback issues scan-scope cursors and resumes from them."""
+        last_key = {"id": "id-2", "created_at": "2025-01-01T00:00:02+00:00"}
+        recent_calls = []
+        scan_calls = []
+
+        async def recent(limit, skip, positions):
+            recent_calls.append(positions)
+            raise database.FeedIndexUnavailableError("no feed index")
+
+        async def scan(skip, limit, start_key):
+            scan_calls.append(start_key)
+            return [_greeting(2)], 3, last_key if start_key is None else None
+
+        monkeypatch.setattr(main, "db_get_recent_greetings", recent)
+        monkeypatch.setattr(main, "db_get_greetings", scan)
+
+        cursor = api_client.get("/api/greetings").json()["next_cursor"]
+
+        assert decode_cursor(cursor, main.GREETINGS_CURSOR_SCOPE) == last_key
+
+        response = api_client.get("/api/greetings", params={"cursor": cursor})
+
+        assert response.status_code == 200
+        assert response.json()["next_cursor"] is None
+        assert scan_calls == [None, last_key]
+        assert recent_calls == [None]
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            encode_cursor({"id": "id-1", "created_at": "2025"}, main._user_cursor_scope("Alice")),
+            "not-a-cursor",
+        ],
+    )
+    def test_cursor_from_another_scope_is_rejected(
+        self, api_client: TestClient, monkeypatch, cursor: str
+    ):
+        """Test that cursors from other listings or tampered cursors give 400."""
+
+        async def unexpected(*args, **kwargs):
+            raise AssertionError("database must not be queried")
+
+        monkeypatch.setattr(main, "db_get_recent_greetings", unexpected)
+        monkeypatch.setattr(main, "db_get_greetings", unexpected)
+
+        response = api_client.get("/api/greetings", params={"cursor": cursor})
+
+        assert response.status_code == 400
+
+    def test_feed_cursor_without_feed_index_is_rejected(self, api_client: TestClient, monkeypatch):
+        """Test that a feed cursor is invalid once the listing has fallen back to a scan."""
+        cursor = encode_cursor({"feed#0": None}, main.GREETINGS_FEED_CURSOR_SCOPE)
+
+        async def recent(limit, skip, positions):
+            raise database.FeedIndexUnavailableError("no feed index")
+
+        async def scan(*args, **kwargs):
+            raise AssertionError("a feed cursor must not be passed to the scan")
+
+        monkeypatch.setattr(main, "db_get_recent_greetings", recent)
+        monkeypatch.setattr(main, "db_get_greetings", scan)
+
+        response = api_client.get("/api/greetings", params={"cursor": cursor})
+
+        assert response.status_code == 400
+
+
+@pytest.mark.unit
+class TestGetUsersGreetingsEndpoint:
+    """Test suite for the /api/greetings/users endpoint."""
+
+    @pytest.fixture
+    def lookups(self, monkeypatch) -> list[dict]:
+        """Record db_get_users_greetings calls and answer with one greeting per user."""
+        calls = []
+
+        async def users_greetings(user_names, limit, attributes):
+            calls.append({"user_names": user_names, "limit": limit, "attributes": attributes})
+            return {name: ([_greeting(n, name)], n + 1, None) for n, name in enumerate(user_names)}
+
+        monkeypatch.setattr(main, "db_get_users_greetings", users_greetings)
+        return calls
+
+    def test_names_are_deduplicated_in_order(self, api_client: TestClient, lookups):
+        """Test that blank and repeated names are dropped, keeping request order."""
+        response = api_client.get("/api/greetings/users?names=Bob, Alice,,Bob ,Alice")
+
+        assert response.status_code == 200
+        assert lookups[0]["user_names"] == ["Bob", "Alice"]
+        users = response.json()["users"]
+        assert list(users) == ["Bob", "Alice"]
+        assert users["Alice"]["count"] == 2
+        assert users["Alice"]["greetings"][0]["user_name"] == "Alice"
+
+    def test_too_many_names_are_rejected(self, api_client: TestClient, lookups, monkeypatch):
+        """Test that more than GREETINGS_USERS_MAX_NAMES distinct names give 400."""
+        monkeypatch.setattr(main.settings, "GREETINGS_USERS_MAX_NAMES", 2)
+
+        assert api_client.get("/api/greetings/users?names=a,b,a,b").status_code == 200
+        assert api_client.get("/api/greetings/users?names=a,b,c").status_code == 400
+        assert len(lookups) == 1
+
+    def test_summary_requests_projection(self, api_client: TestClient, lookups):
+        """Test that summary=true asks only for the summary attributes."""
+        api_client.get("/api/greetings/users?names=Alice")
+        api_client.get("/api/greetings/users?names=Alice&summary=true")
+
+        assert lookups[0]["attributes"] is None
+        assert lookups[1]["attributes"] == main.USER_GREETINGS_SUMMARY_ATTRIBUTES
+
+    def test_unexpected_error_returns_500(self, api_client: TestClient, monkeypatch, caplog):
+        """Test that unexpected errors are logged by the handler and returned as 500."""
+
+        async def users_greetings(user_names, limit, attributes):
+            raise KeyError("boom")
+
+        monkeypatch.setattr(main, "db_get_users_greetings", users_greetings)
+
+        with caplog.at_level("ERROR", logger=main.logger.name):
+            response = api_client.get("/api/greetings/users?names=Alice")
+
+        assert response.status_code == 500
+        data = response.json()
+        assert "Internal server error" in str(data.get("detail", data.get("error", "")))
+        assert any("in get_users_greetings" in r.getMessage() for r in caplog.records)
+
+
 # ============================================================================
 # Get User Greetings Endpoint Tests
 # ============================================================================
@@ -0,0 +1,238 @@
+"""
+Unit tests for the Prometheus metrics registry and instrumentation.
+"""
+
+import io
+import json
+import os
+import urllib.error
+import urllib.request
+
+import pytest
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import aws_clients
+import metrics
+import middleware
+
+
+class _RawBody:
+    def __init__(self, body: bytes):
+        self._body = io.BytesIO(body)
+
+    def stream(self, **kwargs):
+        yield self._body.read()
+
+
+def _respond(status_code: int, body: dict):
+    """before-send handler returning a canned response instead of calling AWS."""
+
+    def handler(request, **kwargs):
+        return AWSResponse(
+            request.url,
+            status_code,
+            {"Content-Type": "application/x-amz-json-1.1"},
+            _RawBody(json.dumps(body).encode()),
+        )
+
+    return handler
+
+
+def _sample(name: str, **labels) -> float | None:
+    """Value of one sample line from the global registry, or None."""
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    prefix = f"{name}{{{wanted}}} " if labels else f"{name} "
+    for line in metrics.REGISTRY.render().decode().splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix) :])
+    return None
+
+
+@pytest.mark.unit
+class TestRegistry:
+    """Test suite for metrics.Registry and metric types."""
+
+    def test_counter_and_histogram_exposition(self):
+        """Test the text format of labelled counters and cumulative histogram buckets."""
+        registry = metrics.Registry()
+        requests = registry.register(metrics.Counter("requests_total", "Requests", ("route",)))
+        latency = registry.register(
+            metrics.Histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+        )
+
+        requests.labels("/a").inc()
+        requests.labels("/a").inc()
+        for value in (0.05, 0.5, 5):
+            latency.observe(value)
+
+        lines = registry.render().decode().splitlines()
+        assert "# TYPE requests_total counter" in lines
+        assert 'requests_total{route="/a"} 2' in lines
+        assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{le="1"} 2' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+        assert "latency_seconds_sum 5.55" in lines
+        assert "latency_seconds_count 3" in lines
+
+    def test_label_values_are_escaped(self):
+        """Test that quotes, backslashes and newlines in label values are escaped."""
+        registry = metrics.Registry()
+        counter = registry.register(metrics.Counter("c_total", "C", ("v",)))
+
+        counter.labels('a"b\\c\nd').inc()
+
+        assert 'c_total{v="a\\"b\\\\c\\nd"} 1' in registry.render().decode()
+
+    def test_wrong_label_count(self):
+        """Test that a missing label value is rejected."""
+        counter = metrics.Counter("c_total", "C", ("a", "b"))
+
+        with pytest.raises(ValueError, match="expects labels"):
+            counter.labels("only-one")
+
+    def test_register_stats_reads_at_scrape_time(self):
+        """Test that stats() dicts are exposed as gauges with current values."""
+        stats = {"hits": 1, "hit_ratio": 0.5}
+        metrics.register_stats("test_cache", "Test cache", lambda: stats)
+        try:
+            stats.update(hits=7)
+
+            assert _sample("test_cache_hits") == 7
+            assert _sample("test_cache_hit_ratio") == 0.5
+        finally:
+            metrics.REGISTRY.unregister("test_cache_hits")
+            metrics.REGISTRY.unregister("test_cache_hit_ratio")
+
+    def test_workers_are_merged(self, tmp_path):
+        """Test that counters sum across workers, gauges only over live ones."""
+        registry = metrics.Registry(str(tmp_path))
+        requests = registry.register(metrics.Counter("requests_total", "Requests", ("route",)))
+        in_flight = registry.register(metrics.Gauge("in_flight", "In flight"))
+        registry.register(metrics.CallbackGauge("queue_depth", "Depth", lambda: {(): 3}))
+        requests.labels("/a").inc(2)
+        in_flight.set(1)
+        # Another worker's snapshot: a live process (the test runner's parent)...
+        other = metrics.Registry(str(tmp_path))
+        other.register(metrics.Counter("requests_total", "Requests", ("route",))).labels("/a").inc()
+        other.register(metrics.Gauge("in_flight", "In flight")).set(4)
+        other.register(metrics.CallbackGauge("queue_depth", "Depth", lambda: {(): 5}))
+        (tmp_path / f"{os.getppid()}.json").write_text(json.dumps(other.collect()))
+        # ...and one that has exited (no process has PID 2**22 + 1)
+        (tmp_path / f"{2**22 + 1}.json").write_text(json.dumps(other.collect()))
+
+        lines = registry.render().decode().splitlines()
+
+        assert 'requests_total{route="/a"} 4' in lines
+        assert "in_flight 5" in lines
+        assert f'queue_depth{{pid="{os.getpid()}"}} 3' in lines
+        assert f'queue_depth{{pid="{os.getppid()}"}} 5' in lines
+        assert sum(line.startswith("queue_depth{") for line in lines) == 2
+
+    def test_total_sums_labels_and_workers(self, tmp_path):
+        """Test that total() adds up every series of a counter across live workers."""
+        registry = metrics.Registry(str(tmp_path))
+        requests = registry.register(metrics.Counter("requests_total", "Requests", ("route",)))
+        requests.labels("/a").inc(2)
+        requests.labels("/b").inc()
+        other = metrics.Registry(str(tmp_path))
+        other_requests = other.register(metrics.Counter("requests_total", "Requests", ("route",)))
+        other_requests.labels("/a").inc(4)
+        (tmp_path / f"{os.getppid()}.json").write_text(json.dumps(other.collect()))
+
+        assert registry.total("requests_total") == 7
+        assert registry.total("missing_total") == 0
+
+    def test_snapshot_roundtrip(self, tmp_path):
+        """Test that write_snapshot saves this worker's values as <pid>.json."""
+        registry = metrics.Registry(str(tmp_path))
+        registry.register(metrics.Counter("c_total", "C")).inc(3)
+
+        registry.write_snapshot()
+
+        snapshot = json.loads((tmp_path / f"{os.getpid()}.json").read_text())
+        assert snapshot["c_total"]["samples"] == {"c_total": 3}
+
+
+@pytest.mark.unit
+class TestInstrumentation:
+    """Test suite for HTTP and AWS call instrumentation."""
+
+    def test_http_requests_use_route_template(self):
+        """Test that request counters and latency are labelled with the route template."""
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: str):
+            return {"id": item_id}
+
+        app.add_middleware(middleware.LoggingMiddleware)
+        before = _sample("http_requests_total", method="GET", route="/items/{item_id}", status=200)
+
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/nowhere")
+
+        after = _sample("http_requests_total", method="GET", route="/items/{item_id}", status=200)
+        assert after - (before or 0) == 2
+        assert _sample("http_requests_total", method="GET", route="unmatched", status=404)
+        assert _sample("http_requests_in_flight") == 0
+
+    def test_aws_call_latency_and_errors(self):
+        """Test that shared clients record call latency and error codes per operation."""
+        aws_clients.reset_clients()
+        client = aws_clients.get_client(
+            "ssm",
+            region_name="us-east-1",
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing",
+        )
+        try:
+            client.meta.events.register(
+                "before-send.ssm.GetParameter",
+                _respond(200, {"Parameter": {"Name": "p", "Value": "v"}}),
+            )
+            client.get_parameter(Name="p")
+            client.meta.events.register(
+                "before-send.ssm.DeleteParameter",
+                _respond(400, {"__type": "ParameterNotFound", "message": "missing"}),
+            )
+            with pytest.raises(ClientError):
+                client.delete_parameter(Name="p")
+        finally:
+            aws_clients.reset_clients()
+
+        assert _sample("aws_call_duration_seconds_count", service="ssm", operation="GetParameter")
+        assert _sample(
+            "aws_call_errors_total",
+            service="ssm",
+            operation="DeleteParameter",
+            code="ParameterNotFound",
+        )
+
+
+@pytest.mark.unit
+class TestHttpServer:
+    """Test suite for the internal metrics listener."""
+
+    def test_serves_registry_on_its_own_port(self):
+        """Test that the listener serves METRICS_PATH and nothing else."""
+        registry = metrics.Registry()
+        registry.register(metrics.Counter("scrapes_total", "Scrapes")).inc()
+        server = metrics.start_http_server(0, "127.0.0.1", "/metrics", registry)
+        try:
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            with urllib.request.urlopen(f"{base}/metrics") as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+            with pytest.raises(urllib.error.HTTPError) as exc_info:
+                urllib.request.urlopen(f"{base}/api/greetings")
+        finally:
+            metrics.stop_http_server()
+
+        assert "scrapes_total 1" in body.splitlines()
+        assert content_type == metrics.CONTENT_TYPE
+        assert exc_info.value.code == 404
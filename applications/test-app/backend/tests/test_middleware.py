@@ -0,0 +1,236 @@
+"""
+Unit tests for the ASGI middleware stack.
+"""
+
+import logging
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+import middleware
+from config import settings
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok(request: Request):
+        return {"request_id": request.state.request_id}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("kaboom")
+
+    @app.get("/framed")
+    async def framed():
+        return JSONResponse({}, headers={"X-Frame-Options": "SAMEORIGIN"})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield b"one,"
+            yield b"two"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    # Same order as main.py
+    app.add_middleware(middleware.ErrorHandlingMiddleware)
+    app.add_middleware(middleware.LoggingMiddleware)
+    app.add_middleware(
+        middleware.RequestIdMiddleware,
+        security_headers=middleware.build_security_headers(
+            {"Content-Security-Policy": "default-src 'self'"}
+        ),
+        route_overrides={"/docs": {"Content-Security-Policy": ""}},
+    )
+    return app
+
+
+@pytest.fixture
+def client():
+    return TestClient(_build_app(), raise_server_exceptions=False)
+
+
+@pytest.mark.unit
+class TestMiddleware:
+    """Test suite for middleware."""
+
+    def test_request_id_is_propagated(self, client):
+        """Test that an incoming X-Request-ID reaches request.state and the response."""
+        response = client.get("/ok", headers={"X-Request-ID": "req-123"})
+
+        assert response.json() == {"request_id": "req-123"}
+        assert response.headers["X-Request-ID"] == "req-123"
+
+    def test_request_id_is_generated(self, client):
+        """Test that a request ID is generated when the client sends none."""
+        response = client.get("/ok")
+
+        assert response.headers["X-Request-ID"] == response.json()["request_id"]
+        assert len(response.headers["X-Request-ID"]) == 36
+
+    def test_security_and_timing_headers(self, client):
+        """Test that security headers and X-Process-Time are added."""
+        response = client.get("/ok")
+
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert response.headers["Strict-Transport-Security"] == (
+            "max-age=31536000; includeSubDomains"
+        )
+        assert response.headers["Content-Security-Policy"] == "default-src 'self'"
+        assert float(response.headers["X-Process-Time"]) >= 0
+
+    def test_route_header_wins(self, client):
+        """Test that a header set by the route is not overridden or duplicated."""
+        response = client.get("/framed")
+
+        assert response.headers.get_list("X-Frame-Options") == ["SAMEORIGIN"]
+
+    def test_route_overrides_by_path_prefix(self, client):
+        """Test that path-prefix overrides replace the default header set."""
+        response = client.get("/docs")
+
+        assert "Content-Security-Policy" not in response.headers
+        assert response.headers["X-Frame-Options"] == "DENY"
+
+    def test_empty_setting_drops_header(self, monkeypatch):
+        """Test that an empty configured value (e.g. SECURITY_HSTS) omits the header."""
+        monkeypatch.setattr(middleware.settings, "SECURITY_HSTS", "")
+
+        names = {name for name, _ in middleware.build_security_headers()}
+
+        assert b"strict-transport-security" not in names
+        assert b"x-content-type-options" in names
+
+    def test_unhandled_exception_returns_error_envelope(self, client):
+        """Test that an unhandled exception becomes a 500 JSON envelope with the request ID."""
+        response = client.get("/boom", headers={"X-Request-ID": "req-500"})
+
+        assert response.status_code == 500
+        assert response.json() == {
+            "error": "Internal server error",
+            "status_code": 500,
+            "request_id": "req-500",
+        }
+        assert response.headers["X-Request-ID"] == "req-500"
+        assert response.headers["X-Frame-Options"] == "DENY"
+
+    def test_streaming_response_passes_through(self, client):
+        """Test that streaming responses are delivered intact with headers added."""
+        response = client.get("/stream")
+
+        assert response.text == "one,two"
+        assert "X-Request-ID" in response.headers
+
+
+def _access_log_client(**options) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {}
+
+    @app.get("/api/metrics")
+    async def metrics():
+        return {}
+
+    @app.get("/api/fail")
+    async def fail():
+        return JSONResponse({}, status_code=503)
+
+    app.add_middleware(
+        middleware.LoggingMiddleware,
+        **{
+            "sample_rate": 1.0,
+            "slow_ms": 1000,
+            "exclude_paths": ["/health"],
+            "route_levels": {},
+            **options,
+        },
+    )
+    return TestClient(app)
+
+
+def _access_lines(caplog) -> list[logging.LogRecord]:
+    return [record for record in caplog.records if record.name == "middleware"]
+
+
+@pytest.mark.unit
+class TestAccessLog:
+    """Test suite for middleware.LoggingMiddleware access logging."""
+
+    def test_one_combined_line_per_request(self, caplog):
+        """Test that a request produces a single line with status and timing."""
+        caplog.set_level(logging.INFO, logger="middleware")
+
+        _access_log_client().get("/api/metrics")
+
+        (record,) = _access_lines(caplog)
+        assert record.levelno == logging.INFO
+        assert record.getMessage().startswith("GET /api/metrics 200 ")
+        assert record.status_code == 200
+        assert record.process_time >= 0
+
+    def test_excluded_path_logged_only_on_error(self, caplog):
+        """Test that excluded paths are skipped unless the request fails."""
+        caplog.set_level(logging.INFO, logger="middleware")
+
+        _access_log_client(exclude_paths=["/health", "/api/fail"]).get("/health")
+        assert _access_lines(caplog) == []
+
+        _access_log_client(exclude_paths=["/health", "/api/fail"]).get("/api/fail")
+        (record,) = _access_lines(caplog)
+        assert record.levelno == logging.WARNING
+
+    def test_excluded_path_not_ready_logged_once(self, caplog):
+        """Test that repeated 503s from a health check are logged once per outage."""
+        caplog.set_level(logging.INFO, logger="middleware")
+        client = _access_log_client(exclude_paths=["/api/fail"])
+
+        for _ in range(3):
+            client.get("/api/fail")
+
+        (record,) = _access_lines(caplog)
+        assert record.levelno == logging.WARNING
+
+    def test_sampling_skips_success_but_not_slow(self, caplog):
+        """Test that a zero sample rate drops successes while slow requests are still logged."""
+        caplog.set_level(logging.INFO, logger="middleware")
+
+        _access_log_client(sample_rate=0.0).get("/api/metrics")
+        assert _access_lines(caplog) == []
+
+        _access_log_client(sample_rate=0.0, slow_ms=0).get("/api/metrics")
+        (record,) = _access_lines(caplog)
+        assert record.levelno == logging.WARNING
+
+    def test_route_level(self, caplog):
+        """Test that per-route levels apply to successful requests."""
+        caplog.set_level(logging.DEBUG, logger="middleware")
+
+        _access_log_client(route_levels={"/api/metrics": "DEBUG"}).get("/api/metrics")
+
+        (record,) = _access_lines(caplog)
+        assert record.levelno == logging.DEBUG
+
+    def test_unknown_route_level_from_settings_maps_to_info(self, monkeypatch, caplog):
+        """Test that a misspelled level in ACCESS_LOG_ROUTE_LEVELS falls back to INFO."""
+        caplog.set_level(logging.WARNING, logger="config")
+        monkeypatch.setattr(
+            settings, "ACCESS_LOG_ROUTE_LEVELS", "/api/metrics=DEBUGG,/health=debug"
+        )
+
+        assert settings.get_access_log_route_levels() == {
+            "/api/metrics": "INFO",
+            "/health": "DEBUG",
+        }
+        assert "DEBUGG" in caplog.text
+
+    def test_unknown_route_level_is_rejected(self):
+        """Test that the middleware refuses a level logging does not know."""
+        with pytest.raises(ValueError, match="VERBOSE"):
+            middleware.LoggingMiddleware(FastAPI(), route_levels={"/api": "VERBOSE"})
@@ -0,0 +1,47 @@
+"""
+Unit tests for signed pagination cursors.
+"""
+
+import pytest
+
+from pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+LAST_KEY = {"id": "3f2b", "created_at": "2025-01-01T00:00:00+00:00"}
+
+
+@pytest.mark.unit
+class TestCursorEncoding:
+    """Test suite for encode_cursor/decode_cursor."""
+
+    def test_round_trip(self):
+        """Test that a cursor decodes back to the original LastEvaluatedKey."""
+        cursor = encode_cursor(LAST_KEY, scope="greetings")
+        assert decode_cursor(cursor, scope="greetings") == LAST_KEY
+
+    def test_cursor_is_url_safe(self):
+        """Test that cursors can be passed as query parameters without escaping."""
+        cursor = encode_cursor(LAST_KEY, scope="greetings")
+        assert all(c.isalnum() or c in "-_." for c in cursor)
+
+    def test_tampered_payload_is_rejected(self):
+        """Test that modifying the payload invalidates the signature."""
+        forged = encode_cursor({"id": "other", "created_at": "x"}, scope="greetings")
+        original = encode_cursor(LAST_KEY, scope="greetings")
+        tampered = f"{forged.split('.')[0]}.{original.split('.')[1]}"
+
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(tampered, scope="greetings")
+
+    def test_cursor_from_other_scope_is_rejected(self):
+        """Test that cursors cannot be replayed against a different listing."""
+        cursor = encode_cursor(LAST_KEY, scope="user:alice")
+
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, scope="greetings")
+
+    @pytest.mark.parametrize("cursor", ["", "no-dot", "!!!.???", "a.b.c"])
+    def test_malformed_cursor_is_rejected(self, cursor: str):
+        """Test that garbage input raises InvalidCursorError, not a server error."""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, scope="greetings")
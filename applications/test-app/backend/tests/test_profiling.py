@@ -0,0 +1,117 @@
+"""
+Unit tests for per-request profiling.
+"""
+
+import pstats
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import middleware
+import profiling
+
+
+SECRET = "profiling-secret"
+
+
+def _busy_work() -> int:
+    return sum(i * i for i in range(20000))
+
+
+def _client(tmp_path, **kwargs) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/api/greet")
+    async def greet():
+        deadline = time.perf_counter() + 0.02
+        while time.perf_counter() < deadline:
+            _busy_work()
+        return {"message": "hello"}
+
+    app.add_middleware(
+        middleware.ProfilingMiddleware,
+        output_dir=str(tmp_path),
+        **{"mode": "header", "secret": SECRET, "profiler": "cprofile", **kwargs},
+    )
+    app.add_middleware(middleware.RequestIdMiddleware)
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestProfileToken:
+    """Test suite for signed X-Profile tokens."""
+
+    def test_valid_token(self):
+        """Test that a freshly signed token verifies."""
+        assert profiling.verify_profile_token(profiling.sign_profile_token(SECRET), SECRET)
+
+    @pytest.mark.parametrize(
+        "token",
+        [
+            "",
+            "garbage",
+            "12.34",
+            profiling.sign_profile_token("other-secret"),
+            profiling.sign_profile_token(SECRET, ttl_seconds=-1),
+        ],
+    )
+    def test_invalid_tokens(self, token):
+        """Test that malformed, wrongly signed and expired tokens are rejected."""
+        assert profiling.verify_profile_token(token, SECRET) is False
+
+    def test_empty_secret_rejects_everything(self):
+        """Test that an unset secret never enables profiling."""
+        assert profiling.verify_profile_token(profiling.sign_profile_token(""), "") is False
+
+
+@pytest.mark.unit
+class TestProfilingMiddleware:
+    """Test suite for middleware.ProfilingMiddleware."""
+
+    def test_unsigned_requests_are_not_profiled(self, tmp_path):
+        """Test that requests without a valid token pass through untouched."""
+        client = _client(tmp_path)
+
+        response = client.get("/api/greet", headers={"X-Profile": "1.bad"})
+
+        assert response.json() == {"message": "hello"}
+        assert "x-profile-file" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_signed_request_writes_cprofile(self, tmp_path):
+        """Test that a signed request writes a .prof file covering the route."""
+        client = _client(tmp_path)
+
+        response = client.get(
+            "/api/greet", headers={"X-Profile": profiling.sign_profile_token(SECRET)}
+        )
+
+        assert response.json() == {"message": "hello"}
+        path = response.headers["x-profile-file"]
+        assert path.endswith(".prof")
+        assert response.headers["x-request-id"] in path
+        functions = {name for _, _, name in pstats.Stats(path).stats}
+        assert "_busy_work" in functions
+
+    def test_sampled_profile_returned_inline(self, tmp_path):
+        """Test that X-Profile-Output: response returns collapsed stacks as the body."""
+        client = _client(tmp_path, mode="always", profiler="sampling")
+
+        response = client.get("/api/greet", headers={"X-Profile-Output": "response"})
+
+        assert response.status_code == 200
+        assert response.headers["x-profile-status"] == "200"
+        assert response.headers["x-request-id"]
+        lines = response.text.splitlines()
+        assert lines
+        _, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert any("greet (test_profiling.py)" in line for line in lines)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_invalid_mode(self):
+        """Test that an unknown mode is rejected at startup."""
+        with pytest.raises(ValueError, match="profiling mode"):
+            middleware.ProfilingMiddleware(FastAPI(), mode="sometimes")
@@ -0,0 +1,287 @@
+"""
+Unit tests for GCRA rate limiting and its storages.
+"""
+
+import asyncio
+import secrets
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import middleware
+import ratelimit
+from auth import api_key_fingerprint, verify_api_key
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FailingStore(ratelimit.SharedStore):
+    def take(self, key, limit, tokens):
+        raise ConnectionError("redis is down")
+
+
+@pytest.mark.unit
+class TestGCRA:
+    """Test suite for the GCRA arithmetic and per-process storage."""
+
+    def test_burst_then_sustained_rate(self):
+        """Test that a full bucket allows the burst, then one request per interval."""
+        clock = FakeClock()
+        storage = ratelimit.MemoryStorage(clock=clock)
+        limit = ratelimit.Limit(per_minute=60, burst=3)
+
+        assert [storage.take("k", limit)[0] for _ in range(4)] == [True, True, True, False]
+        assert storage.take("k", limit) == (False, pytest.approx(1.0))
+
+        clock.now += 1.0
+        assert storage.take("k", limit) == (True, 0.0)
+        assert storage.take("k", limit)[0] is False
+
+    def test_no_window_edge_burst(self):
+        """Test that a client cannot double its burst around a window boundary."""
+        clock = FakeClock(59.9)
+        storage = ratelimit.MemoryStorage(clock=clock)
+        limit = ratelimit.Limit(per_minute=60)
+        allowed = sum(storage.take("k", limit)[0] for _ in range(100))
+        clock.now = 60.1
+        allowed += sum(storage.take("k", limit)[0] for _ in range(100))
+
+        assert allowed == 60
+
+    def test_keys_are_independent_and_pruned(self):
+        """Test that keys have separate buckets and full buckets are dropped first."""
+        clock = FakeClock()
+        storage = ratelimit.MemoryStorage(max_keys=2, clock=clock)
+        limit = ratelimit.Limit(per_minute=60, burst=1)
+
+        assert storage.take("a", limit)[0] is True
+        assert storage.take("b", limit)[0] is True
+        assert storage.take("a", limit)[0] is False
+        clock.now += 5
+        storage.take("c", limit)
+
+        assert storage.stats() == {"keys": 1}
+
+    def test_throttled_keys_survive_prune(self):
+        """Test that pruning idle keys never resets buckets that are still limited."""
+        clock = FakeClock()
+        storage = ratelimit.MemoryStorage(max_keys=10, clock=clock)
+        limit = ratelimit.Limit(per_minute=60, burst=1)
+        for client in range(8):
+            storage.take(f"throttled-{client}", limit)
+        storage._prune(clock.now)
+        storage.take("new", limit)
+
+        assert storage.stats() == {"keys": 9}
+        assert storage.take("throttled-0", limit)[0] is False
+
+    def test_idle_buckets_are_evicted(self):
+        """Test that buckets back at full are dropped on the next eviction pass."""
+        clock = FakeClock()
+        storage = ratelimit.MemoryStorage(evict_interval=60, clock=clock)
+        limit = ratelimit.Limit(per_minute=60, burst=10)
+        for client in range(100):
+            storage.take(f"idle-{client}", limit)
+        clock.now += 30
+        for _ in range(40):
+            storage.take("busy", limit)
+            clock.now += 1
+
+        assert storage.stats() == {"keys": 1}
+
+    def test_eviction_keeps_active_keys(self):
+        """Test that an eviction pass with many live clients keeps every non-idle bucket."""
+        clock = FakeClock()
+        storage = ratelimit.MemoryStorage(max_keys=10, evict_interval=20, clock=clock)
+        limit = ratelimit.Limit(per_minute=1, burst=1)
+        for client in range(8):
+            storage.take(f"active-{client}", limit)
+        # Past the eviction interval, but each bucket needs 60s to refill
+        clock.now += 30
+        storage.take("trigger", limit)
+
+        assert storage.stats() == {"keys": 9}
+        assert not any(storage.take(f"active-{client}", limit)[0] for client in range(8))
+
+    def test_shared_store_grants_partial_batches(self):
+        """Test that a batch request gets what is left in the bucket."""
+        store = ratelimit.InMemorySharedStore(clock=FakeClock())
+        limit = ratelimit.Limit(per_minute=60, burst=5)
+
+        assert store.take("k", limit, 4) == (4, 0.0)
+        assert store.take("k", limit, 4) == (1, 0.0)
+        assert store.take("k", limit, 4) == (0, pytest.approx(1.0))
+
+
+@pytest.mark.unit
+class TestLeasedStorage:
+    """Test suite for batched leases from a shared store."""
+
+    async def test_workers_share_one_limit(self):
+        """Test that several workers together stay within the limit in few round trips."""
+        clock = FakeClock()
+        store = ratelimit.InMemorySharedStore(clock=clock)
+        workers = [ratelimit.LeasedStorage(store, lease_size=10, clock=clock) for _ in range(3)]
+        limit = ratelimit.Limit(per_minute=6000, burst=100)
+
+        allowed = 0
+        for i in range(300):
+            ok, _ = await workers[i % 3].acquire("client", limit)
+            allowed += ok
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.05)
+
+        assert allowed <= 100
+        assert allowed >= 70  # tokens still leased to workers are not spent yet
+        # Rejections are answered locally until the retry time
+        assert store.calls < 60
+
+    async def test_denied_key_is_refused_locally(self):
+        """Test that a refused key makes no further shared calls until it may retry."""
+        clock = FakeClock()
+        store = ratelimit.InMemorySharedStore(clock=clock)
+        storage = ratelimit.LeasedStorage(store, clock=clock)
+        limit = ratelimit.Limit(per_minute=60, burst=1)
+
+        assert (await storage.acquire("k", limit))[0] is True
+        await asyncio.sleep(0.05)
+        calls = store.calls
+        results = [await storage.acquire("k", limit) for _ in range(10)]
+
+        assert not any(ok for ok, _ in results)
+        assert store.calls - calls <= 1
+        assert all(0 < wait <= 1.0 for _, wait in results)
+
+    async def test_falls_back_to_local_limits(self):
+        """Test that a store outage still limits each worker on its own."""
+        storage = ratelimit.LeasedStorage(FailingStore())
+        limit = ratelimit.Limit(per_minute=60, burst=2)
+
+        results = [(await storage.acquire("k", limit))[0] for _ in range(3)]
+
+        assert results == [True, True, False]
+        assert storage.stats()["fallbacks"] == 3
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Test suite for the route decorator and 429 responses."""
+
+    def test_limited_route_returns_429(self):
+        """Test that requests over the limit get the error envelope and Retry-After."""
+        limiter = ratelimit.RateLimiter(ratelimit.MemoryStorage())
+        app = FastAPI()
+        app.add_exception_handler(
+            ratelimit.RateLimitExceededError, ratelimit.rate_limit_exceeded_handler
+        )
+
+        @app.get("/limited")
+        @limiter.limit(per_minute=60, burst=2)
+        async def limited(request: Request):
+            return {"ok": True}
+
+        app.add_middleware(middleware.RequestIdMiddleware)
+        client = TestClient(app)
+
+        statuses = [client.get("/limited").status_code for _ in range(2)]
+        response = client.get("/limited")
+
+        assert statuses == [200, 200]
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "1"
+        assert response.json() == {
+            "error": "Rate limit exceeded: 60 per 1 minute",
+            "status_code": 429,
+            "request_id": response.headers["x-request-id"],
+        }
+        assert limiter.stats()["rejected"] == 1
+
+    def test_route_without_request_argument(self):
+        """Test that decorating a route without a request argument fails at import time."""
+        limiter = ratelimit.RateLimiter(ratelimit.MemoryStorage())
+
+        with pytest.raises(TypeError, match="request"):
+
+            @limiter.limit(per_minute=60)
+            async def no_request():
+                return {}
+
+
+def _request(client_host: str, headers: dict[str, str] | None = None) -> Request:
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request(
+        {"type": "http", "headers": raw_headers, "client": (client_host, 1234), "state": {}}
+    )
+
+
+@pytest.mark.unit
+class TestClientKeys:
+    """Test suite for per-API-key and per-IP client identification."""
+
+    ALB = ratelimit.parse_networks(["10.0.0.0/16"])
+
+    def test_untrusted_peer_ignores_forwarded_for(self):
+        """Test that X-Forwarded-For from an untrusted peer cannot choose the bucket."""
+        request = _request("203.0.113.9", {"X-Forwarded-For": "1.2.3.4"})
+
+        assert ratelimit.client_address(request, self.ALB) == "203.0.113.9"
+
+    def test_trusted_proxy_uses_rightmost_untrusted_hop(self):
+        """Test that the client is the last address appended before the trusted proxies."""
+        request = _request("10.0.1.5", {"X-Forwarded-For": "6.6.6.6, 198.51.100.7, 10.0.2.2"})
+
+        assert ratelimit.client_address(request, self.ALB) == "198.51.100.7"
+
+    async def test_validated_api_key_gets_own_bucket(self, monkeypatch):
+        """Test that auth stores a key fingerprint and each key is limited separately."""
+        monkeypatch.setattr(secrets, "get_backend_api_key", lambda: "valid-key")
+        request = _request("10.0.1.5")
+
+        assert await verify_api_key(request, "valid-key") == "valid-key"
+
+        limiter = ratelimit.RateLimiter(ratelimit.MemoryStorage(), self.ALB)
+        assert request.state.api_key_hash == api_key_fingerprint("valid-key")
+        assert limiter.client_key(request) == (f"key:{api_key_fingerprint('valid-key')}", True)
+        assert "valid-key" not in limiter.client_key(request)[0]
+
+    async def test_noisy_client_does_not_throttle_others(self):
+        """Test that one API key exhausting its bucket leaves other keys and IPs alone."""
+        limiter = ratelimit.RateLimiter(ratelimit.MemoryStorage(), self.ALB)
+        ip_limit = ratelimit.Limit(per_minute=60, burst=1)
+        key_limit = ratelimit.Limit(per_minute=600, burst=5)
+        noisy = _request("10.0.1.5", {"X-Forwarded-For": "198.51.100.7"})
+        noisy.state.api_key_hash = api_key_fingerprint("noisy")
+        quiet = _request("10.0.1.5", {"X-Forwarded-For": "198.51.100.7"})
+        quiet.state.api_key_hash = api_key_fingerprint("quiet")
+        anonymous = _request("10.0.1.5", {"X-Forwarded-For": "198.51.100.8"})
+
+        for _ in range(5):
+            await limiter.check(noisy, "greet_user", ip_limit, key_limit)
+        with pytest.raises(ratelimit.RateLimitExceededError, match="600 per 1 minute"):
+            await limiter.check(noisy, "greet_user", ip_limit, key_limit)
+
+        await limiter.check(quiet, "greet_user", ip_limit, key_limit)
+        await limiter.check(anonymous, "greet_user", ip_limit, key_limit)
+        with pytest.raises(ratelimit.RateLimitExceededError, match="60 per 1 minute"):
+            await limiter.check(anonymous, "greet_user", ip_limit, key_limit)
+
+    async def test_shared_key_without_key_limit_is_limited_per_ip(self):
+        """Test that two IPs sending the same API key get separate buckets by default."""
+        limiter = ratelimit.RateLimiter(ratelimit.MemoryStorage(), self.ALB)
+        limit = ratelimit.Limit(per_minute=60, burst=1)
+        first = _request("10.0.1.5", {"X-Forwarded-For": "198.51.100.7"})
+        second = _request("10.0.1.5", {"X-Forwarded-For": "198.51.100.8"})
+        for request in (first, second):
+            request.state.api_key_hash = api_key_fingerprint("frontend-key")
+
+        await limiter.check(first, "greet_user", limit)
+        await limiter.check(second, "greet_user", limit)
+        with pytest.raises(ratelimit.RateLimitExceededError):
+            await limiter.check(first, "greet_user", limit)
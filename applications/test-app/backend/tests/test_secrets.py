@@ -0,0 +1,186 @@
+"""
+Unit tests for the in-process secret cache.
+
+These tests exercise SecretCache and get_secret_value without AWS access by
+substituting the uncached loader.
+"""
+
+import asyncio
+import secrets as app_secrets
+import threading
+import time
+import traceback
+from secrets import SecretCache
+
+import pytest
+from botocore.exceptions import ClientError
+
+
+@pytest.mark.unit
+class TestSecretCache:
+    """Test suite for SecretCache TTL, refresh-ahead and stale-on-error behaviour."""
+
+    def test_fresh_value_is_served_from_memory(self):
+        """Test that a cached value is returned without calling the loader again."""
+        cache = SecretCache(ttl_seconds=60, refresh_ahead_seconds=10)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return "secret-v1"
+
+        assert cache.get("key", loader) == "secret-v1"
+        assert cache.get("key", loader) == "secret-v1"
+        assert len(calls) == 1
+
+    def test_expired_value_is_reloaded(self):
+        """Test that a rotated secret is picked up once the TTL elapses."""
+        cache = SecretCache(ttl_seconds=0.05, refresh_ahead_seconds=0)
+        values = iter(["secret-v1", "secret-v2"])
+
+        assert cache.get("key", lambda: next(values)) == "secret-v1"
+        time.sleep(0.06)
+        assert cache.get("key", lambda: next(values)) == "secret-v2"
+
+    def test_last_good_value_served_when_reload_fails(self):
+        """Test that the last good value survives a Secrets Manager outage."""
+        cache = SecretCache(ttl_seconds=0.05, refresh_ahead_seconds=0, error_ttl_seconds=60)
+        cache.get("key", lambda: "secret-v1")
+        time.sleep(0.06)
+
+        def failing_loader():
+            raise RuntimeError("Secrets Manager unavailable")
+
+        assert cache.get("key", failing_loader) == "secret-v1"
+
+    def test_background_refresh_inside_refresh_window(self):
+        """Test that entries close to expiry are refreshed without blocking the caller."""
+        cache = SecretCache(ttl_seconds=0.4, refresh_ahead_seconds=0.2)
+        cache.get("key", lambda: "secret-v1")
+        time.sleep(0.25)
+
+        refreshed = threading.Event()
+
+        def loader():
+            refreshed.set()
+            return "secret-v2"
+
+        # Still inside the TTL: the stale value is returned immediately
+        assert cache.get("key", loader) == "secret-v1"
+        assert refreshed.wait(timeout=1)
+        for _ in range(50):
+            if cache.get("key", loader) == "secret-v2":
+                break
+            time.sleep(0.01)
+        assert cache.get("key", loader) == "secret-v2"
+
+    def test_errors_are_cached_for_error_ttl(self):
+        """Test that failed lookups without a last good value are not retried per call."""
+        cache = SecretCache(ttl_seconds=60, error_ttl_seconds=60)
+        calls = []
+
+        def failing_loader():
+            calls.append(1)
+            raise RuntimeError("no credentials")
+
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                cache.get("key", failing_loader)
+        assert len(calls) == 1
+
+    def test_cached_error_traceback_does_not_grow(self):
+        """Test that each cached failure raises a new exception chained from the original."""
+        cache = SecretCache(ttl_seconds=60, error_ttl_seconds=60)
+        error = ClientError({"Error": {"Code": "AccessDeniedException"}}, "GetSecretValue")
+
+        def failing_loader():
+            raise error
+
+        with pytest.raises(ClientError):
+            cache.get("key", failing_loader)
+        depth = len(traceback.extract_tb(error.__traceback__))
+        raised = []
+        for _ in range(3):
+            with pytest.raises(ClientError) as exc_info:
+                cache.get("key", failing_loader)
+            raised.append(exc_info.value)
+
+        assert len(traceback.extract_tb(error.__traceback__)) == depth
+        assert all(e is not error and e.__cause__ is error for e in raised)
+        assert raised[0].response == error.response
+        assert len({len(traceback.extract_tb(e.__traceback__)) for e in raised}) == 1
+
+    def test_zero_ttl_disables_caching(self):
+        """Test that a TTL of 0 calls the loader every time."""
+        cache = SecretCache(ttl_seconds=0)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return "value"
+
+        cache.get("key", loader)
+        cache.get("key", loader)
+        assert len(calls) == 2
+
+
+@pytest.mark.unit
+class TestGetSecretValueCaching:
+    """Test suite for get_secret_value integration with the cache."""
+
+    @pytest.fixture(autouse=True)
+    def _fresh_cache(self, monkeypatch):
+        monkeypatch.setattr(
+            app_secrets, "_secret_cache", SecretCache(ttl_seconds=60, refresh_ahead_seconds=0)
+        )
+
+    def test_keyed_by_identifier_and_json_key(self, monkeypatch):
+        """Test that different JSON keys of the same secret are cached separately."""
+        calls = []
+
+        def fake_fetch(secret_identifier, key, region, use_discovery):
+            calls.append((secret_identifier, key))
+            return f"{secret_identifier}:{key}"
+
+        monkeypatch.setattr(app_secrets, "_fetch_secret_value", fake_fetch)
+
+        assert app_secrets.get_secret_value("db", key="username") == "db:username"
+        assert app_secrets.get_secret_value("db", key="password") == "db:password"
+        assert app_secrets.get_secret_value("db", key="username") == "db:username"
+        assert calls == [("db", "username"), ("db", "password")]
+
+    def test_env_fallback_when_never_resolved(self, monkeypatch):
+        """Test that the environment variable fallback still applies on cold failure."""
+
+        def failing_fetch(*args):
+            raise RuntimeError("no credentials")
+
+        monkeypatch.setattr(app_secrets, "_fetch_secret_value", failing_fetch)
+        monkeypatch.setenv("BACKEND_API_KEY", "local-key")
+
+        assert app_secrets.get_backend_api_key() == "local-key"
+
+    async def test_async_lookup_loads_off_the_event_loop(self, monkeypatch):
+        """Test that cold lookups run in a worker thread and fresh hits are served inline."""
+        loop_thread = threading.get_ident()
+        fetch_threads = []
+        offloaded = []
+        to_thread = asyncio.to_thread
+
+        def fake_fetch(secret_identifier, key, region, use_discovery):
+            fetch_threads.append(threading.get_ident())
+            return "api-key"
+
+        async def recording_to_thread(func, *args):
+            offloaded.append(func)
+            return await to_thread(func, *args)
+
+        monkeypatch.setattr(app_secrets, "_fetch_secret_value", fake_fetch)
+        monkeypatch.setattr(app_secrets.asyncio, "to_thread", recording_to_thread)
+
+        assert await app_secrets.get_backend_api_key_async() == "api-key"
+        assert await app_secrets.get_backend_api_key_async() == "api-key"
+
+        assert len(fetch_threads) == 1
+        assert fetch_threads[0] != loop_thread
+        assert len(offloaded) == 1
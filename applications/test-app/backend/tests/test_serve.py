@@ -0,0 +1,84 @@
+"""
+Unit tests for the production server entry point.
+"""
+
+import pytest
+
+import serve
+
+
+@pytest.mark.unit
+class TestWorkerSizing:
+    """Test suite for CPU quota detection and worker count."""
+
+    def test_cgroup_v2_quota(self, tmp_path):
+        """Test that a cgroup v2 cpu.max quota is converted to CPUs."""
+        (tmp_path / "cpu.max").write_text("150000 100000\n")
+
+        assert serve.cgroup_cpu_limit(str(tmp_path)) == 1.5
+
+    def test_cgroup_v2_unlimited(self, tmp_path):
+        """Test that an unlimited cgroup v2 quota reports no limit."""
+        (tmp_path / "cpu.max").write_text("max 100000\n")
+
+        assert serve.cgroup_cpu_limit(str(tmp_path)) is None
+
+    def test_cgroup_v1_quota(self, tmp_path):
+        """Test that cgroup v1 CFS quota and period files are read."""
+        (tmp_path / "cpu").mkdir()
+        (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("50000\n")
+        (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+
+        assert serve.cgroup_cpu_limit(str(tmp_path)) == 0.5
+
+    def test_no_cgroup(self, tmp_path):
+        """Test that missing cgroup files report no limit."""
+        assert serve.cgroup_cpu_limit(str(tmp_path)) is None
+
+    @pytest.mark.parametrize(
+        ("configured", "per_cpu", "cpus", "expected"),
+        [(0, 2, 1.0, 2), (0, 2, 0.25, 1), (0, 1, 1.5, 2), (0, 2, 4, 8), (3, 2, 4, 3)],
+    )
+    def test_worker_count(self, configured, per_cpu, cpus, expected):
+        """Test that an explicit count wins and automatic sizing rounds up to at least 1."""
+        assert serve.worker_count(configured, per_cpu, cpus) == expected
+
+    def test_per_process_backends_get_one_worker(self):
+        """Test that automatic sizing starts one worker while a memory backend is in use."""
+        assert serve.worker_count(0, 2, 4, ["CACHE_BACKEND=memory"]) == 1
+        assert serve.worker_count(1, 2, 4, ["RATE_LIMIT_STORAGE=memory"]) == 1
+
+    def test_explicit_workers_with_per_process_backends(self):
+        """Test that several workers with a memory backend refuse to start."""
+        with pytest.raises(ValueError, match="RATE_LIMIT_STORAGE=memory"):
+            serve.worker_count(4, 2, 4, ["RATE_LIMIT_STORAGE=memory"])
+
+    def test_per_process_state_from_settings(self, monkeypatch):
+        """Test that only enabled memory backends count as per-process state."""
+        monkeypatch.setattr(serve.settings, "CACHE_ENABLED", True)
+        monkeypatch.setattr(serve.settings, "CACHE_BACKEND", "redis")
+        monkeypatch.setattr(serve.settings, "RATE_LIMIT_ENABLED", True)
+        monkeypatch.setattr(serve.settings, "RATE_LIMIT_STORAGE", "memory")
+
+        assert serve.per_process_state() == ["RATE_LIMIT_STORAGE=memory"]
+
+        monkeypatch.setattr(serve.settings, "RATE_LIMIT_ENABLED", False)
+        assert serve.per_process_state() == []
+
+    def test_server_options_from_settings(self):
+        """Test that uvicorn gets the tuned settings and the fast loop and parser."""
+        options = serve.server_options(workers=2)
+
+        assert options["workers"] == 2
+        assert options["loop"] == "uvloop"
+        assert options["http"] == "httptools"
+        assert options["timeout_keep_alive"] == serve.settings.SERVER_KEEPALIVE_SECONDS
+        assert options["access_log"] is False
+
+    def test_prepare_multiprocess_metrics_clears_old_snapshots(self, tmp_path, monkeypatch):
+        """Test that stale snapshots are removed and the directory is exported to workers."""
+        (tmp_path / "123.json").write_text("{}")
+        monkeypatch.setenv("METRICS_MULTIPROC_DIR", str(tmp_path))
+
+        assert serve.prepare_multiprocess_metrics() == str(tmp_path)
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,179 @@
+"""
+Unit tests for request coalescing (single-flight).
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from singleflight import AsyncSingleFlight, SingleFlight, singleflight
+
+
+def _run_concurrently(target, count: int) -> list:
+    """Start `count` threads on target() at the same time and collect results/errors."""
+    barrier = threading.Barrier(count)
+    results: list = []
+
+    def run():
+        barrier.wait()
+        try:
+            results.append(target())
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    """Test suite for singleflight.SingleFlight and the @singleflight decorator."""
+
+    def test_concurrent_identical_calls_run_once(self):
+        """Test that simultaneous callers with the same arguments share one call."""
+        calls = 0
+
+        @singleflight
+        def slow_read(user_name):
+            nonlocal calls
+            calls += 1
+            time.sleep(0.1)
+            return f"greetings for {user_name}"
+
+        results = _run_concurrently(lambda: slow_read("alice"), 8)
+
+        assert results == ["greetings for alice"] * 8
+        assert calls == 1
+        assert slow_read.flights.coalesced == 7
+
+    def test_different_arguments_are_not_coalesced(self):
+        """Test that calls with different arguments each run."""
+        calls: list[str] = []
+
+        @singleflight
+        def read(user_name):
+            calls.append(user_name)
+            time.sleep(0.05)
+            return user_name
+
+        _run_concurrently(lambda: read(threading.current_thread().name), 4)
+
+        assert len(calls) == 4
+
+    def test_exception_is_shared_and_not_remembered(self):
+        """Test that waiters get the leader's exception and the next call runs again."""
+        flights = SingleFlight()
+        calls = 0
+
+        def failing():
+            nonlocal calls
+            calls += 1
+            time.sleep(0.1)
+            raise ConnectionError("DynamoDB down")
+
+        results = _run_concurrently(lambda: flights.do("key", failing), 4)
+
+        assert all(isinstance(result, ConnectionError) for result in results)
+        assert calls == 1
+        assert flights.do("key", lambda: "recovered") == "recovered"
+
+    def test_waiters_raise_their_own_copy(self):
+        """Test that each waiter raises a new exception chained from the leader's."""
+        flights = SingleFlight()
+
+        def failing():
+            time.sleep(0.1)
+            raise ConnectionError("DynamoDB down")
+
+        results = _run_concurrently(lambda: flights.do("key", failing), 4)
+
+        (original,) = [e for e in results if e.__cause__ is None]
+        copies = [e for e in results if e is not original]
+        assert len(copies) == 3
+        assert all(e.__cause__ is original and e.args == original.args for e in copies)
+
+    def test_leader_interrupt_is_not_passed_to_waiters(self):
+        """Test that a KeyboardInterrupt in the leader makes waiters run the call themselves."""
+        flights = SingleFlight()
+        calls = 0
+        interrupted = []
+
+        def read():
+            nonlocal calls
+            calls += 1
+            time.sleep(0.1)
+            if calls == 1:
+                raise KeyboardInterrupt
+            return "page"
+
+        def call():
+            try:
+                return flights.do("key", read)
+            except KeyboardInterrupt:
+                interrupted.append(True)
+                return "interrupted"
+
+        results = _run_concurrently(call, 3)
+
+        assert sorted(results) == ["interrupted", "page", "page"]
+        assert interrupted == [True]
+
+
+@pytest.mark.unit
+class TestAsyncSingleFlight:
+    """Test suite for singleflight.AsyncSingleFlight."""
+
+    async def test_concurrent_awaits_share_one_task(self):
+        """Test that concurrent awaits with the same key run the coroutine once."""
+        flights = AsyncSingleFlight()
+        calls = 0
+
+        async def read():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "page"
+
+        results = await asyncio.gather(*(flights.do("key", read) for _ in range(5)))
+
+        assert results == ["page"] * 5
+        assert calls == 1
+        assert flights.coalesced == 4
+
+    async def test_waiters_raise_their_own_copy(self):
+        """Test that awaiting callers get copies of the shared task's exception."""
+        flights = AsyncSingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.05)
+            raise ConnectionError("DynamoDB down")
+
+        results = await asyncio.gather(
+            *(flights.do("key", failing) for _ in range(3)), return_exceptions=True
+        )
+
+        original, *copies = results
+        assert all(e is not original and e.__cause__ is original for e in copies)
+
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        """Test that a disconnecting caller leaves the shared call running for the rest."""
+        flights = AsyncSingleFlight()
+
+        async def read():
+            await asyncio.sleep(0.05)
+            return "page"
+
+        first = asyncio.create_task(flights.do("key", read))
+        second = asyncio.create_task(flights.do("key", read))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "page"
+        with pytest.raises(asyncio.CancelledError):
+            await first
@@ -0,0 +1,163 @@
+"""
+Unit tests for tracing spans, W3C trace context and exporters.
+"""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import middleware
+import tracing
+from async_database import run_in_executor
+
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def spans(tmp_path):
+    """Enable tracing with a file exporter; returns a reader for the exported spans."""
+    path = tmp_path / "spans.jsonl"
+    tracing.setup_tracing(tracing.FileSpanExporter(str(path)))
+
+    def read() -> list[dict]:
+        tracing.flush_tracing()
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    yield read
+    tracing.setup_tracing(None)
+
+
+@pytest.mark.unit
+class TestTraceparent:
+    """Test suite for W3C traceparent parsing."""
+
+    def test_valid_header(self):
+        """Test that trace ID, parent span ID and sampled flag are parsed."""
+        assert tracing.parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (
+            TRACE_ID,
+            PARENT_ID,
+            True,
+        )
+
+    @pytest.mark.parametrize(
+        "header",
+        [
+            None,
+            "garbage",
+            f"00-{'0' * 32}-{PARENT_ID}-01",
+            f"00-{TRACE_ID}-{PARENT_ID}-zz",
+            f"ff-{TRACE_ID}-{PARENT_ID}-01",
+        ],
+    )
+    def test_invalid_headers_are_ignored(self, header):
+        """Test that malformed or all-zero headers start a new trace instead."""
+        assert tracing.parse_traceparent(header) is None
+
+
+@pytest.mark.unit
+class TestSpans:
+    """Test suite for span creation and export."""
+
+    def test_disabled_by_default(self):
+        """Test that spans are no-ops until an exporter is installed."""
+        with tracing.start_span("work") as span:
+            assert span.recording is False
+        assert tracing.current_span() is None
+
+    def test_nested_spans_share_trace(self, spans):
+        """Test that child spans link to their parent and errors are recorded."""
+        with (
+            tracing.start_span("parent") as parent,
+            pytest.raises(RuntimeError),
+            tracing.start_span("child"),
+        ):
+            raise RuntimeError("boom")
+
+        exported = {span["name"]: span for span in spans()}
+        assert exported["child"]["parent_span_id"] == parent.span_id
+        assert exported["child"]["trace_id"] == parent.trace_id
+        assert exported["child"]["status"] == {"code": "ERROR", "message": "boom"}
+        assert exported["parent"]["parent_span_id"] is None
+
+    def test_unsampled_traces_are_not_exported(self, tmp_path):
+        """Test that a zero sample rate records no new traces."""
+        path = tmp_path / "spans.jsonl"
+        tracing.setup_tracing(tracing.FileSpanExporter(str(path)), sample_rate=0.0)
+        try:
+            with tracing.start_span("dropped"):
+                pass
+            tracing.flush_tracing()
+        finally:
+            tracing.setup_tracing(None)
+
+        assert not path.exists()
+
+    def test_otlp_payload(self):
+        """Test the OTLP/HTTP JSON mapping of kinds, attributes and status."""
+        exporter = tracing.OTLPHttpSpanExporter("http://collector/v1/traces", "backend")
+        span = tracing.Span("GET /x", tracing.SPAN_KIND_SERVER, TRACE_ID, None, True)
+        span.set_attribute("http.status_code", 200)
+        span.end_ns = span.start_ns + 1
+
+        payload = exporter._payload([span.to_dict()])
+
+        resource_spans = payload["resourceSpans"][0]
+        otlp_span = resource_spans["scopeSpans"][0]["spans"][0]
+        assert resource_spans["resource"]["attributes"][0]["value"] == {"stringValue": "backend"}
+        assert otlp_span["kind"] == 2
+        assert otlp_span["attributes"] == [
+            {"key": "http.status_code", "value": {"intValue": "200"}}
+        ]
+        assert otlp_span["status"]["code"] == 0
+
+
+@pytest.mark.unit
+class TestRequestTracing:
+    """Test suite for spans across middleware, routes and executor threads."""
+
+    def test_request_spans_continue_incoming_trace(self, spans):
+        """Test that a request continues the caller's trace down to executor threads."""
+
+        def read_from_table():
+            with tracing.start_span("dynamodb.Query"):
+                return {"ok": True}
+
+        app = FastAPI(default_response_class=tracing.TracedJSONResponse)
+        app.router.route_class = tracing.TracedRoute
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: str):
+            return await run_in_executor(read_from_table)
+
+        app.add_middleware(middleware.ErrorHandlingMiddleware)
+        app.add_middleware(middleware.LoggingMiddleware)
+        app.add_middleware(middleware.RequestIdMiddleware)
+
+        response = TestClient(app).get(
+            "/items/1", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}
+        )
+        assert response.status_code == 200
+
+        exported = {span["name"]: span for span in spans()}
+        server = exported["GET /items/{item_id}"]
+        assert server["trace_id"] == TRACE_ID
+        assert server["parent_span_id"] == PARENT_ID
+        assert server["kind"] == "SERVER"
+        assert server["attributes"]["http.status_code"] == 200
+        assert {
+            "middleware.LoggingMiddleware",
+            "middleware.ErrorHandlingMiddleware",
+            "route GET /items/{item_id}",
+            "db.read_from_table",
+            "dynamodb.Query",
+            "response.render",
+        } <= exported.keys()
+        query, db_call = exported["dynamodb.Query"], exported["db.read_from_table"]
+        assert query["parent_span_id"] == db_call["span_id"]
+        assert all(span["trace_id"] == TRACE_ID for span in exported.values())
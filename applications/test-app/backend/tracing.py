@@ -0,0 +1,502 @@
+"""Request tracing with W3C trace context and pluggable span exporters.
+
+Spans follow the OpenTelemetry data model (trace/span IDs, parent, kind,
+attributes, status) so a collector can ingest them, without depending on the
+OpenTelemetry SDK. The current span lives in a contextvar, so child spans
+nest across awaits, and across threads where the context is copied
+(async_database.run_in_executor, asyncio.to_thread).
+
+Tracing is off until setup_tracing() installs an exporter. While it is off,
+start_span() returns a shared no-op context manager and nothing is recorded.
+Finished spans go to a bounded queue, and a background thread exports them in
+batches. Exporters:
+- "file": JSON lines, one span per line (local debugging, tests)
+- "otlp": OTLP/HTTP JSON POSTed to a collector (e.g. http://collector:4318/v1/traces)
+"""
+
+import contextvars
+import json
+import logging
+import queue
+import random
+import threading
+import time
+import urllib.request
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+
+logger = logging.getLogger(__name__)
+
+SPAN_KIND_INTERNAL = "INTERNAL"
+SPAN_KIND_SERVER = "SERVER"
+SPAN_KIND_CLIENT = "CLIENT"
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    """
+    Parse a W3C traceparent header.
+
+    Returns:
+        tuple: (trace_id, parent span_id, sampled), or None if absent or malformed
+    """
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    _, trace_id, span_id, flags = parts[:4]
+    try:
+        if len(trace_id) != 32 or len(span_id) != 16 or len(flags) != 2:
+            return None
+        if int(trace_id, 16) == 0 or int(span_id, 16) == 0:
+            return None
+        sampled = bool(int(flags, 16) & 0x01)
+    except ValueError:
+        return None
+    return trace_id.lower(), span_id.lower(), sampled
+
+
+class Span:
+    """One timed operation. Use start_span() rather than creating spans directly."""
+
+    __slots__ = (
+        "name",
+        "kind",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "sampled",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "status_message",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        trace_id: str,
+        parent_id: str | None,
+        sampled: bool,
+        attributes: dict[str, Any] | None = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes or {}
+        self.status = "UNSET"
+        self.status_message = ""
+
+    @property
+    def recording(self) -> bool:
+        return True
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value identifying this span."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException | str) -> None:
+        self.status = "ERROR"
+        self.status_message = str(error)
+
+    def end(self) -> None:
+        """Finish the span and hand it to the exporter (if sampled)."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled and _processor is not None:
+            _processor.submit(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+class _NonRecordingSpan:
+    """Stand-in returned while tracing is off; every method is a no-op."""
+
+    recording = False
+    trace_id = None
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, error: BaseException | str) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NON_RECORDING_SPAN = _NonRecordingSpan()
+
+
+class _NoopSpanContext:
+    def __enter__(self) -> _NonRecordingSpan:
+        return NON_RECORDING_SPAN
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NOOP_SPAN_CONTEXT = _NoopSpanContext()
+
+
+class _SpanContext:
+    """Makes a span current for the duration of a `with` block."""
+
+    __slots__ = ("span", "_token")
+
+    def __init__(self, span: Span):
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.span.set_error(exc)
+        self.span.end()
+
+
+def enabled() -> bool:
+    """True once setup_tracing() installed an exporter."""
+    return _processor is not None
+
+
+def current_span() -> Span | None:
+    """The span active in this context, if any."""
+    return _current_span.get()
+
+
+def create_span(
+    name: str,
+    kind: str = SPAN_KIND_INTERNAL,
+    attributes: dict[str, Any] | None = None,
+    traceparent: str | None = None,
+) -> Span | _NonRecordingSpan:
+    """
+    Start a span without making it current (end it with span.end()).
+
+    The parent is the current span; a root span continues the trace in
+    `traceparent` if given, otherwise starts a new trace sampled at the
+    configured rate.
+    """
+    if _processor is None:
+        return NON_RECORDING_SPAN
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, kind, parent.trace_id, parent.span_id, parent.sampled, attributes)
+    remote = parse_traceparent(traceparent)
+    if remote is not None:
+        trace_id, parent_id, sampled = remote
+        return Span(name, kind, trace_id, parent_id, sampled, attributes)
+    sampled = _sample_rate >= 1 or random.random() < _sample_rate
+    return Span(name, kind, f"{random.getrandbits(128):032x}", None, sampled, attributes)
+
+
+def start_span(
+    name: str,
+    kind: str = SPAN_KIND_INTERNAL,
+    attributes: dict[str, Any] | None = None,
+    traceparent: str | None = None,
+) -> Any:
+    """
+    Context manager that runs its block inside a new current span.
+
+    Exceptions leaving the block mark the span as an error. While tracing is
+    off this returns a shared no-op context manager.
+    """
+    if _processor is None:
+        return _NOOP_SPAN_CONTEXT
+    return _SpanContext(create_span(name, kind, attributes, traceparent))
+
+
+class SpanExporter:
+    """Destination for finished spans."""
+
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileSpanExporter(SpanExporter):
+    """Append spans to a file as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        with open(self.path, "a") as f:
+            f.writelines(json.dumps(span, default=str) + "\n" for span in spans)
+
+
+_OTLP_KINDS = {SPAN_KIND_INTERNAL: 1, SPAN_KIND_SERVER: 2, SPAN_KIND_CLIENT: 3}
+_OTLP_STATUS = {"UNSET": 0, "OK": 1, "ERROR": 2}
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """POST spans to an OpenTelemetry collector as OTLP/HTTP JSON."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout_seconds: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout_seconds = timeout_seconds
+
+    def _payload(self, spans: list[dict[str, Any]]) -> dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes({"service.name": self.service_name})
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [
+                                {
+                                    "traceId": span["trace_id"],
+                                    "spanId": span["span_id"],
+                                    "parentSpanId": span["parent_span_id"] or "",
+                                    "name": span["name"],
+                                    "kind": _OTLP_KINDS.get(span["kind"], 1),
+                                    "startTimeUnixNano": str(span["start_time_unix_nano"]),
+                                    "endTimeUnixNano": str(span["end_time_unix_nano"]),
+                                    "attributes": _otlp_attributes(span["attributes"]),
+                                    "status": {
+                                        "code": _OTLP_STATUS[span["status"]["code"]],
+                                        "message": span["status"]["message"],
+                                    },
+                                }
+                                for span in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self._payload(spans), default=str).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout_seconds) as response:
+            response.read()
+
+
+class _BatchSpanProcessor:
+    """Queue finished spans and export them in batches from a background thread."""
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        capacity: int = 10000,
+        batch_size: int = 512,
+        interval_seconds: float = 1.0,
+    ):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=capacity)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until every span queued so far has been exported."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self.exporter.shutdown()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                items = [self._queue.get(timeout=self.interval_seconds)]
+            except queue.Empty:
+                continue
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            spans = [item.to_dict() for item in items if isinstance(item, Span)]
+            if spans:
+                try:
+                    self.exporter.export(spans)
+                except Exception as e:
+                    logger.warning(f"Failed to export {len(spans)} spans: {e}")
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in items:
+                return
+
+
+_processor: _BatchSpanProcessor | None = None
+_sample_rate = 1.0
+
+
+def create_exporter(
+    name: str, file_path: str = "", otlp_endpoint: str = "", service_name: str = ""
+) -> SpanExporter | None:
+    """Build the exporter selected by name ('none', 'file' or 'otlp')."""
+    if name == "file":
+        return FileSpanExporter(file_path)
+    if name == "otlp":
+        return OTLPHttpSpanExporter(otlp_endpoint, service_name)
+    if name not in ("", "none"):
+        logger.warning(f"Unknown tracing exporter '{name}', tracing disabled")
+    return None
+
+
+def setup_tracing(exporter: SpanExporter | None, sample_rate: float = 1.0) -> None:
+    """
+    Install (or with None, remove) the span exporter.
+
+    Args:
+        exporter: Destination for finished spans; None turns tracing off
+        sample_rate: Fraction of new traces recorded (incoming sampled flags are kept)
+    """
+    global _processor, _sample_rate
+
+    shutdown_tracing()
+    _sample_rate = sample_rate
+    if exporter is not None:
+        _processor = _BatchSpanProcessor(exporter)
+        logger.info(f"Tracing enabled ({type(exporter).__name__}, sample rate {sample_rate})")
+
+
+def flush_tracing() -> None:
+    """Export every finished span now (tests, shutdown)."""
+    if _processor is not None:
+        _processor.flush()
+
+
+def shutdown_tracing() -> None:
+    """Export pending spans and stop the exporter thread."""
+    global _processor
+
+    processor, _processor = _processor, None
+    if processor is not None:
+        processor.shutdown()
+
+
+def _before_call(model: Any, context: dict, **kwargs: Any) -> None:
+    if _processor is None or _current_span.get() is None:
+        return
+    service = model.service_model.endpoint_prefix
+    context["trace_span"] = create_span(
+        f"{service}.{model.name}",
+        SPAN_KIND_CLIENT,
+        {"rpc.system": "aws-api", "rpc.service": service, "rpc.method": model.name},
+    )
+
+
+def _after_call(http_response: Any, parsed: dict, context: dict, **kwargs: Any) -> None:
+    span = context.pop("trace_span", None)
+    if span is None:
+        return
+    span.set_attribute("http.status_code", http_response.status_code)
+    if http_response.status_code >= 300:
+        span.set_error(parsed.get("Error", {}).get("Code") or http_response.status_code)
+    span.end()
+
+
+def _after_call_error(exception: Exception, context: dict, **kwargs: Any) -> None:
+    span = context.pop("trace_span", None)
+    if span is not None:
+        span.set_error(exception)
+        span.end()
+
+
+def instrument_client(client: Any) -> None:
+    """Record a client span for every API call made through a boto3 client."""
+    events = client.meta.events
+    events.register("before-call.*.*", _before_call, unique_id="tracing-before-call")
+    events.register("after-call.*.*", _after_call, unique_id="tracing-after-call")
+    events.register("after-call-error.*.*", _after_call_error, unique_id="tracing-after-call-error")
+
+
+class TracedRoute(APIRoute):
+    """APIRoute whose handler (dependencies, endpoint, serialization) runs in a span."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        name = f"route {','.join(sorted(self.methods or ()))} {self.path}"
+
+        async def traced_handler(request: Request) -> Response:
+            with start_span(name, attributes={"http.route": self.path}):
+                return await handler(request)
+
+        return traced_handler
+
+
+class TracedJSONResponse(JSONResponse):
+    """JSONResponse that records response body encoding as a span."""
+
+    def render(self, content: Any) -> bytes:
+        with start_span("response.render"):
+            return super().render(content)
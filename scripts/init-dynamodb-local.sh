@@ -49,7 +49,13 @@ if aws dynamodb describe-table \
   exit 0
 fi
 
-# Create the table with the same schema as defined in Terraform
+# Create the table with the Terraform schema's keys, plus two GSI changes the
+# Terraform table (DEVOPS repo) does not have yet:
+# user-name-index: adds created_at as sort key (Terraform: user_name only), so a
+#   user's greetings page newest first across pages, not just within a page
+# feed-index: time-ordered greeting feed (feed_shard = "feed#<n>", newest first by
+#   created_at); without it /api/greetings falls back to a scan
+# The backend reads the GSI schema from describe_table and works with either.
 echo "Creating table: $TABLE_NAME"
 aws dynamodb create-table \
   --table-name "$TABLE_NAME" \
@@ -57,12 +63,14 @@ aws dynamodb create-table \
     AttributeName=id,AttributeType=S \
     AttributeName=created_at,AttributeType=S \
     AttributeName=user_name,AttributeType=S \
+    AttributeName=feed_shard,AttributeType=S \
   --key-schema \
     AttributeName=id,KeyType=HASH \
     AttributeName=created_at,KeyType=RANGE \
   --billing-mode PAY_PER_REQUEST \
   --global-secondary-indexes \
-    'IndexName=user-name-index,KeySchema=[{AttributeName=user_name,KeyType=HASH}],Projection={ProjectionType=ALL}' \
+    'IndexName=user-name-index,KeySchema=[{AttributeName=user_name,KeyType=HASH},{AttributeName=created_at,KeyType=RANGE}],Projection={ProjectionType=ALL}' \
+    'IndexName=feed-index,KeySchema=[{AttributeName=feed_shard,KeyType=HASH},{AttributeName=created_at,KeyType=RANGE}],Projection={ProjectionType=ALL}' \
   --endpoint-url "$DYNAMODB_ENDPOINT" \
   --region "$AWS_REGION" \
   > /dev/null